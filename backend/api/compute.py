@@ -0,0 +1,157 @@
+"""
+Process pool for CPU-bound schedule computation.
+
+Tournaments run in separate worker processes so they never hold the API
+process's GIL; login, config and export requests stay responsive while heavy
+runs are in flight. The pool admits at most `workers + max_pending` calls at a
+time. Each admitted call gets a ticket: a pair of stop/cancel flags in shared
+memory that workers poll for free, while progress reports travel back through
+a multiprocessing manager queue.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, List, Optional
+import multiprocessing
+import queue
+import threading
+
+from backend.scheduler import RunCancelled
+
+# How often the calling thread relays progress and stop/cancel requests.
+RELAY_POLL_SECONDS = 0.02
+
+_STOP = 0
+_CANCEL = 1
+
+# Shared flag array, two entries per ticket; set once per worker process by _init_worker.
+_worker_flags = None
+
+
+class PoolBusy(RuntimeError):
+    """Raised when every worker is busy and the pending queue is full."""
+
+
+def _init_worker(flags) -> None:
+    global _worker_flags
+    _worker_flags = flags
+
+
+def _flag_set(index: int) -> bool:
+    return bool(_worker_flags[index])
+
+
+def _remote_call(fn: Callable[..., Any], args: tuple, kwargs: dict, ticket: int, events) -> Any:
+    return fn(
+        *args,
+        on_trial=events.put if events is not None else None,
+        should_stop=partial(_flag_set, 2 * ticket + _STOP),
+        cancel=partial(_flag_set, 2 * ticket + _CANCEL),
+        **kwargs,
+    )
+
+
+class ComputePool:
+    """
+    Bounded process pool. `workers` <= 0 disables it and `run` calls the
+    function in the calling thread instead (useful for development).
+    """
+
+    def __init__(self, *, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        capacity = max(1, workers) + max(0, max_pending)
+        self._slots = threading.BoundedSemaphore(capacity)
+        self._tickets: List[int] = list(range(capacity))
+        self._lock = threading.Lock()
+        # Spawned, not forked: the API process is multi-threaded.
+        self._context = multiprocessing.get_context("spawn")
+        self._flags = self._context.RawArray("b", 2 * capacity)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+
+    def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        block: bool = False,
+        on_trial: Optional[Callable[[Any], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        cancel: Optional[Callable[[], bool]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Call `fn(*args, on_trial=..., should_stop=..., cancel=..., **kwargs)` in a
+        worker and return its result. `fn` and its arguments must be picklable.
+
+        Raises `PoolBusy` when the pool is saturated, unless `block` is set, in
+        which case the caller waits for a free place.
+        """
+        if not self._slots.acquire(blocking=block):
+            raise PoolBusy("Scheduler is busy; try again shortly")
+        try:
+            if self.workers <= 0:
+                return fn(*args, on_trial=on_trial, should_stop=should_stop, cancel=cancel, **kwargs)
+            with self._lock:
+                ticket = self._tickets.pop()
+                executor, manager = self._start_locked(with_manager=on_trial is not None)
+            try:
+                return self._call(executor, manager, ticket, fn, args, kwargs, on_trial, should_stop, cancel)
+            finally:
+                with self._lock:
+                    self._tickets.append(ticket)
+        finally:
+            self._slots.release()
+
+    def _start_locked(self, *, with_manager: bool):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(self._flags,),
+            )
+        if with_manager and self._manager is None:
+            self._manager = self._context.Manager()
+        return self._executor, self._manager
+
+    def _call(self, executor, manager, ticket, fn, args, kwargs, on_trial, should_stop, cancel) -> Any:
+        stop_at, cancel_at = 2 * ticket + _STOP, 2 * ticket + _CANCEL
+        self._flags[stop_at] = self._flags[cancel_at] = 0
+        events = manager.Queue() if on_trial is not None else None
+        future = executor.submit(_remote_call, fn, args, kwargs, ticket, events)
+        while True:
+            finished = future.done()
+            if events is not None:
+                self._relay(events, on_trial)
+            if finished:
+                return future.result()
+            if should_stop is not None and not self._flags[stop_at] and should_stop():
+                self._flags[stop_at] = 1
+            if cancel is not None and not self._flags[cancel_at] and cancel():
+                self._flags[cancel_at] = 1
+                if future.cancel():
+                    # Never started, so there is nothing for a worker to abandon.
+                    raise RunCancelled()
+            if events is None:
+                wait([future], timeout=RELAY_POLL_SECONDS)
+
+    @staticmethod
+    def _relay(events, on_trial: Callable[[Any], None]) -> None:
+        try:
+            report = events.get(timeout=RELAY_POLL_SECONDS)
+            while True:
+                on_trial(report)
+                report = events.get_nowait()
+        except queue.Empty:
+            pass
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            if self._manager is not None:
+                self._manager.shutdown()
+            self._executor = None
+            self._manager = None
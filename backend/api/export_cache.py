@@ -0,0 +1,84 @@
+"""
+Content-addressed cache for schedule export downloads.
+
+Artifacts are keyed by a hash of the saved schedule payload plus the export
+format and options, so a cached file is valid for as long as the schedule it
+was built from; publishing a new schedule simply produces new keys. The same
+key doubles as the HTTP ETag. Entries are evicted least-recently-used once
+the cache holds more than `max_bytes` of artifact data.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+import hashlib
+import json
+import threading
+
+
+@dataclass(frozen=True)
+class ExportArtifact:
+    content: bytes
+    media_type: str
+    filename: str
+    etag: str
+
+
+def export_key(fmt: str, data: dict, **options: Any) -> str:
+    """Stable hash of a schedule payload and the options used to export it."""
+    canonical = json.dumps(
+        {"format": fmt, "options": options, "schedule": data},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value names `etag` (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ExportCache:
+    """Thread-safe LRU of export artifacts bounded by total content size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[str, ExportArtifact]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ExportArtifact]:
+        with self._lock:
+            artifact = self._entries.get(key)
+            if artifact is not None:
+                self._entries.move_to_end(key)
+            return artifact
+
+    def put(self, key: str, artifact: ExportArtifact) -> None:
+        size = len(artifact.content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+            self._entries[key] = artifact
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.content)
+
@@ -0,0 +1,124 @@
+"""
+In-process job queue for long schedule runs.
+
+Jobs run on a small thread pool inside the API process; there is no external
+broker, so jobs live only as long as the process. Finished jobs are kept for a
+TTL and then dropped on the next queue access.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import time
+import uuid
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+
+class QueueFull(RuntimeError):
+    """Raised when the queue already holds its maximum of unfinished jobs."""
+
+
+@dataclass
+class JobProgress:
+    done: int = 0
+    total: int = 0
+    best_penalty: Optional[float] = None
+
+
+@dataclass
+class Job:
+    id: str
+    owner: str
+    status: str = JOB_QUEUED
+    progress: JobProgress = field(default_factory=JobProgress)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[str] = None
+    expires_at: Optional[float] = None  # monotonic deadline once finished
+    # Progress events in publish order; readers keep their own cursor into the list.
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    stop_requested: threading.Event = field(default_factory=threading.Event)
+    # Set to abandon the job; `fn` is expected to poll it and raise.
+    cancel_requested: threading.Event = field(default_factory=threading.Event)
+
+
+class JobQueue:
+    """
+    Bounded job runner: at most `workers` jobs execute at once and at most
+    `max_pending` unfinished jobs (queued or running) are accepted.
+    """
+
+    def __init__(self, *, workers: int = 2, max_pending: int = 16, ttl_seconds: float = 3600.0) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="schedule-job")
+
+    def submit(
+        self,
+        owner: str,
+        fn: Callable[[Job], Any],
+        *,
+        error_message: Callable[[Exception], str] = str,
+    ) -> Job:
+        """Queue `fn(job)`; its return value becomes `job.result`."""
+        with self._lock:
+            self._purge_locked()
+            pending = sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATES)
+            if pending >= self.max_pending:
+                raise QueueFull("Too many schedule jobs in progress")
+            job = Job(id=uuid.uuid4().hex, owner=owner)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, error_message)
+        return job
+
+    def get(self, job_id: str, owner: str) -> Optional[Job]:
+        """Look up a job; other owners' and expired jobs are reported as missing."""
+        with self._lock:
+            self._purge_locked()
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, fn: Callable[[Job], Any], error_message: Callable[[Exception], str]) -> None:
+        job.started_at = datetime.now(timezone.utc)
+        try:
+            if job.cancel_requested.is_set():
+                job.status = JOB_CANCELLED
+                return
+            job.status = JOB_RUNNING
+            job.result = fn(job)
+            job.status = JOB_SUCCEEDED
+        except Exception as exc:
+            if job.cancel_requested.is_set():
+                job.status = JOB_CANCELLED
+            else:
+                job.error = error_message(exc)
+                job.status = JOB_FAILED
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job.expires_at = time.monotonic() + self.ttl_seconds
+
+    def _purge_locked(self) -> None:
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items() if job.expires_at is not None and job.expires_at <= now]
+        for job_id in expired:
+            del self._jobs[job_id]
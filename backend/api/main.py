@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import List
 from pathlib import Path
 import json
+import logging
 import re
 import base64
 import os
@@ -13,7 +14,10 @@ import ipaddress
 import urllib.request
 import urllib.error
 import time
+import asyncio
+import threading
 from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import Request
 
 try:
@@ -24,21 +28,27 @@ except Exception:
     # dotenv is optional; ignore if not installed
     pass
 from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 
 from backend.scheduler import (
     ConstraintToggles,
     DailyRequirement,
+    RunCancelled,
     ScheduleConfig,
     StaffMember,
     StaffPreferences,
+    compile_instance,
     export_schedule_to_excel,
+    planned_trials,
     run_tournament,
 )
+from backend.scheduler.repair import changed_slots, repair_schedule
 from backend.scheduler.model import DAYS, Assignment, ScheduleResult, ScheduleSlot, PTOEntry
 from backend.auth_db import (
     init_db,
+    close_db,
     create_invite,
     redeem_invite,
     validate_login,
@@ -57,15 +67,28 @@ from backend.auth_db import (
     delete_config as delete_user_config,
     save_schedule as persist_schedule,
     get_latest_schedule,
+    get_schedule_version,
+    list_schedule_versions,
     export_config as export_user_config,
     import_config as import_user_config,
+    DB_PATH as AUTH_DB_PATH,
 )
+from .compute import ComputePool, PoolBusy
+from .export_cache import ExportArtifact, ExportCache, etag_matches, export_key
+from .result_cache import ResultCache, request_key
+from .jobs import FINISHED_STATES, JOB_FAILED, JOB_SUCCEEDED, Job, JobQueue, QueueFull
 from .schemas import (
     AssignmentOut,
     ConfigPayload,
+    JobStatusOut,
+    JobSubmitResponse,
     SaveConfigRequest,
+    ScheduleRepairRequest,
     ScheduleRequest,
     ScheduleResponse,
+    ScheduleVersionOut,
+    TournamentOut,
+    TrialReportOut,
     LoginRequest,
     LoginResponse,
     InviteRequest,
@@ -74,6 +97,8 @@ from .schemas import (
     StaffMemberIn,
 )
 
+logger = logging.getLogger(__name__)
+
 JWT_SECRET = os.getenv("JWT_SECRET", os.getenv("API_KEY", "dev-secret"))
 JWT_EXPIRE_HOURS = int(os.getenv("JWT_EXPIRE_HOURS", "8"))
 APP_ENV = os.getenv("APP_ENV", "dev").lower()
@@ -84,6 +109,32 @@ ADMIN_PASS = (os.getenv("ADMIN_PASS", "admin") or "admin").strip()
 GEOIP_API_URL = (os.getenv("GEOIP_API_URL") or "").strip()
 GEOIP_API_TIMEOUT = float(os.getenv("GEOIP_API_TIMEOUT", "2.0"))
 GEOIP_CACHE_TTL = int(os.getenv("GEOIP_CACHE_TTL", "3600"))
+# Process workers per tournament when the request does not ask for a count (0 = all cores).
+SCHEDULE_WORKERS = int(os.getenv("SCHEDULE_WORKERS", "1"))
+# Trial solver used when the request does not pick one ("reference" or "numpy").
+SCHEDULE_ENGINE = (os.getenv("SCHEDULE_ENGINE", "reference") or "reference").strip().lower()
+# Wall-clock ceiling for one tournament; requests may ask for less, never more.
+SCHEDULE_MAX_SECONDS = float(os.getenv("SCHEDULE_MAX_SECONDS", "30"))
+# Background schedule jobs: concurrent runs, unfinished jobs accepted, and result retention.
+SCHEDULE_JOB_WORKERS = int(os.getenv("SCHEDULE_JOB_WORKERS", "2"))
+SCHEDULE_JOB_QUEUE = int(os.getenv("SCHEDULE_JOB_QUEUE", "16"))
+SCHEDULE_JOB_TTL = int(os.getenv("SCHEDULE_JOB_TTL", "3600"))
+# Worker processes that run tournaments outside the API process (0 = run in-process),
+# and how many more runs may wait for one before /schedule/run answers 503.
+SCHEDULE_POOL_WORKERS = int(os.getenv("SCHEDULE_POOL_WORKERS", str(os.cpu_count() or 1)))
+SCHEDULE_POOL_QUEUE = int(os.getenv("SCHEDULE_POOL_QUEUE", "4"))
+# Memoized results of seeded runs, shared by all workers on the host (0 entries disables).
+SCHEDULE_CACHE_PATH = Path(os.getenv("SCHEDULE_CACHE_PATH", str(AUTH_DB_PATH.with_name("schedule_cache.db"))))
+SCHEDULE_CACHE_MAX_ENTRIES = int(os.getenv("SCHEDULE_CACHE_MAX_ENTRIES", "256"))
+SCHEDULE_CACHE_TTL = int(os.getenv("SCHEDULE_CACHE_TTL", str(7 * 24 * 3600)))
+# Tournament stop reasons that do not depend on timing, so the result can be memoized.
+DETERMINISTIC_STOPS = ("completed", "stagnation")
+# Job event streams: how often they check for new trials, and the idle keepalive interval.
+SSE_POLL_SECONDS = 0.25
+SSE_KEEPALIVE_SECONDS = 15.0
+# Memory budget for cached export downloads (CSV/Excel), shared by all users.
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 _geoip_cache: dict[str, tuple[float, tuple[str | None, str | None, str | None]]] = {}
 
 app = FastAPI(
@@ -94,6 +145,21 @@ app = FastAPI(
     openapi_url=None if IS_PROD else "/openapi.json",
 )
 init_db()
+_jobs = JobQueue(workers=SCHEDULE_JOB_WORKERS, max_pending=SCHEDULE_JOB_QUEUE, ttl_seconds=SCHEDULE_JOB_TTL)
+_export_cache = ExportCache(EXPORT_CACHE_MAX_BYTES)
+_compute = ComputePool(workers=SCHEDULE_POOL_WORKERS, max_pending=SCHEDULE_POOL_QUEUE)
+_results = ResultCache(SCHEDULE_CACHE_PATH, max_entries=SCHEDULE_CACHE_MAX_ENTRIES, ttl_seconds=SCHEDULE_CACHE_TTL)
+_export_builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export-build")
+
+
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    _jobs.shutdown()
+    _compute.shutdown()
+    _export_builder.shutdown(wait=False, cancel_futures=True)
+    close_db()
+
+
 # Basic in-memory rate limiter (per IP, per endpoint).
 _rate_buckets: dict[str, deque] = defaultdict(deque)
 _login_failures: dict[str, deque] = defaultdict(deque)
@@ -565,162 +631,576 @@ def reset_user_invite(request: Request, user_id: int, payload: dict = Depends(re
     response_model=ScheduleResponse,
     dependencies=[Depends(require_auth), Depends(rate_limit("schedule_run", limit=8, window_seconds=60))],
 )
-def run_schedule(
+async def run_schedule(
     http_request: Request,
     body: ScheduleRequest,
     payload: dict = Depends(require_auth),
 ) -> ScheduleResponse:
     try:
-        staff_members = [_to_staff_member(s) for s in body.staff]
-        if not staff_members:
-            raise ValueError("At least one staff member is required.")
-        requirements: List[DailyRequirement] = [
-            DailyRequirement(
-                day_name=req.day_name,
-                patient_count=req.patient_count,
-                tech_openers=req.tech_openers,
-                tech_mids=req.tech_mids,
-                tech_closers=req.tech_closers,
-                rn_count=req.rn_count,
-                admin_count=req.admin_count,
+        return await _run_while_connected(http_request, _execute_schedule, body, payload, _request_meta(http_request))
+    except RunCancelled as exc:
+        raise HTTPException(status_code=499, detail="Client closed request") from exc
+    except PoolBusy as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"}) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=_schedule_error(exc)) from exc
+
+
+@router.post(
+    "/schedule/repair",
+    response_model=ScheduleResponse,
+    dependencies=[Depends(require_auth), Depends(rate_limit("schedule_repair", limit=30, window_seconds=60))],
+)
+def repair_schedule_run(
+    http_request: Request,
+    body: ScheduleRepairRequest,
+    payload: dict = Depends(require_auth),
+) -> ScheduleResponse:
+    """
+    Apply a change set (PTO added, staff removed, demand changed) to a saved
+    schedule, re-solving only the slots it affects, and save the result as a
+    new version.
+    """
+    if body.version_id is not None:
+        data = get_schedule_version(_schedule_owners(payload), body.version_id)
+    else:
+        data = _latest_schedule_for(payload)
+    if data is None:
+        raise HTTPException(status_code=404, detail="No saved schedule to repair")
+    try:
+        return _execute_repair(body, data, payload, _request_meta(http_request))
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=_schedule_error(exc)) from exc
+
+
+def _execute_repair(
+    body: ScheduleRepairRequest,
+    data: dict,
+    payload: dict,
+    meta: tuple[str, str, str, str],
+) -> ScheduleResponse:
+    if data.get("start_date") != body.config.start_date.isoformat() or data.get("weeks") != body.config.weeks:
+        raise ValueError("Start date and weeks must match the saved schedule being repaired.")
+    previous, _ = _hydrate_schedule_result(data)
+    # Clients advance their cursor after every run, so the request's is usually the saved end cursor.
+    config_in = body.config
+    if data.get("start_bleach_cursor") is not None:
+        config_in = config_in.copy(update={"bleach_cursor": int(data["start_bleach_cursor"])})
+    changes = body.changes
+    removed = set(changes.staff_removed)
+    demand = {req.day_name: req for req in body.requirements}
+    demand.update({req.day_name: req for req in changes.requirements})
+    # The repaired schedule is saved with the changed inputs, like a fresh run would be.
+    updated = body.copy(
+        update={
+            "config": config_in,
+            "staff": [member for member in body.staff if member.id not in removed],
+            "requirements": list(demand.values()),
+            "pto": [entry for entry in [*body.pto, *changes.pto_added] if entry.staff_id not in removed],
+        }
+    )
+    staff_members, requirements, config, pto_entries = _schedule_inputs(updated)
+    result = repair_schedule(staff_members, requirements, config, pto_entries, previous)
+    return _publish_schedule(
+        updated,
+        payload,
+        meta,
+        result,
+        result.seed,
+        staff_members,
+        pto_entries,
+        event="schedule_repair",
+        changed_slots=changed_slots(previous, result),
+    )
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # The body is already read, so the next ASGI message is the disconnect.
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _run_while_connected(request: Request, fn, *args, **kwargs):
+    """
+    Run blocking `fn(*args, cancel=..., **kwargs)` in the threadpool and trip its
+    cancel callback if the client disconnects first, so an abandoned run stops
+    within a few slots and is never persisted or audited.
+    """
+    cancelled = threading.Event()
+    run = asyncio.ensure_future(run_in_threadpool(fn, *args, cancel=cancelled.is_set, **kwargs))
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({run, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if not run.done():
+            cancelled.set()
+        return await run
+    finally:
+        watcher.cancel()
+
+
+@router.post(
+    "/schedule/jobs",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    dependencies=[Depends(require_auth), Depends(rate_limit("schedule_run", limit=8, window_seconds=60))],
+)
+def submit_schedule_job(
+    http_request: Request,
+    body: ScheduleRequest,
+    payload: dict = Depends(require_auth),
+) -> JobSubmitResponse:
+    meta = _request_meta(http_request)
+
+    def work(job: Job) -> ScheduleResponse:
+        # Partitioned runs give every role at least one trial, so count from the compiled instance.
+        job.progress.total = planned_trials(
+            compile_instance(*_schedule_inputs(body)),
+            body.tournament_trials,
+            partitioned=body.partitioned,
+            window_weeks=body.window_weeks,
+        )
+        started = time.perf_counter()
+
+        # Best penalty per role partition and horizon window; the run's best is their sum.
+        part_best: dict[tuple[str | None, int | None], float] = {}
+
+        def on_trial(report) -> None:
+            job.progress.done += 1
+            part = (report.partition, report.window)
+            best = part_best.get(part)
+            if not report.pruned and (best is None or report.total_penalty < best):
+                part_best[part] = report.total_penalty
+                job.progress.best_penalty = sum(part_best.values())
+            job.events.append(
+                {
+                    "index": report.index,
+                    "seed": report.seed,
+                    "total_penalty": report.total_penalty,
+                    "pruned": report.pruned,
+                    "open_slots": report.open_slots,
+                    "partition": report.partition,
+                    "window": report.window,
+                    "best_penalty": job.progress.best_penalty,
+                    "trial_ms": round(report.elapsed * 1000, 3),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+                }
             )
-            for req in body.requirements
-        ]
-        if len(requirements) != len(DAYS):
-            raise ValueError("Requirements must include all clinic days (Mon-Sat).")
-        toggles = ConstraintToggles(**body.config.toggles.dict())
-        config = ScheduleConfig(
-            clinic_name=body.config.clinic_name,
-            timezone=body.config.timezone,
-            start_date=body.config.start_date,
-            weeks=body.config.weeks,
-            bleach_day=body.config.bleach_day,
-            bleach_rotation=body.config.bleach_rotation,
-            bleach_cursor=body.config.bleach_cursor,
-            bleach_frequency=body.config.bleach_frequency,
-            patients_per_tech=body.config.patients_per_tech,
-            patients_per_rn=body.config.patients_per_rn,
-            techs_per_rn=body.config.techs_per_rn,
-            toggles=toggles,
+
+        return _execute_schedule(
+            body,
+            payload,
+            meta,
+            on_trial=on_trial,
+            should_stop=job.stop_requested.is_set,
+            cancel=job.cancel_requested.is_set,
+            block=True,
         )
-        pto_entries = [PTOEntry(staff_id=item.staff_id, date=item.date) for item in body.pto]
-        result, winning_seed = run_tournament(
+
+    try:
+        job = _jobs.submit(_config_owner(payload), work, error_message=_schedule_error)
+    except QueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"})
+    return JobSubmitResponse(job_id=job.id, status=job.status)
+
+
+@router.get("/schedule/jobs/{job_id}", response_model=JobStatusOut)
+def schedule_job_status(job_id: str, payload: dict = Depends(require_auth)) -> JobStatusOut:
+    return _job_status_out(_owned_job(job_id, payload))
+
+
+@router.post("/schedule/jobs/{job_id}/stop", response_model=JobStatusOut, status_code=202)
+def stop_schedule_job(job_id: str, payload: dict = Depends(require_auth)) -> JobStatusOut:
+    """Finish the run after the current trial and keep the best schedule found so far."""
+    job = _owned_job(job_id, payload)
+    job.stop_requested.set()
+    return _job_status_out(job)
+
+
+@router.delete("/schedule/jobs/{job_id}", response_model=JobStatusOut, status_code=202)
+def cancel_schedule_job(job_id: str, payload: dict = Depends(require_auth)) -> JobStatusOut:
+    """Abandon a queued or running job; nothing is saved and it ends as `cancelled`."""
+    job = _owned_job(job_id, payload)
+    job.cancel_requested.set()
+    return _job_status_out(job)
+
+
+@router.get("/schedule/jobs/{job_id}/events")
+async def schedule_job_events(
+    job_id: str,
+    payload: dict = Depends(require_auth),
+    last_event_id: str | None = Header(default=None, alias="last-event-id"),
+) -> StreamingResponse:
+    """
+    Server-Sent Events feed of a job: one `trial` event per finished trial and a
+    final `done` event. Reconnecting clients resume after `Last-Event-ID`.
+    """
+    job = _owned_job(job_id, payload)
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        _job_event_stream(job, start),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: dict, event_id: int | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _job_event_stream(job: Job, start: int):
+    sent = start
+    last_write = time.monotonic()
+    while True:
+        # Read the status first so events published just before finishing are still sent.
+        finished = job.status in FINISHED_STATES
+        pending = job.events[sent:]
+        for offset, event in enumerate(pending):
+            yield _sse("trial", event, sent + offset)
+        sent += len(pending)
+        if finished:
+            yield _sse(
+                "done",
+                {
+                    "status": job.status,
+                    "error": job.error,
+                    "result_url": f"{router.prefix}/schedule/jobs/{job.id}/result",
+                },
+            )
+            return
+        if pending:
+            last_write = time.monotonic()
+        elif time.monotonic() - last_write >= SSE_KEEPALIVE_SECONDS:
+            yield ": keepalive\n\n"
+            last_write = time.monotonic()
+        await asyncio.sleep(SSE_POLL_SECONDS)
+
+
+def _job_status_out(job: Job) -> JobStatusOut:
+    return JobStatusOut(
+        job_id=job.id,
+        status=job.status,
+        trials_done=job.progress.done,
+        trials_total=job.progress.total,
+        best_penalty=job.progress.best_penalty,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+    )
+
+
+@router.get("/schedule/jobs/{job_id}/result", response_model=ScheduleResponse)
+def schedule_job_result(job_id: str, payload: dict = Depends(require_auth)) -> ScheduleResponse:
+    job = _owned_job(job_id, payload)
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=400, detail=job.error or "Invalid schedule request")
+    if job.status != JOB_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return job.result
+
+
+@router.get("/schedule/cache/stats", dependencies=[Depends(require_admin)])
+def schedule_cache_stats():
+    return _results.stats()
+
+
+def _owned_job(job_id: str, payload: dict) -> Job:
+    job = _jobs.get(job_id, _config_owner(payload))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+def _schedule_error(exc: Exception) -> str:
+    return str(exc) if not IS_PROD else "Invalid schedule request"
+
+
+def _execute_schedule(
+    body: ScheduleRequest,
+    payload: dict,
+    meta: tuple[str, str, str, str],
+    *,
+    on_trial=None,
+    should_stop=None,
+    cancel=None,
+    block: bool = False,
+) -> ScheduleResponse:
+    """Run the tournament, persist the snapshot and audit the run; the workbook is built only on request."""
+    staff_members, requirements, config, pto_entries = _schedule_inputs(body)
+    warm_start = None
+    if body.warm_start:
+        previous = _latest_schedule_for(payload)
+        if previous is not None:
+            warm_start, _ = _hydrate_schedule_result(previous)
+    cache_key = _result_cache_key(body, warm_start)
+    cached = _results.get(cache_key) if cache_key else None
+    if cached is not None:
+        result, winning_seed = cached
+    else:
+        result, winning_seed = _compute.run(
+            run_tournament,
             staff_members,
             requirements,
             config,
+            block=block,
             pto_entries=pto_entries,
             trials=body.tournament_trials,
             base_seed=body.base_seed,
+            workers=body.tournament_workers if body.tournament_workers is not None else SCHEDULE_WORKERS,
+            engine=body.engine or SCHEDULE_ENGINE,
+            improve_iterations=body.improve_iterations,
+            improve_seconds=body.improve_seconds,
+            time_budget=_time_budget(body.time_budget_seconds),
+            stagnation_limit=body.stagnation_limit,
+            on_trial=on_trial,
+            should_stop=should_stop,
+            cancel=cancel,
+            partitioned=body.partitioned,
+            window_weeks=body.window_weeks,
+            warm_start=warm_start,
+            day_matching=body.day_matching,
         )
-        assignments = [
-            AssignmentOut(
-                date=assignment.slot.date,
-                day_name=assignment.slot.day_name,
-                role=assignment.slot.role,
-                duty="bleach" if assignment.slot.is_bleach else assignment.slot.duty,
-                staff_id=assignment.staff_id,
-                notes=assignment.notes,
-                slot_index=assignment.slot.slot_index,
-                is_bleach=assignment.slot.is_bleach,
-            )
-            for assignment in result.assignments
-        ]
-        roles_filter = body.export_roles or None
+        if cache_key and result.tournament is not None and result.tournament.stop_reason in DETERMINISTIC_STOPS:
+            _results.put(cache_key, result, winning_seed)
+    return _publish_schedule(
+        body,
+        payload,
+        meta,
+        result,
+        winning_seed,
+        staff_members,
+        pto_entries,
+        cached=cached is not None,
+    )
+
+
+def _schedule_inputs(
+    body: ScheduleRequest,
+) -> tuple[List[StaffMember], List[DailyRequirement], ScheduleConfig, List[PTOEntry]]:
+    staff_members = [_to_staff_member(s) for s in body.staff]
+    if not staff_members:
+        raise ValueError("At least one staff member is required.")
+    requirements: List[DailyRequirement] = [
+        DailyRequirement(
+            day_name=req.day_name,
+            patient_count=req.patient_count,
+            tech_openers=req.tech_openers,
+            tech_mids=req.tech_mids,
+            tech_closers=req.tech_closers,
+            rn_count=req.rn_count,
+            admin_count=req.admin_count,
+        )
+        for req in body.requirements
+    ]
+    if len(requirements) != len(DAYS):
+        raise ValueError("Requirements must include all clinic days (Mon-Sat).")
+    toggles = ConstraintToggles(**body.config.toggles.dict())
+    config = ScheduleConfig(
+        clinic_name=body.config.clinic_name,
+        timezone=body.config.timezone,
+        start_date=body.config.start_date,
+        weeks=body.config.weeks,
+        bleach_day=body.config.bleach_day,
+        bleach_rotation=body.config.bleach_rotation,
+        bleach_cursor=body.config.bleach_cursor,
+        bleach_frequency=body.config.bleach_frequency,
+        patients_per_tech=body.config.patients_per_tech,
+        patients_per_rn=body.config.patients_per_rn,
+        techs_per_rn=body.config.techs_per_rn,
+        toggles=toggles,
+    )
+    pto_entries = [PTOEntry(staff_id=item.staff_id, date=item.date) for item in body.pto]
+    return staff_members, requirements, config, pto_entries
+
+
+def _publish_schedule(
+    body: ScheduleRequest,
+    payload: dict,
+    meta: tuple[str, str, str, str],
+    result: ScheduleResult,
+    winning_seed: int | None,
+    staff_members: List[StaffMember],
+    pto_entries: List[PTOEntry],
+    *,
+    cached: bool = False,
+    event: str = "schedule_run",
+    changed_slots: int | None = None,
+) -> ScheduleResponse:
+    """Persist a finished schedule as a new version, audit it under `event` and build the response."""
+    assignments = [
+        AssignmentOut(
+            date=assignment.slot.date,
+            day_name=assignment.slot.day_name,
+            role=assignment.slot.role,
+            duty="bleach" if assignment.slot.is_bleach else assignment.slot.duty,
+            staff_id=assignment.staff_id,
+            notes=assignment.notes,
+            slot_index=assignment.slot.slot_index,
+            is_bleach=assignment.slot.is_bleach,
+        )
+        for assignment in result.assignments
+    ]
+    excel_b64 = None
+    if body.inline_excel:
         excel_bytes = export_schedule_to_excel(
             result,
             {s.id: s for s in staff_members},
-            export_roles=roles_filter,
+            export_roles=body.export_roles or None,
             pto_entries=pto_entries,
         )
         excel_b64 = base64.b64encode(excel_bytes).decode("utf-8")
-        # Persist latest schedule snapshot for this owner (save under both id + username if present)
-        owners = _schedule_owners(payload)
-        def _serialize_assignments():
-            out = []
-            for a in assignments:
-                out.append(
-                    {
-                        "date": a.date.isoformat() if hasattr(a, "date") else getattr(a, "date", None),
-                        "day_name": getattr(a, "day_name", None),
-                        "role": getattr(a, "role", None),
-                        "duty": getattr(a, "duty", None),
-                        "staff_id": getattr(a, "staff_id", None),
-                        "notes": getattr(a, "notes", []),
-                        "slot_index": getattr(a, "slot_index", None),
-                        "is_bleach": getattr(a, "is_bleach", False),
-                    }
-                )
-            return out
-
-        schedule_payload = {
-            "clinic_name": body.config.clinic_name,
-            "timezone": body.config.timezone,
-            "start_date": body.config.start_date.isoformat() if hasattr(body.config.start_date, "isoformat") else body.config.start_date,
-            "weeks": body.config.weeks,
-            "bleach_frequency": body.config.bleach_frequency,
-            "toggles": body.config.toggles.dict(),
-            "requirements": [
-                {
-                    "day_name": req.day_name,
-                    "patient_count": req.patient_count,
-                    "tech_openers": req.tech_openers,
-                    "tech_mids": req.tech_mids,
-                    "tech_closers": req.tech_closers,
-                    "rn_count": req.rn_count,
-                    "admin_count": req.admin_count,
-                }
-                for req in body.requirements
-            ],
-            "assignments": _serialize_assignments(),
-            "staff": [{"id": s.id, "name": s.name, "role": s.role} for s in staff_members],
-            "stats": result.stats,
-            "total_penalty": result.total_penalty,
-            "winning_seed": winning_seed,
-            "bleach_cursor": result.bleach_cursor,
-            "export_roles": body.export_roles,
-            "tournament_trials": body.tournament_trials,
-            "pto": [
+    # Persist latest schedule snapshot for this owner (save under both id + username if present)
+    owners = _schedule_owners(payload)
+    def _serialize_assignments():
+        out = []
+        for a in assignments:
+            out.append(
                 {
-                    "staff_id": item.staff_id,
-                    "date": item.date.isoformat() if hasattr(item.date, "isoformat") else item.date,
+                    "date": a.date.isoformat() if hasattr(a, "date") else getattr(a, "date", None),
+                    "day_name": getattr(a, "day_name", None),
+                    "role": getattr(a, "role", None),
+                    "duty": getattr(a, "duty", None),
+                    "staff_id": getattr(a, "staff_id", None),
+                    "notes": getattr(a, "notes", []),
+                    "slot_index": getattr(a, "slot_index", None),
+                    "is_bleach": getattr(a, "is_bleach", False),
                 }
-                for item in body.pto
-            ],
-            "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-        }
-        # ensure fully serializable before persisting
-        import json as _json
-
-        safe_payload = _json.loads(_json.dumps(schedule_payload, default=str))
-        for owner in owners:
-            persist_schedule(owner, safe_payload)
-        open_slots = sum(
-            1
-            for assignment in assignments
-            if assignment.staff_id is None or str(assignment.staff_id).upper() == "OPEN"
-        )
-        start_label = (
-            body.config.start_date.isoformat()
-            if hasattr(body.config.start_date, "isoformat")
-            else str(body.config.start_date)
-        )
-        detail = (
-            f"clinic={body.config.clinic_name};start={start_label};weeks={body.config.weeks};"
-            f"bleach={body.config.bleach_frequency or 'weekly'};seed={winning_seed};open_slots={open_slots}"
-        )
-        ip, ip_v4, user_agent, location = _request_meta(http_request)
-        log_event(payload.get("sub"), "schedule_run", detail, ip, user_agent, location, ip_v4)
-        return ScheduleResponse(
-            bleach_cursor=result.bleach_cursor,
-            winning_seed=winning_seed,
-            assignments=assignments,
-            total_penalty=result.total_penalty,
-            stats=result.stats,
-            excel=excel_b64,
+            )
+        return out
+
+    schedule_payload = {
+        "clinic_name": body.config.clinic_name,
+        "timezone": body.config.timezone,
+        "start_date": body.config.start_date.isoformat() if hasattr(body.config.start_date, "isoformat") else body.config.start_date,
+        "weeks": body.config.weeks,
+        "bleach_frequency": body.config.bleach_frequency,
+        "toggles": body.config.toggles.dict(),
+        "requirements": [
+            {
+                "day_name": req.day_name,
+                "patient_count": req.patient_count,
+                "tech_openers": req.tech_openers,
+                "tech_mids": req.tech_mids,
+                "tech_closers": req.tech_closers,
+                "rn_count": req.rn_count,
+                "admin_count": req.admin_count,
+            }
+            for req in body.requirements
+        ],
+        "assignments": _serialize_assignments(),
+        "staff": [{"id": s.id, "name": s.name, "role": s.role} for s in staff_members],
+        "stats": result.stats,
+        "total_penalty": result.total_penalty,
+        "winning_seed": winning_seed,
+        "bleach_cursor": result.bleach_cursor,
+        # Cursor the run started from; repairs replay the rotation from here.
+        "start_bleach_cursor": body.config.bleach_cursor,
+        "export_roles": body.export_roles,
+        "tournament_trials": body.tournament_trials,
+        "pto": [
+            {
+                "staff_id": item.staff_id,
+                "date": item.date.isoformat() if hasattr(item.date, "isoformat") else item.date,
+            }
+            for item in body.pto
+        ],
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+    }
+    # ensure fully serializable before persisting
+    import json as _json
+
+    safe_payload = _json.loads(_json.dumps(schedule_payload, default=str))
+    version_id = persist_schedule(owners, safe_payload)
+    excel_url = None
+    if version_id is not None:
+        excel_url = f"{router.prefix}/schedule/history/{version_id}/export/excel"
+        if not body.inline_excel:
+            # Build the workbook off the request path so the download link is usually warm.
+            _export_builder.submit(_prebuild_version_excel, owners, version_id)
+    open_slots = sum(
+        1
+        for assignment in assignments
+        if assignment.staff_id is None or str(assignment.staff_id).upper() == "OPEN"
+    )
+    start_label = (
+        body.config.start_date.isoformat()
+        if hasattr(body.config.start_date, "isoformat")
+        else str(body.config.start_date)
+    )
+    detail = (
+        f"clinic={body.config.clinic_name};start={start_label};weeks={body.config.weeks};"
+        f"bleach={body.config.bleach_frequency or 'weekly'};seed={winning_seed};open_slots={open_slots}"
+    )
+    ip, ip_v4, user_agent, location = meta
+    log_event(payload.get("sub"), event, detail, ip, user_agent, location, ip_v4)
+    return ScheduleResponse(
+        bleach_cursor=result.bleach_cursor,
+        winning_seed=winning_seed,
+        assignments=assignments,
+        total_penalty=result.total_penalty,
+        stats=result.stats,
+        excel=excel_b64,
+        cached=cached,
+        changed_slots=changed_slots,
+        version_id=version_id,
+        excel_url=excel_url,
+        tournament=_tournament_out(result),
+    )
+
+
+def _result_cache_key(body: ScheduleRequest, warm_start: ScheduleResult | None = None) -> str | None:
+    """
+    Hash of everything that decides the winning schedule, or None when the run
+    is not reproducible (no base seed, or local search capped by wall time).
+    Worker count, export roles and the time budget don't change the winner of
+    a run that completes, so they are left out. A warm-started run also
+    depends on the schedule it started from.
+    """
+    if body.base_seed is None or body.improve_seconds is not None:
+        return None
+    fields = body.dict(exclude={"export_roles", "inline_excel", "tournament_workers", "time_budget_seconds"})
+    fields["engine"] = body.engine or SCHEDULE_ENGINE
+    fields["pto"] = sorted(fields["pto"], key=lambda item: (item["staff_id"], str(item["date"])))
+    if warm_start is not None:
+        fields["warm_start"] = sorted(
+            (str(a.slot.date), a.slot.role, a.slot.duty, a.slot.slot_index, a.staff_id or "")
+            for a in warm_start.assignments
         )
-    except Exception as exc:
-        detail = str(exc) if not IS_PROD else "Invalid schedule request"
-        raise HTTPException(status_code=400, detail=detail) from exc
+    return request_key(fields)
+
+
+def _time_budget(requested: float | None) -> float | None:
+    limits = [value for value in (requested, SCHEDULE_MAX_SECONDS) if value and value > 0]
+    return min(limits) if limits else None
+
+
+def _tournament_out(result: ScheduleResult) -> TournamentOut | None:
+    report = result.tournament
+    if report is None:
+        return None
+    return TournamentOut(
+        workers=report.workers,
+        elapsed_ms=round(report.elapsed * 1000, 3),
+        requested_trials=report.requested,
+        trials_run=len(report.trials),
+        stop_reason=report.stop_reason,
+        trials=[
+            TrialReportOut(
+                index=trial.index,
+                seed=trial.seed,
+                total_penalty=trial.total_penalty,
+                elapsed_ms=round(trial.elapsed * 1000, 3),
+                pruned=trial.pruned,
+                open_slots=trial.open_slots,
+                partition=trial.partition,
+                window=trial.window,
+            )
+            for trial in report.trials
+        ],
+        partition_seeds=report.partition_seeds,
+        window_seeds=report.window_seeds,
+    )
 
 
 def _slugify(name: str) -> str:
@@ -920,11 +1400,76 @@ def latest_schedule(response: Response, payload: dict = Depends(require_auth)) -
     return data
 
 
+@router.get("/schedule/history", response_model=List[ScheduleVersionOut])
+def schedule_history(
+    clinic: str | None = None,
+    limit: int = 50,
+    payload: dict = Depends(require_auth),
+) -> List[ScheduleVersionOut]:
+    limit = max(1, min(limit, 500))
+    owners = _schedule_owners(payload)
+    # Each run is saved under every owner alias; show it once.
+    seen: set = set()
+    versions: List[ScheduleVersionOut] = []
+    for row in list_schedule_versions(owners, clinic_name=clinic, limit=limit * len(owners)):
+        key = (row["digest"], row["generated_at"])
+        if key in seen:
+            continue
+        seen.add(key)
+        versions.append(
+            ScheduleVersionOut(
+                id=row["id"],
+                clinic_name=row["clinic_name"],
+                start_date=row["start_date"],
+                weeks=row["weeks"],
+                digest=row["digest"],
+                size=row["size"],
+                generated_at=row["generated_at"],
+                created_at=row["created_at"],
+            )
+        )
+        if len(versions) >= limit:
+            break
+    return versions
+
+
+@router.get("/schedule/history/{version_id}")
+def schedule_version(version_id: int, response: Response, payload: dict = Depends(require_auth)) -> dict:
+    data = get_schedule_version(_schedule_owners(payload), version_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Schedule version not found")
+    # Versions are immutable, so clients may cache them.
+    response.headers["Cache-Control"] = "private, max-age=86400, immutable"
+    return data
+
+
 @router.get("/schedule/export/csv")
 def export_schedule_csv(request: Request, payload: dict = Depends(require_auth)):
-    data = _latest_schedule_for(payload)
-    if not data or not data.get("assignments"):
-        raise HTTPException(status_code=404, detail="No saved schedule")
+    return _export_download(request, payload, _latest_schedule_for(payload), "csv", _build_csv_export)
+
+
+@router.get("/schedule/export/excel")
+def export_schedule_excel(request: Request, payload: dict = Depends(require_auth)):
+    return _export_download(request, payload, _latest_schedule_for(payload), "excel", _build_excel_export)
+
+
+@router.get("/schedule/history/{version_id}/export/excel")
+def export_schedule_version_excel(version_id: int, request: Request, payload: dict = Depends(require_auth)):
+    data = get_schedule_version(_schedule_owners(payload), version_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Schedule version not found")
+    return _export_download(request, payload, data, "excel", _build_excel_export)
+
+
+def _export_filename(data: dict, extension: str) -> str:
+    clinic_name = data.get("clinic_name") or "schedule"
+    range_label = _schedule_date_range(data)
+    if range_label:
+        return f"{_slugify(clinic_name)}-{range_label}.{extension}"
+    return f"{_slugify(clinic_name)}.{extension}"
+
+
+def _build_csv_export(data: dict) -> tuple[bytes, str, str]:
     staff_map = {s.get("id"): s for s in data.get("staff", [])}
     output_rows = []
     for a in data.get("assignments", []):
@@ -942,7 +1487,6 @@ def export_schedule_csv(request: Request, payload: dict = Depends(require_auth))
                 "notes": "|".join(a.get("notes", [])) if a.get("notes") else "",
             }
         )
-    # Return as CSV text for download
     fieldnames = ["date", "day_name", "role", "duty", "staff_name", "staff_key", "is_bleach", "slot_index", "notes"]
     import io
 
@@ -950,77 +1494,78 @@ def export_schedule_csv(request: Request, payload: dict = Depends(require_auth))
     writer = csv.DictWriter(buf, fieldnames=fieldnames)
     writer.writeheader()
     writer.writerows(output_rows)
-    buf.seek(0)
-    from fastapi.responses import PlainTextResponse
-
-    clinic_name = data.get("clinic_name") or "schedule"
-    range_label = _schedule_date_range(data)
-    filename = f"{_slugify(clinic_name)}-{range_label}.csv" if range_label else f"{_slugify(clinic_name)}.csv"
-    ip, ip_v4, user_agent, location = _request_meta(request)
-    log_event(
-        payload.get("sub"),
-        "schedule_export",
-        f"format=csv;clinic={clinic_name};range={range_label or 'unknown'}",
-        ip,
-        user_agent,
-        location,
-        ip_v4,
-    )
-    return PlainTextResponse(
-        content=buf.getvalue(),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "X-Content-Type-Options": "nosniff",
-            "X-Download-Options": "noopen",
-            "Cache-Control": "no-store, must-revalidate",
-        },
-    )
+    return buf.getvalue().encode("utf-8"), "text/csv; charset=utf-8", _export_filename(data, "csv")
 
 
-@router.get("/schedule/export/excel")
-def export_schedule_excel(request: Request, payload: dict = Depends(require_auth)):
-    data = _latest_schedule_for(payload)
-    if not data or not data.get("assignments"):
-        raise HTTPException(status_code=404, detail="No saved schedule")
+def _build_excel_export(data: dict) -> tuple[bytes, str, str]:
     result, staff = _hydrate_schedule_result(data)
-    pto_entries = _hydrate_pto_entries(data)
     excel_bytes = export_schedule_to_excel(
         result,
         staff,
         export_roles=data.get("export_roles"),
-        pto_entries=pto_entries,
+        pto_entries=_hydrate_pto_entries(data),
     )
+    return excel_bytes, XLSX_MEDIA_TYPE, _export_filename(data, "xlsx")
+
+
+def _cached_export(data: dict, fmt: str, build) -> ExportArtifact:
+    key = export_key(fmt, data, export_roles=data.get("export_roles"))
+    artifact = _export_cache.get(key)
+    if artifact is None:
+        content, media_type, filename = build(data)
+        artifact = ExportArtifact(content=content, media_type=media_type, filename=filename, etag=f'"{key}"')
+        _export_cache.put(key, artifact)
+    return artifact
+
+
+def _prebuild_version_excel(owners: List[str], version_id: int) -> None:
+    try:
+        data = get_schedule_version(owners, version_id)
+        if data and data.get("assignments"):
+            _cached_export(data, "excel", _build_excel_export)
+    except Exception:
+        # Best effort; the download endpoint builds the workbook itself on a miss.
+        logger.exception("Failed to prebuild Excel export for schedule version %s", version_id)
+
+
+def _export_download(request: Request, payload: dict, data: dict | None, fmt: str, build) -> Response:
+    """
+    Serve an export of a saved schedule from the artifact cache, building it
+    on a miss. Clients revalidate with If-None-Match and get a 304 while the
+    schedule is unchanged.
+    """
+    if not data or not data.get("assignments"):
+        raise HTTPException(status_code=404, detail="No saved schedule")
+    artifact = _cached_export(data, fmt, build)
+
     clinic_name = data.get("clinic_name") or "schedule"
     range_label = _schedule_date_range(data)
-    filename = (
-        f"{_slugify(clinic_name)}-{range_label}.xlsx" if range_label else f"{_slugify(clinic_name)}.xlsx"
-    )
     ip, ip_v4, user_agent, location = _request_meta(request)
     log_event(
         payload.get("sub"),
         "schedule_export",
-        f"format=excel;clinic={clinic_name};range={range_label or 'unknown'}",
+        f"format={fmt};clinic={clinic_name};range={range_label or 'unknown'}",
         ip,
         user_agent,
         location,
         ip_v4,
     )
-    return Response(
-        content=excel_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "X-Content-Type-Options": "nosniff",
-            "X-Download-Options": "noopen",
-            "Cache-Control": "no-store, must-revalidate",
-        },
-    )
+    # Private and revalidated on every use: browsers keep the file but must check the ETag.
+    headers = {
+        "ETag": artifact.etag,
+        "Cache-Control": "private, no-cache",
+        "X-Content-Type-Options": "nosniff",
+        "X-Download-Options": "noopen",
+    }
+    if etag_matches(request.headers.get("if-none-match"), artifact.etag):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{artifact.filename}"'
+    return Response(content=artifact.content, media_type=artifact.media_type, headers=headers)
 
 
 @router.post("/schedule/import/csv")
 async def import_schedule_csv(request: Request, payload: dict = Depends(require_auth)) -> dict:
-    owner = _schedule_owner(payload)
+    owners = _schedule_owners(payload)
     form = await request.form()
     file = form.get("file")
     if not file:
@@ -1072,7 +1617,7 @@ async def import_schedule_csv(request: Request, payload: dict = Depends(require_
         "bleach_cursor": 0,
         "generated_at": datetime.utcnow().isoformat(),
     }
-    persist_schedule(owner, snapshot)
+    persist_schedule(owners, snapshot)
     ip, ip_v4, user_agent, location = _request_meta(request)
     log_event(
         payload.get("sub"),
@@ -0,0 +1,168 @@
+"""
+On-disk memo of tournament results, keyed by a canonical request hash.
+
+A tournament is reproducible only when its seeds are: callers hash the
+normalized request (staff, demand, config, PTO, trial settings, base seed) and
+skip the cache when no seed is fixed. Entries live in a small SQLite file so
+every API worker on the host shares them; they expire after `ttl_seconds` and
+the least recently used are dropped beyond `max_entries`. Hit and miss
+counters are kept in the same file.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from backend.scheduler.model import (
+    Assignment,
+    ScheduleResult,
+    ScheduleSlot,
+    TournamentReport,
+    TrialReport,
+)
+
+# Bump when scheduler changes would make old results differ for the same request.
+RESULT_FORMAT_VERSION = 1
+
+
+def request_key(fields: Dict[str, Any]) -> str:
+    """Stable hash of the result-relevant request fields."""
+    canonical = json.dumps(
+        {"v": RESULT_FORMAT_VERSION, "request": fields},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _encode_result(result: ScheduleResult, seed: int) -> bytes:
+    data = asdict(result)
+    for assignment in data["assignments"]:
+        assignment["slot"]["date"] = assignment["slot"]["date"].isoformat()
+    return zlib.compress(json.dumps({"seed": seed, "result": data}).encode("utf-8"))
+
+
+def _decode_result(blob: bytes) -> Tuple[ScheduleResult, int]:
+    data = json.loads(zlib.decompress(blob))
+    raw = data["result"]
+    assignments = []
+    for item in raw["assignments"]:
+        slot = dict(item["slot"], date=date.fromisoformat(item["slot"]["date"]))
+        assignments.append(Assignment(slot=ScheduleSlot(**slot), staff_id=item["staff_id"], notes=item["notes"]))
+    tournament = None
+    if raw.get("tournament"):
+        report = dict(raw["tournament"])
+        report["trials"] = [TrialReport(**trial) for trial in report["trials"]]
+        tournament = TournamentReport(**report)
+    result = ScheduleResult(
+        assignments=assignments,
+        bleach_cursor=raw["bleach_cursor"],
+        total_penalty=raw["total_penalty"],
+        stats=raw["stats"],
+        seed=raw["seed"],
+        tournament=tournament,
+    )
+    return result, data["seed"]
+
+
+class ResultCache:
+    def __init__(self, path: Path, *, max_entries: int, ttl_seconds: float) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        if self.enabled:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._conn() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS results (
+                        key TEXT PRIMARY KEY,
+                        data BLOB NOT NULL,
+                        created_at REAL NOT NULL,
+                        used_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_results_used ON results(used_at)")
+                conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                    [("hits",), ("misses",)],
+                )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; `with conn:` commits or rolls back.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[ScheduleResult, int]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT data FROM results WHERE key=? AND created_at > ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE results SET used_at=? WHERE key=?", (now, key))
+            conn.execute(
+                "UPDATE counters SET value = value + 1 WHERE name=?",
+                ("hits" if row is not None else "misses",),
+            )
+        return _decode_result(row[0]) if row is not None else None
+
+    def put(self, key: str, result: ScheduleResult, seed: int) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, data, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, _encode_result(result, seed), now, now),
+            )
+            conn.execute("DELETE FROM results WHERE created_at <= ?", (now - self.ttl_seconds,))
+            conn.execute(
+                """
+                DELETE FROM results WHERE key IN (
+                    SELECT key FROM results ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False, "entries": 0, "hits": 0, "misses": 0, "hit_rate": None}
+        with self._conn() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "enabled": True,
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime
 from typing import Dict, List, Optional, Literal
 
 try:
-    from pydantic import BaseModel, Field, conint, constr, validator  # type: ignore
+    from pydantic import BaseModel, Field, confloat, conint, constr, validator  # type: ignore
 except Exception:
     # Minimal fallback when pydantic is not available (prevents editor/linter errors).
     # This does not replicate pydantic's validation; it's only to allow imports and defaults.
@@ -23,6 +23,8 @@ except Exception:
         return default
     def conint(**kwargs):  # type: ignore
         return int
+    def confloat(**kwargs):  # type: ignore
+        return float
     def constr(**kwargs):  # type: ignore
         return str
     def validator(*args, **kwargs):  # type: ignore
@@ -36,6 +38,7 @@ DayName = Literal["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
 RoleName = Literal["Tech", "RN", "Admin"]
 BleachFrequency = Literal["weekly", "quarterly", "custom"]
 UserRole = Literal["user", "admin"]
+EngineName = Literal["reference", "numpy"]
 
 
 class BaseSchema(BaseModel):
@@ -120,9 +123,39 @@ class ScheduleRequest(BaseSchema):
     requirements: List[RequirementIn]
     config: ScheduleConfigIn
     pto: List[PTOEntryIn] = Field(default_factory=list)
-    tournament_trials: conint(ge=1) = 20
+    tournament_trials: conint(ge=1, le=10000) = 20
+    time_budget_seconds: Optional[confloat(gt=0, le=600)] = None
+    stagnation_limit: Optional[conint(ge=1)] = None
+    tournament_workers: Optional[conint(ge=0, le=64)] = None
+    engine: Optional[EngineName] = None
+    improve_iterations: conint(ge=0, le=200000) = 0
+    improve_seconds: Optional[confloat(gt=0, le=30)] = None
     base_seed: Optional[conint(ge=0)] = None
+    # Solve each role as its own tournament; winning_seed is then the shared base seed.
+    partitioned: bool = False
+    # Rolling horizon: optimize this many weeks at a time, with tournament_trials per window.
+    window_weeks: Optional[conint(ge=1, le=52)] = None
+    # Start from the owner's latest saved schedule and keep its assignments where possible.
+    warm_start: bool = False
+    # Fill each day's Tech slots as one optimal assignment instead of slot by slot.
+    day_matching: bool = False
     export_roles: List[RoleName] = Field(default_factory=list)
+    # Older clients read the workbook from `ScheduleResponse.excel`; others download it via `excel_url`.
+    inline_excel: bool = False
+
+
+class ScheduleChangesIn(BaseSchema):
+    pto_added: List[PTOEntryIn] = Field(default_factory=list)
+    staff_removed: List[str] = Field(default_factory=list)
+    # Replacement demand for the listed days.
+    requirements: List[RequirementIn] = Field(default_factory=list)
+
+
+class ScheduleRepairRequest(ScheduleRequest):
+    # The inputs above are the ones the saved schedule was generated from; `changes` apply on top.
+    changes: ScheduleChangesIn = Field(default_factory=ScheduleChangesIn)
+    # Saved version to repair; the owner's latest schedule when omitted.
+    version_id: Optional[int] = None
 
 
 class AssignmentOut(BaseSchema):
@@ -136,13 +169,70 @@ class AssignmentOut(BaseSchema):
     is_bleach: bool
 
 
+class TrialReportOut(BaseSchema):
+    index: conint(ge=0)
+    seed: int
+    total_penalty: float
+    elapsed_ms: float
+    pruned: bool = False
+    open_slots: Optional[int] = None
+    partition: Optional[RoleName] = None
+    window: Optional[conint(ge=0)] = None
+
+
+class TournamentOut(BaseSchema):
+    workers: conint(ge=1)
+    elapsed_ms: float
+    requested_trials: conint(ge=0)
+    trials_run: conint(ge=0)
+    stop_reason: str
+    trials: List[TrialReportOut] = Field(default_factory=list)
+    partition_seeds: Dict[str, int] = Field(default_factory=dict)
+    window_seeds: List[int] = Field(default_factory=list)
+
+
 class ScheduleResponse(BaseSchema):
     bleach_cursor: conint(ge=0)
     winning_seed: Optional[int]
     assignments: List[AssignmentOut]
     total_penalty: float
     stats: Dict[str, float]
-    excel: Optional[str]
+    excel: Optional[str] = None
+    version_id: Optional[int] = None
+    excel_url: Optional[str] = None
+    # True when the result was served from the memo of earlier seeded runs.
+    cached: bool = False
+    # Slots whose assignee differs from the repaired schedule (repairs only).
+    changed_slots: Optional[int] = None
+    tournament: Optional[TournamentOut] = None
+
+
+class ScheduleVersionOut(BaseSchema):
+    id: int
+    clinic_name: Optional[str] = None
+    start_date: Optional[date] = None
+    weeks: Optional[int] = None
+    digest: str
+    size: int  # uncompressed payload bytes
+    generated_at: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class JobSubmitResponse(BaseSchema):
+    job_id: str
+    status: str
+
+
+class JobStatusOut(BaseSchema):
+    job_id: str
+    status: str  # queued | running | succeeded | failed
+    trials_done: conint(ge=0) = 0
+    trials_total: conint(ge=0) = 0
+    best_penalty: Optional[float] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
 
 
 class ConfigClinic(BaseSchema):
@@ -3,26 +3,54 @@ from __future__ import annotations
 """
 Auth storage layer with two backends:
 - Postgres (recommended for production): set AUTH_BACKEND=postgres and DATABASE_URL
-- JSON file (fallback/dev): default if DATABASE_URL is missing
+- SQLite file (fallback/dev): default if DATABASE_URL is missing; imports a
+  legacy auth_store.json on first start
 """
 
+import atexit
 import json
+import logging
 import os
+import queue
 import secrets
 import base64
 import hashlib
+import sqlite3
+import threading
+import time
 import uuid
+import zlib
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple, Union
 
 # Config
 AUTH_BACKEND = os.getenv("AUTH_BACKEND", "json").lower()
 DATABASE_URL = os.getenv("DATABASE_URL")
-
-# JSON defaults
+# Postgres connection pool: connections kept open, hard cap, and idle seconds
+# after which a pooled connection is pinged before reuse.
+DB_POOL_MIN = int(os.getenv("AUTH_DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("AUTH_DB_POOL_MAX", "10"))
+DB_POOL_HEALTHCHECK_SECONDS = float(os.getenv("AUTH_DB_POOL_HEALTHCHECK_SECONDS", "30"))
+# Write-behind audit log: events are queued and inserted in batches by a background thread.
+AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "1").lower() not in ("0", "false", "no")
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "0.5"))
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "0.05"))
+# zlib level for stored schedule payloads (1 = fastest, 9 = smallest).
+SCHEDULE_COMPRESSION_LEVEL = int(os.getenv("SCHEDULE_COMPRESSION_LEVEL", "6"))
+
+logger = logging.getLogger(__name__)
+
+# (user_id, event, detail, ip, ip_v4, user_agent, location, created_at)
+AuditRow = Tuple[Optional[int], str, str, str, str, str, str, datetime]
+
+# Embedded store defaults; AUTH_STORE_PATH is the legacy JSON file imported on first start.
 DEFAULT_STORE = Path(__file__).resolve().parent.parent / "auth_store.json"
 STORE_PATH = Path(os.getenv("AUTH_STORE_PATH", str(DEFAULT_STORE)))
+DB_PATH = Path(os.getenv("AUTH_DB_PATH", str(STORE_PATH.with_name("auth.db"))))
 
 
 def _now() -> str:
@@ -66,7 +94,61 @@ def _check_password(password: str, stored: str) -> bool:
 
 
 # -----------------------
-# JSON backend helpers
+# Schedule history helpers
+# -----------------------
+def _owner_list(owners: Union[str, Iterable[str]]) -> List[str]:
+    if isinstance(owners, str):
+        owners = [owners]
+    return list(dict.fromkeys(o for o in owners if o))
+
+
+def _pack_schedule(payload: Dict[str, Any]) -> Tuple[str, bytes, int, Optional[str]]:
+    """
+    Canonical, compressed form of a schedule payload: (digest, blob, raw size,
+    generated_at). `generated_at` is kept on the version row instead of in the
+    blob, so re-running an unchanged schedule reuses the stored payload.
+    """
+    body = {k: v for k, v in payload.items() if k != "generated_at"}
+    raw = json.dumps(body, default=str, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    generated_at = payload.get("generated_at")
+    return (
+        hashlib.sha256(raw).hexdigest(),
+        zlib.compress(raw, SCHEDULE_COMPRESSION_LEVEL),
+        len(raw),
+        str(generated_at) if generated_at is not None else None,
+    )
+
+
+def _unpack_schedule(blob: bytes, generated_at: Optional[str]) -> Optional[Dict[str, Any]]:
+    try:
+        payload = json.loads(zlib.decompress(bytes(blob)))
+    except Exception:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if generated_at is not None:
+        payload["generated_at"] = generated_at
+    return payload
+
+
+def _schedule_meta(payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+    start = payload.get("start_date")
+    try:
+        start = datetime.fromisoformat(str(start)).date().isoformat() if start else None
+    except ValueError:
+        start = None
+    try:
+        weeks = int(payload["weeks"]) if payload.get("weeks") is not None else None
+    except (TypeError, ValueError):
+        weeks = None
+    return payload.get("clinic_name"), start, weeks
+
+
+_VERSION_COLUMNS = ["id", "owner", "clinic_name", "start_date", "weeks", "digest", "size", "generated_at", "created_at"]
+
+
+# -----------------------
+# Legacy JSON store (read for migration only)
 # -----------------------
 def _load_json() -> Dict[str, Any]:
     if not STORE_PATH.exists():
@@ -77,114 +159,197 @@ def _load_json() -> Dict[str, Any]:
         return {"users": [], "audit": []}
 
 
-def _save_json(data: Dict[str, Any]) -> None:
-    STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    tmp = STORE_PATH.with_suffix(".tmp")
-    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    tmp.replace(STORE_PATH)
-
-
-def _next_user_id(users: List[Dict[str, Any]]) -> int:
-    return (max((u.get("id", 0) for u in users), default=0) or 0) + 1
-
-
 # -----------------------
 # Postgres backend helpers
 # -----------------------
 class PostgresAuth:
-    def __init__(self, dsn: str):
+    def __init__(self, dsn: str, *, min_size: int = DB_POOL_MIN, max_size: int = DB_POOL_MAX):
         import psycopg2  # type: ignore
+        import psycopg2.pool  # type: ignore
 
         self.dsn = dsn
         self.psycopg2 = psycopg2
+        max_size = max(1, max_size)
+        self._pool = psycopg2.pool.ThreadedConnectionPool(max(0, min(min_size, max_size)), max_size, dsn)
+        # getconn() raises once the pool is exhausted; the semaphore makes callers wait instead.
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._last_used: Dict[int, float] = {}
+
+    def _healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        idle = time.monotonic() - self._last_used.get(id(conn), 0.0)
+        if idle < DB_POOL_HEALTHCHECK_SECONDS:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except self.psycopg2.Error:
+            return False
+
+    def _discard(self, conn) -> None:
+        self._last_used.pop(id(conn), None)
+        try:
+            self._pool.putconn(conn, close=True)
+        except Exception:
+            pass
+
+    def _checkout(self):
+        conn = self._pool.getconn()
+        if self._healthy(conn):
+            return conn
+        # Stale or dropped by the server: replace it with a fresh connection.
+        self._discard(conn)
+        return self._pool.getconn()
 
+    @contextmanager
     def _conn(self):
-        return self.psycopg2.connect(self.dsn)
+        """Borrow a pooled connection; commits on success and rolls back on error."""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                try:
+                    conn.rollback()
+                except self.psycopg2.Error:
+                    pass
+                raise
+        finally:
+            if conn is not None:
+                if conn.closed:
+                    self._discard(conn)
+                else:
+                    self._last_used[id(conn)] = time.monotonic()
+                    self._pool.putconn(conn)
+            self._slots.release()
+
+    def close(self):
+        self._pool.closeall()
 
     def init_db(self):
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT,
-                status TEXT NOT NULL DEFAULT 'pending',
-                license_key TEXT,
-                invite_token TEXT,
-                invite_expires_at TIMESTAMPTZ,
-                invite_created_by INTEGER,
-                last_invite_token TEXT,
-                public_id TEXT UNIQUE,
-                role TEXT NOT NULL DEFAULT 'user',
-                created_at TIMESTAMPTZ,
-                last_login TIMESTAMPTZ
-            );
-            """
-        )
-        # migrations for older tables
-        cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS last_invite_token TEXT;")
-        cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS invite_expires_at TIMESTAMPTZ;")
-        cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS invite_created_by INTEGER;")
-        cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS public_id TEXT UNIQUE;")
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS audit_log (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER,
-                event TEXT,
-                detail TEXT,
-                ip TEXT,
-                ip_v4 TEXT,
-                user_agent TEXT,
-                location TEXT,
-                created_at TIMESTAMPTZ,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
-            );
-            """
-        )
-        cur.execute("ALTER TABLE audit_log ADD COLUMN IF NOT EXISTS location TEXT;")
-        cur.execute("ALTER TABLE audit_log ADD COLUMN IF NOT EXISTS ip_v4 TEXT;")
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS configs (
-                id SERIAL PRIMARY KEY,
-                owner TEXT NOT NULL,
-                filename TEXT NOT NULL,
-                payload JSONB NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                updated_at TIMESTAMPTZ DEFAULT NOW(),
-                UNIQUE(owner, filename)
-            );
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS schedules (
-                id SERIAL PRIMARY KEY,
-                owner TEXT NOT NULL UNIQUE,
-                clinic_name TEXT,
-                start_date DATE,
-                weeks INTEGER,
-                payload JSONB NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                updated_at TIMESTAMPTZ DEFAULT NOW()
-            );
-            """
-        )
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id SERIAL PRIMARY KEY,
+                    username TEXT UNIQUE NOT NULL,
+                    password_hash TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    license_key TEXT,
+                    invite_token TEXT,
+                    invite_expires_at TIMESTAMPTZ,
+                    invite_created_by INTEGER,
+                    last_invite_token TEXT,
+                    public_id TEXT UNIQUE,
+                    role TEXT NOT NULL DEFAULT 'user',
+                    created_at TIMESTAMPTZ,
+                    last_login TIMESTAMPTZ
+                );
+                """
+            )
+            # migrations for older tables
+            cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS last_invite_token TEXT;")
+            cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS invite_expires_at TIMESTAMPTZ;")
+            cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS invite_created_by INTEGER;")
+            cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS public_id TEXT UNIQUE;")
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS audit_log (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER,
+                    event TEXT,
+                    detail TEXT,
+                    ip TEXT,
+                    ip_v4 TEXT,
+                    user_agent TEXT,
+                    location TEXT,
+                    created_at TIMESTAMPTZ,
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+                );
+                """
+            )
+            cur.execute("ALTER TABLE audit_log ADD COLUMN IF NOT EXISTS location TEXT;")
+            cur.execute("ALTER TABLE audit_log ADD COLUMN IF NOT EXISTS ip_v4 TEXT;")
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS configs (
+                    id SERIAL PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    payload JSONB NOT NULL,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    updated_at TIMESTAMPTZ DEFAULT NOW(),
+                    UNIQUE(owner, filename)
+                );
+                """
+            )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schedules (
+                    id SERIAL PRIMARY KEY,
+                    owner TEXT NOT NULL UNIQUE,
+                    clinic_name TEXT,
+                    start_date DATE,
+                    weeks INTEGER,
+                    payload JSONB NOT NULL,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    updated_at TIMESTAMPTZ DEFAULT NOW()
+                );
+                """
+            )
+            # schedule history: payloads stored once by content hash, one small version row per owner alias
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schedule_payloads (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    data BYTEA NOT NULL
+                );
+                """
+            )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schedule_versions (
+                    id SERIAL PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    clinic_name TEXT,
+                    start_date DATE,
+                    weeks INTEGER,
+                    digest TEXT NOT NULL REFERENCES schedule_payloads(digest),
+                    generated_at TEXT,
+                    created_at TIMESTAMPTZ DEFAULT NOW()
+                );
+                """
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_schedule_versions_owner ON schedule_versions(owner, id DESC);")
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_schedule_versions_clinic ON schedule_versions(owner, clinic_name, id DESC);"
+            )
+            # one-time copy of the old single-row-per-owner table into history
+            cur.execute(
+                "SELECT owner, payload FROM schedules s WHERE NOT EXISTS (SELECT 1 FROM schedule_versions v WHERE v.owner = s.owner)"
+            )
+            for owner, legacy in cur.fetchall():
+                legacy = legacy if isinstance(legacy, dict) else json.loads(legacy)
+                self._insert_schedule(cur, [owner], legacy)
 
     # --- admin helpers ---
     def list_users(self) -> List[Dict[str, Any]]:
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id, username, status, license_key, role, created_at, last_login, invite_expires_at, invite_created_by, last_invite_token, public_id, invite_token FROM users ORDER BY id"
-        )
-        rows = cur.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT id, username, status, license_key, role, created_at, last_login, invite_expires_at, invite_created_by, last_invite_token, public_id, invite_token FROM users ORDER BY id"
+            )
+            rows = cur.fetchall()
         keys = [
             "id",
             "username",
@@ -204,131 +369,151 @@ class PostgresAuth:
     def delete_user(self, user_id: int):
         # protect default admin
         admin_user = (os.getenv("ADMIN_USER", "admin") or "admin").strip()
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("SELECT username FROM users WHERE id=%s", (user_id,))
-        row = cur.fetchone()
-        if row and row[0] == admin_user:
-            conn.close()
-            raise ValueError("Cannot delete default admin user")
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM users WHERE id=%s", (user_id,))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT username FROM users WHERE id=%s", (user_id,))
+            row = cur.fetchone()
+            if row and row[0] == admin_user:
+                raise ValueError("Cannot delete default admin user")
+            cur.execute("DELETE FROM users WHERE id=%s", (user_id,))
 
     def revoke_invite(self, username: str):
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute(
-            "UPDATE users SET invite_token=NULL, invite_expires_at=NULL, status='disabled' WHERE username=%s",
-            (username.strip(),),
-        )
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "UPDATE users SET invite_token=NULL, invite_expires_at=NULL, status='disabled' WHERE username=%s",
+                (username.strip(),),
+            )
 
     def reset_invite(self, user_id: int, created_by: Optional[int] = None, ttl_hours: int = 24) -> str:
         token = secrets.token_hex(16)
         expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("SELECT username FROM users WHERE id=%s", (user_id,))
-        row = cur.fetchone()
-        if not row:
-            conn.close()
-            raise ValueError("User not found")
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT username FROM users WHERE id=%s", (user_id,))
+            row = cur.fetchone()
+            if not row:
+                raise ValueError("User not found")
+            cur.execute(
+                "UPDATE users SET invite_token=%s, invite_expires_at=%s, invite_created_by=%s WHERE id=%s",
+                (token, expires_at, created_by, user_id),
+            )
+
+    # --- schedule history ---
+    def _insert_schedule(self, cur, owners: List[str], payload: Dict[str, Any]) -> int:
+        from psycopg2.extras import execute_values  # type: ignore
+
+        digest, blob, size, generated_at = _pack_schedule(payload)
+        clinic_name, start_date, weeks = _schedule_meta(payload)
         cur.execute(
-            "UPDATE users SET invite_token=%s, invite_expires_at=%s, invite_created_by=%s WHERE id=%s",
-            (token, expires_at, created_by, user_id),
+            "INSERT INTO schedule_payloads (digest, size, data) VALUES (%s, %s, %s) ON CONFLICT (digest) DO NOTHING",
+            (digest, size, self.psycopg2.Binary(blob)),
         )
-        conn.commit()
-        conn.close()
-
-    # --- schedules (latest per owner) ---
-    def save_schedule(self, owner: str, payload: Dict[str, Any]) -> None:
-        conn = self._conn()
-        cur = conn.cursor()
-        serial = json.dumps(payload, default=str)
-        cur.execute(
-            """
-            INSERT INTO schedules (owner, clinic_name, start_date, weeks, payload, created_at, updated_at)
-            VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
-            ON CONFLICT (owner) DO UPDATE SET
-                clinic_name = EXCLUDED.clinic_name,
-                start_date = EXCLUDED.start_date,
-                weeks = EXCLUDED.weeks,
-                payload = EXCLUDED.payload,
-                updated_at = NOW();
-            """,
-            (
-                owner,
-                payload.get("clinic_name"),
-                payload.get("start_date"),
-                payload.get("weeks"),
-                serial,
-            ),
+        rows = execute_values(
+            cur,
+            "INSERT INTO schedule_versions (owner, clinic_name, start_date, weeks, digest, generated_at) VALUES %s RETURNING id",
+            [(owner, clinic_name, start_date, weeks, digest, generated_at) for owner in owners],
+            fetch=True,
         )
-        conn.commit()
-        conn.close()
+        return rows[0][0]
+
+    def save_schedule(self, owners: Union[str, Sequence[str]], payload: Dict[str, Any]) -> Optional[int]:
+        owners = _owner_list(owners)
+        if not owners:
+            return None
+        with self._conn() as conn:
+            return self._insert_schedule(conn.cursor(), owners, payload)
 
     def get_latest_schedule(self, owner: str) -> Optional[Dict[str, Any]]:
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("SELECT payload FROM schedules WHERE owner=%s", (owner,))
-        row = cur.fetchone()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT v.generated_at, p.data FROM schedule_versions v
+                JOIN schedule_payloads p ON p.digest = v.digest
+                WHERE v.owner=%s ORDER BY v.id DESC LIMIT 1
+                """,
+                (owner,),
+            )
+            row = cur.fetchone()
         if not row:
             return None
-        try:
-            return row[0] if isinstance(row[0], dict) else json.loads(row[0])
-        except Exception:
+        return _unpack_schedule(row[1], row[0])
+
+    def list_schedule_versions(
+        self, owners: Sequence[str], clinic_name: Optional[str] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        query = (
+            "SELECT v.id, v.owner, v.clinic_name, v.start_date, v.weeks, v.digest, p.size, v.generated_at, v.created_at "
+            "FROM schedule_versions v JOIN schedule_payloads p ON p.digest = v.digest WHERE v.owner = ANY(%s)"
+        )
+        params: list = [list(owners)]
+        if clinic_name:
+            query += " AND v.clinic_name = %s"
+            params.append(clinic_name)
+        query += " ORDER BY v.id DESC LIMIT %s"
+        params.append(limit)
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(query, tuple(params))
+            rows = cur.fetchall()
+        return [dict(zip(_VERSION_COLUMNS, r)) for r in rows]
+
+    def get_schedule_version(self, owners: Sequence[str], version_id: int) -> Optional[Dict[str, Any]]:
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT v.generated_at, p.data FROM schedule_versions v
+                JOIN schedule_payloads p ON p.digest = v.digest
+                WHERE v.id=%s AND v.owner = ANY(%s)
+                """,
+                (version_id, list(owners)),
+            )
+            row = cur.fetchone()
+        if not row:
             return None
+        return _unpack_schedule(row[1], row[0])
 
     def update_role(self, user_id: int, role: str):
-        conn = self._conn()
-        cur = conn.cursor()
         # protect default admin
         admin_user = (os.getenv("ADMIN_USER", "admin") or "admin").strip()
-        cur.execute("SELECT username FROM users WHERE id=%s", (user_id,))
-        row = cur.fetchone()
-        if row and row[0] == admin_user and role.lower() != "admin":
-            conn.close()
-            raise ValueError("Cannot demote default admin user")
-        cur.execute("UPDATE users SET role=%s WHERE id=%s", (role, user_id))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT username FROM users WHERE id=%s", (user_id,))
+            row = cur.fetchone()
+            if row and row[0] == admin_user and role.lower() != "admin":
+                raise ValueError("Cannot demote default admin user")
+            cur.execute("UPDATE users SET role=%s WHERE id=%s", (role, user_id))
 
     def ensure_admin(self, username: str, password: str, license_key: str = "DEMO"):
-        conn = self._conn()
-        cur = conn.cursor()
         pwd_hash = _hash_password(password)
         now = datetime.utcnow()
-        cur.execute(
-            """
-            INSERT INTO users (username, password_hash, status, license_key, role, created_at, public_id)
-            VALUES (%s, %s, 'active', %s, 'admin', %s, %s)
-            ON CONFLICT (username)
-            DO UPDATE SET password_hash = EXCLUDED.password_hash,
-                          status = 'active',
-                          license_key = EXCLUDED.license_key,
-                          role = 'admin',
-                          invite_token = NULL,
-                          public_id = COALESCE(users.public_id, EXCLUDED.public_id);
-            """,
-            (username.strip(), pwd_hash, license_key.strip(), now, str(uuid.uuid4())),
-        )
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO users (username, password_hash, status, license_key, role, created_at, public_id)
+                VALUES (%s, %s, 'active', %s, 'admin', %s, %s)
+                ON CONFLICT (username)
+                DO UPDATE SET password_hash = EXCLUDED.password_hash,
+                              status = 'active',
+                              license_key = EXCLUDED.license_key,
+                              role = 'admin',
+                              invite_token = NULL,
+                              public_id = COALESCE(users.public_id, EXCLUDED.public_id);
+                """,
+                (username.strip(), pwd_hash, license_key.strip(), now, str(uuid.uuid4())),
+            )
 
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id, username, password_hash, status, license_key, invite_token, invite_expires_at, invite_created_by, last_invite_token, public_id, role, created_at, last_login FROM users WHERE username=%s",
-            (username.strip(),),
-        )
-        row = cur.fetchone()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT id, username, password_hash, status, license_key, invite_token, invite_expires_at, invite_created_by, last_invite_token, public_id, role, created_at, last_login FROM users WHERE username=%s",
+                (username.strip(),),
+            )
+            row = cur.fetchone()
         if not row:
             return None
         keys = [
@@ -354,86 +539,80 @@ class PostgresAuth:
             return None
         if not user.get("license_key"):
             user["license_key"] = "DEMO"
-            conn = self._conn()
-            cur = conn.cursor()
-            cur.execute("UPDATE users SET license_key=%s WHERE id=%s", ("DEMO", user["id"]))
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                cur = conn.cursor()
+                cur.execute("UPDATE users SET license_key=%s WHERE id=%s", ("DEMO", user["id"]))
         if not user.get("password_hash") or not _check_password(password, user["password_hash"]):
             return None
         if _is_legacy_hash(user["password_hash"]):
-            user["password_hash"] = _hash_password(password)
-            self._update_user(user)
+            pwd_hash = _hash_password(password)
+            with self._conn() as conn:
+                cur = conn.cursor()
+                cur.execute("UPDATE users SET password_hash=%s WHERE id=%s", (pwd_hash, user["id"]))
+            user["password_hash"] = pwd_hash
         return user
 
     def create_invite(self, username: str, license_key: str, role: str = "user", created_by: Optional[int] = None, ttl_hours: int = 24) -> str:
         token = secrets.token_hex(16)
         expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
-        conn = self._conn()
-        cur = conn.cursor()
         desired_user = username.strip() or f"user-{token[:8]}"
-        cur.execute(
-            """
-            INSERT INTO users (username, status, license_key, invite_token, role, created_at, public_id)
-            VALUES (%s, 'pending', %s, %s, %s, %s, %s)
-            ON CONFLICT (username)
-            DO UPDATE SET status='pending',
-                          license_key=EXCLUDED.license_key,
-                          invite_token=EXCLUDED.invite_token,
-                          role=EXCLUDED.role,
-                          public_id=COALESCE(users.public_id, EXCLUDED.public_id);
-            """,
-            (desired_user, license_key.strip(), token, role, datetime.utcnow(), str(uuid.uuid4())),
-        )
-        # set expiry and creator
-        cur.execute(
-            "UPDATE users SET invite_expires_at=%s, invite_created_by=%s, public_id=COALESCE(public_id, %s) WHERE username=%s",
-            (expires_at, created_by, str(uuid.uuid4()), desired_user),
-        )
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO users (username, status, license_key, invite_token, role, created_at, public_id)
+                VALUES (%s, 'pending', %s, %s, %s, %s, %s)
+                ON CONFLICT (username)
+                DO UPDATE SET status='pending',
+                              license_key=EXCLUDED.license_key,
+                              invite_token=EXCLUDED.invite_token,
+                              role=EXCLUDED.role,
+                              public_id=COALESCE(users.public_id, EXCLUDED.public_id);
+                """,
+                (desired_user, license_key.strip(), token, role, datetime.utcnow(), str(uuid.uuid4())),
+            )
+            # set expiry and creator
+            cur.execute(
+                "UPDATE users SET invite_expires_at=%s, invite_created_by=%s, public_id=COALESCE(public_id, %s) WHERE username=%s",
+                (expires_at, created_by, str(uuid.uuid4()), desired_user),
+            )
         return token
 
     def redeem_invite(self, invite_token: str, password: str, desired_username: Optional[str] = None) -> Optional[Dict[str, Any]]:
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id, username, status, license_key, role, invite_token, invite_expires_at, invite_created_by, public_id FROM users WHERE invite_token=%s",
-            (invite_token,),
-        )
-        row = cur.fetchone()
-        if not row:
-            conn.close()
-            return None
-        user_id, username, status, license_key, role, inv, expires_at, inv_created_by, public_id = row
-        if expires_at:
-            now = datetime.now(timezone.utc)
-            exp = expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=timezone.utc)
-            exp = exp.astimezone(timezone.utc)
-            if now > exp:
-                conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT id, username, status, license_key, role, invite_token, invite_expires_at, invite_created_by, public_id FROM users WHERE invite_token=%s",
+                (invite_token,),
+            )
+            row = cur.fetchone()
+            if not row:
                 return None
-        # allow username change on redeem if requested and unique
-        if desired_username and desired_username.strip() and desired_username.strip() != username:
-            desired = desired_username.strip()
-            cur.execute("SELECT 1 FROM users WHERE username=%s", (desired,))
-            if cur.fetchone():
-                conn.close()
-                raise ValueError("Username already exists")
-            username = desired
-            cur.execute("UPDATE users SET username=%s WHERE id=%s", (username, user_id))
-        pwd_hash = _hash_password(password)
-        cur.execute(
-            "UPDATE users SET password_hash=%s, status='active', last_invite_token=%s, invite_token=NULL WHERE id=%s",
-            (pwd_hash, inv, user_id),
-        )
-        conn.commit()
-        cur.execute(
-            "SELECT id, username, password_hash, status, license_key, invite_token, invite_expires_at, invite_created_by, last_invite_token, public_id, role, created_at, last_login FROM users WHERE id=%s",
-            (user_id,),
-        )
-        updated = cur.fetchone()
-        conn.close()
+            user_id, username, status, license_key, role, inv, expires_at, inv_created_by, public_id = row
+            if expires_at:
+                now = datetime.now(timezone.utc)
+                exp = expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=timezone.utc)
+                exp = exp.astimezone(timezone.utc)
+                if now > exp:
+                    return None
+            # allow username change on redeem if requested and unique
+            if desired_username and desired_username.strip() and desired_username.strip() != username:
+                desired = desired_username.strip()
+                cur.execute("SELECT 1 FROM users WHERE username=%s", (desired,))
+                if cur.fetchone():
+                    raise ValueError("Username already exists")
+                username = desired
+                cur.execute("UPDATE users SET username=%s WHERE id=%s", (username, user_id))
+            pwd_hash = _hash_password(password)
+            cur.execute(
+                "UPDATE users SET password_hash=%s, status='active', last_invite_token=%s, invite_token=NULL WHERE id=%s",
+                (pwd_hash, inv, user_id),
+            )
+            cur.execute(
+                "SELECT id, username, password_hash, status, license_key, invite_token, invite_expires_at, invite_created_by, last_invite_token, public_id, role, created_at, last_login FROM users WHERE id=%s",
+                (user_id,),
+            )
+            updated = cur.fetchone()
         keys = [
             "id",
             "username",
@@ -452,11 +631,9 @@ class PostgresAuth:
         return dict(zip(keys, updated)) if updated else None
 
     def update_last_login(self, user_id: int):
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("UPDATE users SET last_login=%s WHERE id=%s", (datetime.utcnow(), user_id))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute("UPDATE users SET last_login=%s WHERE id=%s", (datetime.utcnow(), user_id))
 
     def log_event(
         self,
@@ -468,17 +645,19 @@ class PostgresAuth:
         location: str = "",
         ip_v4: str = "",
     ):
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO audit_log (user_id, event, detail, ip, ip_v4, user_agent, location, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (user_id, event, detail, ip, ip_v4, user_agent, location, datetime.utcnow()),
-        )
-        conn.commit()
-        conn.close()
+        self.log_events([(user_id, event, detail, ip, ip_v4, user_agent, location, datetime.utcnow())])
+
+    def log_events(self, rows: Sequence[AuditRow]):
+        from psycopg2.extras import execute_values  # type: ignore
+
+        with self._conn() as conn:
+            cur = conn.cursor()
+            execute_values(
+                cur,
+                "INSERT INTO audit_log (user_id, event, detail, ip, ip_v4, user_agent, location, created_at) VALUES %s",
+                list(rows),
+                page_size=max(1, len(rows)),
+            )
 
     def list_audit(
         self,
@@ -487,8 +666,6 @@ class PostgresAuth:
         user_id: Optional[int] = None,
         search: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        conn = self._conn()
-        cur = conn.cursor()
         query = "SELECT id, user_id, event, detail, ip, ip_v4, user_agent, location, created_at FROM audit_log"
         clauses = []
         params: list = []
@@ -508,103 +685,222 @@ class PostgresAuth:
             query += " WHERE " + " AND ".join(clauses)
         query += " ORDER BY id DESC LIMIT %s"
         params.append(limit)
-        cur.execute(query, tuple(params))
-        rows = cur.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(query, tuple(params))
+            rows = cur.fetchall()
         keys = ["id", "user_id", "event", "detail", "ip", "ip_v4", "user_agent", "location", "created_at"]
         return [dict(zip(keys, r)) for r in rows]
 
     # --- configs ---
     def list_configs(self, owner: str) -> List[str]:
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("SELECT filename FROM configs WHERE owner=%s ORDER BY filename", (owner,))
-        rows = cur.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT filename FROM configs WHERE owner=%s ORDER BY filename", (owner,))
+            rows = cur.fetchall()
         return [r[0] for r in rows]
 
     def load_config(self, owner: str, filename: str) -> Optional[dict]:
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("SELECT payload FROM configs WHERE owner=%s AND filename=%s", (owner, filename))
-        row = cur.fetchone()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT payload FROM configs WHERE owner=%s AND filename=%s", (owner, filename))
+            row = cur.fetchone()
         if not row:
             return None
         return row[0]
 
     def save_config(self, owner: str, filename: str, payload: dict):
-        conn = self._conn()
-        cur = conn.cursor()
         # Ensure all values are JSON-serializable (e.g., date -> ISO string)
         payload_json = json.dumps(payload, default=str)
-        cur.execute(
-            """
-            INSERT INTO configs (owner, filename, payload, created_at, updated_at)
-            VALUES (%s, %s, %s::jsonb, NOW(), NOW())
-            ON CONFLICT (owner, filename)
-            DO UPDATE SET payload=EXCLUDED.payload, updated_at=NOW();
-            """,
-            (owner, filename, payload_json),
-        )
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO configs (owner, filename, payload, created_at, updated_at)
+                VALUES (%s, %s, %s::jsonb, NOW(), NOW())
+                ON CONFLICT (owner, filename)
+                DO UPDATE SET payload=EXCLUDED.payload, updated_at=NOW();
+                """,
+                (owner, filename, payload_json),
+            )
 
     def delete_config(self, owner: str, filename: str):
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM configs WHERE owner=%s AND filename=%s", (owner, filename))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM configs WHERE owner=%s AND filename=%s", (owner, filename))
 
 # -----------------------
-# JSON backend (fallback)
+# SQLite backend (fallback)
 # -----------------------
-class JsonAuth:
+_USER_COLUMNS = [
+    "id",
+    "username",
+    "password_hash",
+    "status",
+    "license_key",
+    "invite_token",
+    "invite_expires_at",
+    "invite_created_by",
+    "last_invite_token",
+    "public_id",
+    "role",
+    "created_at",
+    "last_login",
+]
+_AUDIT_COLUMNS = ["id", "user_id", "event", "detail", "ip", "ip_v4", "user_agent", "location", "created_at"]
+
+
+class SqliteAuth:
+    """
+    Single-file store for dev and small deployments. WAL mode lets readers run
+    alongside the single writer; every operation touches only its own rows.
+    """
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        """Per-thread connection wrapped in a transaction."""
+        conn = self._connection()
+        with conn:
+            yield conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
     def init_db(self):
-        if not STORE_PATH.exists():
-            _save_json({"users": [], "audit": []})
+        with self._conn() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    password_hash TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    license_key TEXT,
+                    invite_token TEXT,
+                    invite_expires_at TEXT,
+                    invite_created_by INTEGER,
+                    last_invite_token TEXT,
+                    public_id TEXT UNIQUE,
+                    role TEXT NOT NULL DEFAULT 'user',
+                    created_at TEXT,
+                    last_login TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_users_invite_token ON users(invite_token);
+                CREATE TABLE IF NOT EXISTS audit_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    event TEXT,
+                    detail TEXT,
+                    ip TEXT,
+                    ip_v4 TEXT,
+                    user_agent TEXT,
+                    location TEXT,
+                    created_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_audit_event ON audit_log(event, id);
+                CREATE INDEX IF NOT EXISTS idx_audit_user ON audit_log(user_id, id);
+                CREATE TABLE IF NOT EXISTS configs (
+                    owner TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (owner, filename)
+                );
+                CREATE TABLE IF NOT EXISTS schedule_payloads (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created_at TEXT,
+                    data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS schedule_versions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    owner TEXT NOT NULL,
+                    clinic_name TEXT,
+                    start_date TEXT,
+                    weeks INTEGER,
+                    digest TEXT NOT NULL REFERENCES schedule_payloads(digest),
+                    generated_at TEXT,
+                    created_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_schedule_versions_owner ON schedule_versions(owner, id);
+                CREATE INDEX IF NOT EXISTS idx_schedule_versions_clinic ON schedule_versions(owner, clinic_name, id);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                """
+            )
+            self._migrate_json(conn)
+
+    def _migrate_json(self, conn: sqlite3.Connection) -> None:
+        """One-time import of the legacy auth_store.json; the file is left in place."""
+        if conn.execute("SELECT 1 FROM meta WHERE key='json_migrated'").fetchone():
+            return
+        data = _load_json() if STORE_PATH.exists() else {}
+        for user in data.get("users", []):
+            row = {col: user.get(col) for col in _USER_COLUMNS}
+            conn.execute(
+                f"INSERT OR IGNORE INTO users ({', '.join(_USER_COLUMNS)}) VALUES ({', '.join('?' * len(_USER_COLUMNS))})",
+                [row[col] for col in _USER_COLUMNS],
+            )
+        for entry in data.get("audit", []):
+            conn.execute(
+                f"INSERT OR IGNORE INTO audit_log ({', '.join(_AUDIT_COLUMNS)}) VALUES ({', '.join('?' * len(_AUDIT_COLUMNS))})",
+                [entry.get(col) for col in _AUDIT_COLUMNS],
+            )
+        for cfg in data.get("configs", []):
+            conn.execute(
+                "INSERT OR IGNORE INTO configs (owner, filename, payload) VALUES (?, ?, ?)",
+                (cfg.get("owner"), cfg.get("filename"), json.dumps(cfg.get("payload"), default=str)),
+            )
+        for owner, entry in (data.get("schedules") or {}).items():
+            if isinstance(entry.get("payload"), dict):
+                self._insert_schedule(conn, [owner], entry["payload"])
+        conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (_now(),))
 
     def ensure_admin(self, username: str, password: str, license_key: str = "DEMO"):
-        data = _load_json()
-        users = data.get("users", [])
-        existing = next((u for u in users if u.get("username") == username), None)
         pwd_hash = _hash_password(password)
-        now = _now()
-        if existing:
-            existing.update(
-                {
-                    "password_hash": pwd_hash,
-                    "status": "active",
-                    "role": "admin",
-                    "license_key": license_key,
-                    "invite_token": None,
-                    "last_invite_token": existing.get("last_invite_token"),
-                    "public_id": existing.get("public_id") or str(uuid.uuid4()),
-                }
-            )
-        else:
-            users.append(
-                {
-                    "id": _next_user_id(users),
-                    "username": username,
-                    "password_hash": pwd_hash,
-                    "status": "active",
-                    "license_key": license_key,
-                    "role": "admin",
-                    "invite_token": None,
-                    "last_invite_token": None,
-                    "public_id": str(uuid.uuid4()),
-                    "created_at": now,
-                    "last_login": None,
-                }
-            )
-        data["users"] = users
-        _save_json(data)
+        with self._conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO users (username, password_hash, status, license_key, role, created_at, public_id)
+                VALUES (?, ?, 'active', ?, 'admin', ?, ?)
+                ON CONFLICT (username)
+                DO UPDATE SET password_hash = excluded.password_hash,
+                              status = 'active',
+                              license_key = excluded.license_key,
+                              role = 'admin',
+                              invite_token = NULL,
+                              public_id = COALESCE(users.public_id, excluded.public_id)
+                """,
+                (username, pwd_hash, license_key, _now(), str(uuid.uuid4())),
+            )
 
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
-        data = _load_json()
-        return next((u for u in data.get("users", []) if u.get("username") == username.strip()), None)
+        with self._conn() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_USER_COLUMNS)} FROM users WHERE username=?", (username.strip(),)
+            ).fetchone()
+        return dict(row) if row else None
 
     def validate_login(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         user = self.get_user_by_username(username)
@@ -612,113 +908,87 @@ class JsonAuth:
             return None
         if not user.get("license_key"):
             user["license_key"] = "DEMO"
-            self._update_user(user)
+            with self._conn() as conn:
+                conn.execute("UPDATE users SET license_key=? WHERE id=?", ("DEMO", user["id"]))
         if not user.get("password_hash") or not _check_password(password, user["password_hash"]):
             return None
         if _is_legacy_hash(user["password_hash"]):
             pwd_hash = _hash_password(password)
-            conn = self._conn()
-            cur = conn.cursor()
-            cur.execute("UPDATE users SET password_hash=%s WHERE id=%s", (pwd_hash, user["id"]))
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                conn.execute("UPDATE users SET password_hash=? WHERE id=?", (pwd_hash, user["id"]))
             user["password_hash"] = pwd_hash
         return user
 
-    def _update_user(self, user: Dict[str, Any]) -> None:
-        data = _load_json()
-        users = data.get("users", [])
-        for idx, u in enumerate(users):
-            if u.get("id") == user.get("id"):
-                users[idx] = user
-                break
-        else:
-            users.append(user)
-        data["users"] = users
-        _save_json(data)
-
     def create_invite(self, username: str, license_key: str, role: str = "user", created_by: Optional[int] = None, ttl_hours: int = 24) -> str:
         token = secrets.token_hex(16)
-        now = _now()
         expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
-        data = _load_json()
-        users = data.get("users", [])
         desired_user = username.strip() or f"user-{token[:8]}"
-        existing = next((u for u in users if u.get("username") == desired_user), None)
-        if existing:
-            existing.update(
-                {
-                    "status": "pending",
-                    "license_key": license_key.strip(),
-                    "invite_token": token,
-                    "invite_expires_at": expires_at.isoformat(),
-                    "invite_created_by": created_by,
-                    "last_invite_token": existing.get("last_invite_token"),
-                    "public_id": existing.get("public_id") or str(uuid.uuid4()),
-                    "role": role,
-                }
-            )
-        else:
-            users.append(
-                {
-                    "id": _next_user_id(users),
-                    "username": desired_user,
-                    "status": "pending",
-                    "license_key": license_key.strip(),
-                    "invite_token": token,
-                    "invite_expires_at": expires_at.isoformat(),
-                    "invite_created_by": created_by,
-                    "last_invite_token": None,
-                    "public_id": str(uuid.uuid4()),
-                    "role": role,
-                    "password_hash": None,
-                    "created_at": now,
-                    "last_login": None,
-                }
-            )
-        data["users"] = users
-        _save_json(data)
+        with self._conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO users (username, status, license_key, invite_token, invite_expires_at,
+                                   invite_created_by, role, created_at, public_id)
+                VALUES (?, 'pending', ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (username)
+                DO UPDATE SET status='pending',
+                              license_key=excluded.license_key,
+                              invite_token=excluded.invite_token,
+                              invite_expires_at=excluded.invite_expires_at,
+                              invite_created_by=excluded.invite_created_by,
+                              role=excluded.role,
+                              public_id=COALESCE(users.public_id, excluded.public_id)
+                """,
+                (
+                    desired_user,
+                    license_key.strip(),
+                    token,
+                    expires_at.isoformat(),
+                    created_by,
+                    role,
+                    _now(),
+                    str(uuid.uuid4()),
+                ),
+            )
         return token
 
     def redeem_invite(self, invite_token: str, password: str, desired_username: Optional[str] = None) -> Optional[Dict[str, Any]]:
-        data = _load_json()
-        users = data.get("users", [])
-        target = next((u for u in users if u.get("invite_token") == invite_token), None)
-        if not target:
-            return None
-        expires = target.get("invite_expires_at")
-        if expires:
-            try:
-                exp_dt = datetime.fromisoformat(expires)
-                if exp_dt.tzinfo is None:
-                    exp_dt = exp_dt.replace(tzinfo=timezone.utc)
-                exp_dt = exp_dt.astimezone(timezone.utc)
-                if datetime.now(timezone.utc) > exp_dt:
-                    return None
-            except Exception:
+        with self._conn() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_USER_COLUMNS)} FROM users WHERE invite_token=?", (invite_token,)
+            ).fetchone()
+            if not row:
                 return None
-        # allow username change if requested and unique
-        if desired_username and desired_username.strip() and desired_username.strip() != target.get("username"):
-            desired = desired_username.strip()
-            if any(u.get("username") == desired for u in users):
-                raise ValueError("Username already exists")
-            target["username"] = desired
-        target["password_hash"] = _hash_password(password)
-        target["status"] = "active"
-        target["last_invite_token"] = target.get("invite_token")
-        target["invite_token"] = None
-        self._update_user(target)
+            target = dict(row)
+            expires = target.get("invite_expires_at")
+            if expires:
+                try:
+                    exp_dt = datetime.fromisoformat(expires)
+                    if exp_dt.tzinfo is None:
+                        exp_dt = exp_dt.replace(tzinfo=timezone.utc)
+                    exp_dt = exp_dt.astimezone(timezone.utc)
+                    if datetime.now(timezone.utc) > exp_dt:
+                        return None
+                except Exception:
+                    return None
+            # allow username change if requested and unique
+            if desired_username and desired_username.strip() and desired_username.strip() != target.get("username"):
+                desired = desired_username.strip()
+                if conn.execute("SELECT 1 FROM users WHERE username=?", (desired,)).fetchone():
+                    raise ValueError("Username already exists")
+                target["username"] = desired
+            target["password_hash"] = _hash_password(password)
+            target["status"] = "active"
+            target["last_invite_token"] = target.get("invite_token")
+            target["invite_token"] = None
+            conn.execute(
+                "UPDATE users SET username=?, password_hash=?, status='active', last_invite_token=?, invite_token=NULL WHERE id=?",
+                (target["username"], target["password_hash"], target["last_invite_token"], target["id"]),
+            )
         return target
 
     def update_last_login(self, user_id: int):
-        data = _load_json()
-        users = data.get("users", [])
-        for u in users:
-            if u.get("id") == user_id:
-                u["last_login"] = _now()
-                break
-        data["users"] = users
-        _save_json(data)
+        with self._conn() as conn:
+            conn.execute("UPDATE users SET last_login=? WHERE id=?", (_now(), user_id))
 
     def log_event(
         self,
@@ -730,23 +1000,17 @@ class JsonAuth:
         location: str = "",
         ip_v4: str = "",
     ):
-        data = _load_json()
-        audit = data.get("audit", [])
-        audit.append(
-            {
-                "id": (max((r.get("id", 0) for r in audit), default=0) or 0) + 1,
-                "user_id": user_id,
-                "event": event,
-                "detail": detail,
-                "ip": ip,
-                "ip_v4": ip_v4,
-                "user_agent": user_agent,
-                "location": location,
-                "created_at": _now(),
-            }
-        )
-        data["audit"] = audit
-        _save_json(data)
+        self.log_events([(user_id, event, detail, ip, ip_v4, user_agent, location, datetime.utcnow())])
+
+    def log_events(self, rows: Sequence[AuditRow]):
+        with self._conn() as conn:
+            conn.executemany(
+                """
+                INSERT INTO audit_log (user_id, event, detail, ip, ip_v4, user_agent, location, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [row[:-1] + (row[-1].isoformat(),) for row in rows],
+            )
 
     def list_audit(
         self,
@@ -755,137 +1019,262 @@ class JsonAuth:
         user_id: Optional[int] = None,
         search: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        data = _load_json()
-        audit = data.get("audit", [])
-        entries = list(reversed(audit))
+        query = f"SELECT {', '.join(_AUDIT_COLUMNS)} FROM audit_log"
+        clauses = []
+        params: list = []
         if event:
-            entries = [row for row in entries if row.get("event") == event]
+            clauses.append("event = ?")
+            params.append(event)
         if user_id is not None:
-            entries = [row for row in entries if row.get("user_id") == user_id]
+            clauses.append("user_id = ?")
+            params.append(user_id)
         if search:
-            term = search.lower()
-            entries = [
-                row
-                for row in entries
-                if term in (row.get("event") or "").lower()
-                or term in (row.get("detail") or "").lower()
-                or term in (row.get("ip") or "").lower()
-                or term in (row.get("ip_v4") or "").lower()
-                or term in (row.get("user_agent") or "").lower()
-                or term in (row.get("location") or "").lower()
-            ]
-        return entries[:limit]
+            fields = ("event", "detail", "ip", "ip_v4", "user_agent", "location")
+            clauses.append("(" + " OR ".join(f"instr(lower(coalesce({f}, '')), ?) > 0" for f in fields) + ")")
+            params.extend([search.lower()] * len(fields))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._conn() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(r) for r in rows]
 
     # --- configs ---
     def list_configs(self, owner: str) -> List[str]:
-        data = _load_json()
-        cfgs = data.get("configs", [])
-        return sorted([c.get("filename") for c in cfgs if c.get("owner") == owner])
+        with self._conn() as conn:
+            rows = conn.execute("SELECT filename FROM configs WHERE owner=? ORDER BY filename", (owner,)).fetchall()
+        return [r[0] for r in rows]
 
     def load_config(self, owner: str, filename: str) -> Optional[dict]:
-        data = _load_json()
-        cfgs = data.get("configs", [])
-        for c in cfgs:
-            if c.get("owner") == owner and c.get("filename") == filename:
-                return c.get("payload")
-        return None
+        with self._conn() as conn:
+            row = conn.execute("SELECT payload FROM configs WHERE owner=? AND filename=?", (owner, filename)).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0])
 
     def save_config(self, owner: str, filename: str, payload: dict):
         # Ensure serializable payload (e.g., date -> ISO string)
-        payload = json.loads(json.dumps(payload, default=str))
-        data = _load_json()
-        cfgs = data.get("configs", [])
-        updated = False
-        for c in cfgs:
-            if c.get("owner") == owner and c.get("filename") == filename:
-                c["payload"] = payload
-                updated = True
-                break
-        if not updated:
-            cfgs.append({"owner": owner, "filename": filename, "payload": payload})
-        data["configs"] = cfgs
-        _save_json(data)
+        payload_json = json.dumps(payload, default=str)
+        now = _now()
+        with self._conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO configs (owner, filename, payload, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (owner, filename)
+                DO UPDATE SET payload=excluded.payload, updated_at=excluded.updated_at
+                """,
+                (owner, filename, payload_json, now, now),
+            )
 
     def delete_config(self, owner: str, filename: str):
-        data = _load_json()
-        cfgs = data.get("configs", [])
-        data["configs"] = [c for c in cfgs if not (c.get("owner") == owner and c.get("filename") == filename)]
-        _save_json(data)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM configs WHERE owner=? AND filename=?", (owner, filename))
 
     # --- admin helpers ---
     def list_users(self) -> List[Dict[str, Any]]:
-        data = _load_json()
-        return data.get("users", [])
+        columns = [col for col in _USER_COLUMNS if col != "password_hash"]
+        with self._conn() as conn:
+            rows = conn.execute(f"SELECT {', '.join(columns)} FROM users ORDER BY id").fetchall()
+        return [dict(r) for r in rows]
 
     def delete_user(self, user_id: int):
-        data = _load_json()
         admin_user = (os.getenv("ADMIN_USER", "admin") or "admin").strip()
-        keep = []
-        for u in data.get("users", []):
-            if u.get("id") == user_id and u.get("username") == admin_user:
+        with self._conn() as conn:
+            row = conn.execute("SELECT username FROM users WHERE id=?", (user_id,)).fetchone()
+            if row and row[0] == admin_user:
                 raise ValueError("Cannot delete default admin user")
-            if u.get("id") != user_id:
-                keep.append(u)
-        data["users"] = keep
-        _save_json(data)
+            conn.execute("DELETE FROM users WHERE id=?", (user_id,))
 
     def revoke_invite(self, username: str):
-        data = _load_json()
-        users = data.get("users", [])
-        for u in users:
-            if u.get("username") == username.strip():
-                u["invite_token"] = None
-                u["invite_expires_at"] = None
-                u["status"] = "disabled"
-        data["users"] = users
-        _save_json(data)
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE users SET invite_token=NULL, invite_expires_at=NULL, status='disabled' WHERE username=?",
+                (username.strip(),),
+            )
 
     def reset_invite(self, user_id: int, created_by: Optional[int] = None, ttl_hours: int = 24) -> str:
         token = secrets.token_hex(16)
         expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
-        data = _load_json()
-        users = data.get("users", [])
-        found = False
-        for u in users:
-            if u.get("id") == user_id:
-                u["invite_token"] = token
-                u["invite_expires_at"] = expires_at.isoformat()
-                u["invite_created_by"] = created_by
-                found = True
-                break
-        if not found:
-            raise ValueError("User not found")
-        data["users"] = users
-        _save_json(data)
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE users SET invite_token=?, invite_expires_at=?, invite_created_by=? WHERE id=?",
+                (token, expires_at.isoformat(), created_by, user_id),
+            )
+            if cur.rowcount == 0:
+                raise ValueError("User not found")
         return token
 
     def update_role(self, user_id: int, role: str):
-        data = _load_json()
         admin_user = (os.getenv("ADMIN_USER", "admin") or "admin").strip()
-        for u in data.get("users", []):
-            if u.get("id") == user_id:
-                if u.get("username") == admin_user and role.lower() != "admin":
-                    raise ValueError("Cannot demote default admin user")
-                u["role"] = role
-        _save_json(data)
-
-    # --- schedules (latest per owner) ---
-    def save_schedule(self, owner: str, payload: Dict[str, Any]) -> None:
-        data = _load_json()
-        schedules = data.get("schedules", {})
-        safe_payload = json.loads(json.dumps(payload, default=str))
-        schedules[owner] = {"payload": safe_payload, "updated_at": _now()}
-        data["schedules"] = schedules
-        _save_json(data)
+        with self._conn() as conn:
+            row = conn.execute("SELECT username FROM users WHERE id=?", (user_id,)).fetchone()
+            if row and row[0] == admin_user and role.lower() != "admin":
+                raise ValueError("Cannot demote default admin user")
+            conn.execute("UPDATE users SET role=? WHERE id=?", (role, user_id))
+
+    # --- schedule history ---
+    def _insert_schedule(self, conn: sqlite3.Connection, owners: List[str], payload: Dict[str, Any]) -> int:
+        digest, blob, size, generated_at = _pack_schedule(payload)
+        clinic_name, start_date, weeks = _schedule_meta(payload)
+        now = _now()
+        conn.execute(
+            "INSERT OR IGNORE INTO schedule_payloads (digest, size, created_at, data) VALUES (?, ?, ?, ?)",
+            (digest, size, now, blob),
+        )
+        conn.executemany(
+            """
+            INSERT INTO schedule_versions (owner, clinic_name, start_date, weeks, digest, generated_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(owner, clinic_name, start_date, weeks, digest, generated_at, now) for owner in owners],
+        )
+        return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+    def save_schedule(self, owners: Union[str, Sequence[str]], payload: Dict[str, Any]) -> Optional[int]:
+        owners = _owner_list(owners)
+        if not owners:
+            return None
+        with self._conn() as conn:
+            return self._insert_schedule(conn, owners, payload)
 
     def get_latest_schedule(self, owner: str) -> Optional[Dict[str, Any]]:
-        data = _load_json()
-        schedules = data.get("schedules", {})
-        entry = schedules.get(owner)
-        if not entry:
+        with self._conn() as conn:
+            row = conn.execute(
+                """
+                SELECT v.generated_at, p.data FROM schedule_versions v
+                JOIN schedule_payloads p ON p.digest = v.digest
+                WHERE v.owner=? ORDER BY v.id DESC LIMIT 1
+                """,
+                (owner,),
+            ).fetchone()
+        if not row:
             return None
-        payload = entry.get("payload")
-        return payload if isinstance(payload, dict) else None
+        return _unpack_schedule(row[1], row[0])
+
+    def list_schedule_versions(
+        self, owners: Sequence[str], clinic_name: Optional[str] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        owners = list(owners)
+        query = (
+            "SELECT v.id, v.owner, v.clinic_name, v.start_date, v.weeks, v.digest, p.size, v.generated_at, v.created_at "
+            "FROM schedule_versions v JOIN schedule_payloads p ON p.digest = v.digest "
+            f"WHERE v.owner IN ({', '.join('?' * len(owners))})"
+        )
+        params: list = owners
+        if clinic_name:
+            query += " AND v.clinic_name = ?"
+            params.append(clinic_name)
+        query += " ORDER BY v.id DESC LIMIT ?"
+        params.append(limit)
+        with self._conn() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def get_schedule_version(self, owners: Sequence[str], version_id: int) -> Optional[Dict[str, Any]]:
+        owners = list(owners)
+        with self._conn() as conn:
+            row = conn.execute(
+                f"""
+                SELECT v.generated_at, p.data FROM schedule_versions v
+                JOIN schedule_payloads p ON p.digest = v.digest
+                WHERE v.id=? AND v.owner IN ({', '.join('?' * len(owners))})
+                """,
+                [version_id, *owners],
+            ).fetchone()
+        if not row:
+            return None
+        return _unpack_schedule(row[1], row[0])
+
+
+# -----------------------
+# Write-behind audit writer
+# -----------------------
+class AuditWriter:
+    """
+    Queues audit rows and inserts them in batches from a daemon thread.
+
+    A batch is written once it reaches `batch_size` rows or `interval` seconds
+    after its first row. When the queue is full, callers wait up to
+    `enqueue_timeout` and then write their row synchronously, so events are
+    slowed down under overload rather than dropped.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        sink,
+        *,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        interval: float = AUDIT_FLUSH_SECONDS,
+        max_queue: int = AUDIT_QUEUE_MAX,
+        enqueue_timeout: float = AUDIT_ENQUEUE_TIMEOUT,
+    ):
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.interval = max(0.0, interval)
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue))
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, row: AuditRow) -> None:
+        if not self._thread.is_alive():
+            self._write([row])
+            return
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._write([row])
+
+    def flush(self) -> None:
+        """Block until every queued row has been written."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, rows: List[AuditRow]) -> None:
+        try:
+            self.sink.log_events(rows)
+            return
+        except Exception:
+            if len(rows) == 1:
+                logger.exception("Failed to write audit event %s", rows[0][1])
+                return
+        # One bad row (e.g. a dangling user id) must not take the batch down with it.
+        for row in rows:
+            self._write([row])
+
 
 # -----------------------
 # Backend selector
@@ -894,15 +1283,26 @@ if AUTH_BACKEND == "postgres" and DATABASE_URL:
     try:
         _backend = PostgresAuth(DATABASE_URL)
     except Exception:
-        _backend = JsonAuth()
+        _backend = SqliteAuth()
 else:
-    _backend = JsonAuth()
+    _backend = SqliteAuth()
+
+_audit = AuditWriter(_backend) if AUDIT_ASYNC else None
+if _audit is not None:
+    # Scripts that never call close_db() still get their queued events written.
+    atexit.register(_audit.close)
 
 
 def init_db():
     _backend.init_db()
 
 
+def close_db():
+    if _audit is not None:
+        _audit.close()
+    _backend.close()
+
+
 def ensure_admin(username: str, password: str, license_key: str = "DEMO"):
     _backend.ensure_admin(username, password, license_key)
 
@@ -942,7 +1342,9 @@ def log_event(
     location: str = "",
     ip_v4: str = "",
 ):
-    return _backend.log_event(user_id, event, detail, ip, user_agent, location, ip_v4)
+    if _audit is None:
+        return _backend.log_event(user_id, event, detail, ip, user_agent, location, ip_v4)
+    _audit.enqueue((user_id, event, detail, ip, ip_v4, user_agent, location, datetime.utcnow()))
 
 
 def list_users() -> List[Dict[str, Any]]:
@@ -963,6 +1365,8 @@ def list_audit(
     user_id: Optional[int] = None,
     search: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
+    if _audit is not None:
+        _audit.flush()
     return _backend.list_audit(limit=limit, event=event, user_id=user_id, search=search)
 
 
@@ -988,14 +1392,32 @@ def save_config(owner: str, filename: str, payload: dict):
 
 
 # Schedule helpers (latest per owner)
-def save_schedule(owner: str, payload: dict):
-    return _backend.save_schedule(owner, payload)
+def save_schedule(owners: Union[str, Sequence[str]], payload: dict) -> Optional[int]:
+    """
+    Append a history version; every owner alias points at one stored payload.
+    Returns the id of one of the new version rows (any alias can read it).
+    """
+    return _backend.save_schedule(owners, payload)
 
 
 def get_latest_schedule(owner: str) -> Optional[dict]:
     return _backend.get_latest_schedule(owner)
 
 
+def list_schedule_versions(owners: Sequence[str], clinic_name: Optional[str] = None, limit: int = 50) -> List[dict]:
+    owners = _owner_list(owners)
+    if not owners:
+        return []
+    return _backend.list_schedule_versions(owners, clinic_name=clinic_name, limit=limit)
+
+
+def get_schedule_version(owners: Sequence[str], version_id: int) -> Optional[dict]:
+    owners = _owner_list(owners)
+    if not owners:
+        return None
+    return _backend.get_schedule_version(owners, version_id)
+
+
 # Config import/export helpers
 def export_config(owner: str, filename: str) -> Optional[dict]:
     return _backend.load_config(owner, filename)
@@ -1,26 +1,61 @@
 # Expose main scheduler API.
-from .engine import generate_schedule
+from .engine import RunCancelled, SolverState, TrialPruned, generate_schedule, solve_instance
+from .improve import improve_schedule
+from .instance import InstancePartition, ProblemInstance, compile_instance, horizon_windows, partition_by_role
 from .model import (
     DailyRequirement,
     PTOEntry,
+    ScheduleChanges,
     ScheduleConfig,
     ScheduleResult,
     StaffMember,
     StaffPreferences,
     ConstraintToggles,
+    TournamentReport,
+    TrialReport,
 )
 from .export import export_schedule_to_excel
-from .tournament import run_tournament
+from .repair import repair_instance, repair_schedule
+from .tournament import (
+    ENGINES,
+    planned_trials,
+    run_instance_tournament,
+    run_partitioned_tournament,
+    run_rolling_tournament,
+    run_tournament,
+)
+from .vectorized import solve_instance_vectorized
 
 __all__ = [
     "generate_schedule",
+    "solve_instance",
+    "TrialPruned",
+    "RunCancelled",
+    "SolverState",
+    "solve_instance_vectorized",
+    "improve_schedule",
+    "ProblemInstance",
+    "compile_instance",
+    "InstancePartition",
+    "partition_by_role",
+    "horizon_windows",
     "ScheduleConfig",
     "StaffMember",
     "DailyRequirement",
     "PTOEntry",
+    "ScheduleChanges",
     "ScheduleResult",
     "StaffPreferences",
     "ConstraintToggles",
+    "TournamentReport",
+    "TrialReport",
     "export_schedule_to_excel",
+    "repair_schedule",
+    "repair_instance",
     "run_tournament",
+    "run_instance_tournament",
+    "run_partitioned_tournament",
+    "run_rolling_tournament",
+    "planned_trials",
+    "ENGINES",
 ]
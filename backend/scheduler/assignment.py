@@ -0,0 +1,86 @@
+"""
+Minimum-cost assignment (Hungarian algorithm) for small per-day matchings.
+
+The greedy engines fill slots one at a time, so a member who is the only
+eligible opener can be spent on an earlier slot. `min_cost_assignment` solves
+a day's slots jointly instead: it fills as many rows as possible and, among
+those fillings, picks the cheapest. Matrices are a few slots by a few dozen
+members, so the O(rows^2 * columns) pure-Python version is plenty.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+# Cost of leaving a row unassigned; far above any achievable difference in
+# real costs, so a filling with more rows always wins.
+UNASSIGNED_COST = 1e6
+
+
+def min_cost_assignment(costs: Sequence[Sequence[Optional[float]]]) -> List[Optional[int]]:
+    """
+    Assign each row (slot) at most one column (member), each column at most
+    once, maximizing the number of assigned rows and then minimizing the
+    summed cost. `None` marks an infeasible pair. Returns the column chosen
+    for every row, or None where the row stays unassigned.
+
+    The result depends only on the matrix, so equal inputs give equal
+    assignments.
+    """
+    n = len(costs)
+    if n == 0:
+        return []
+    m = len(costs[0])
+    # One padding column per row stands for "unassigned", so a full matching always exists.
+    width = m + n
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (width + 1)
+    owner = [0] * (width + 1)  # owner[j]: row (1-based) holding column j, 0 if free
+    way = [0] * (width + 1)
+    for row in range(1, n + 1):
+        owner[0] = row
+        col0 = 0
+        minv = [inf] * (width + 1)
+        used = [False] * (width + 1)
+        while True:
+            used[col0] = True
+            row0 = owner[col0]
+            row_costs = costs[row0 - 1]
+            delta = inf
+            col1 = 0
+            for col in range(1, width + 1):
+                if used[col]:
+                    continue
+                if col <= m:
+                    cost = row_costs[col - 1]
+                    if cost is None:
+                        cost = inf
+                else:
+                    cost = UNASSIGNED_COST
+                reduced = cost - u[row0] - v[col]
+                if reduced < minv[col]:
+                    minv[col] = reduced
+                    way[col] = col0
+                if minv[col] < delta:
+                    delta = minv[col]
+                    col1 = col
+            for col in range(width + 1):
+                if used[col]:
+                    u[owner[col]] += delta
+                    v[col] -= delta
+                else:
+                    minv[col] -= delta
+            col0 = col1
+            if owner[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            owner[col0] = owner[col1]
+            col0 = col1
+
+    result: List[Optional[int]] = [None] * n
+    for col in range(1, m + 1):
+        if owner[col]:
+            result[owner[col] - 1] = col - 1
+    return result
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-import math
-from collections import defaultdict
-from dataclasses import dataclass, field
-from datetime import timedelta
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 import random
 
+from .assignment import min_cost_assignment
+from .instance import InstancePartition, ProblemInstance, compile_instance, partition_by_role, slot_key
 from .model import (
     Assignment,
     DailyRequirement,
@@ -25,147 +24,114 @@ BLEACH_ROTATION_OFFSET_PENALTY = 1.0
 CONSTRAINT_HARD_THRESHOLD = 10.0
 JITTER_SCALE = 1e-3
 OPEN_LABEL = "OPEN"
+PRUNE_TOLERANCE = 1e-9  # absorbs float noise so equal-penalty trials are never pruned
+CANCEL_CHECK_SLOTS = 64  # slots between polls of a run's cancel callback
+STABILITY_WEIGHT = 2.0  # warm starts: cost of giving a slot to someone other than its previous assignee
+
+
+class TrialPruned(Exception):
+    """Raised when a trial provably cannot finish below the incumbent bound."""
+
+    def __init__(self, partial_penalty: float, slot_pos: int) -> None:
+        super().__init__(partial_penalty, slot_pos)
+        self.partial_penalty = partial_penalty
+        self.slot_pos = slot_pos
+
+
+class RunCancelled(Exception):
+    """Raised inside a run once its `cancel` callback reports the caller has given up."""
+
+
+def check_cancelled(cancel: Optional[Callable[[], bool]], step: int, every: int = CANCEL_CHECK_SLOTS) -> None:
+    """Poll `cancel` every `every` steps and raise `RunCancelled` if it returns True."""
+    if cancel is not None and step % every == 0 and cancel():
+        raise RunCancelled()
 
 
 @dataclass
 class _StaffState:
+    """
+    Running per-member state. Every query the constraints need is a constant-time
+    index into fixed-size arrays, so cost per slot does not grow with the horizon.
+    """
+
     assignments: List[Assignment]
-    worked_day_indices: List[int]
+    worked_days: bytearray  # per-day flags: worked_days[d] == 1 once day d is assigned
+    week_days: List[int]  # per-week counters of distinct days worked
     last_bleach_day: Optional[int] = None
     last_saturday_week: Optional[int] = None
-    week_assignments: Dict[int, set] = field(default_factory=lambda: defaultdict(set))
+
+    @classmethod
+    def empty(cls, weeks: int) -> "_StaffState":
+        return cls(assignments=[], worked_days=bytearray(weeks * len(DAYS)), week_days=[0] * weeks)
 
     def total_assignments(self) -> int:
         return len(self.assignments)
 
+    def worked(self, day_index: int) -> bool:
+        return 0 <= day_index < len(self.worked_days) and self.worked_days[day_index] == 1
 
-def _ensure_requirements(requirements: Sequence[DailyRequirement]) -> Dict[str, DailyRequirement]:
-    req_map: Dict[str, DailyRequirement] = {}
-    for req in requirements:
-        req_map[req.day_name] = req
-    missing = [d for d in DAYS if d not in req_map]
-    if missing:
-        raise ValueError(f"Missing requirements for day(s): {', '.join(missing)}")
-    return req_map
+    def record(self, assignment: Assignment) -> None:
+        slot = assignment.slot
+        self.assignments.append(assignment)
+        if not self.worked_days[slot.day_index]:
+            self.worked_days[slot.day_index] = 1
+            self.week_days[slot.day_index // len(DAYS)] += 1
 
+    def commit(self, assignment: Assignment) -> None:
+        """Record an assignment and update the bleach and Saturday markers it implies."""
+        slot = assignment.slot
+        self.record(assignment)
+        if slot.is_bleach and slot.role == "Tech":
+            self.last_bleach_day = slot.day_index
+        if slot.day_name == "Sat":
+            self.last_saturday_week = slot.day_index // len(DAYS)
 
-def _week_and_day_index(idx: int) -> Tuple[int, int]:
-    return divmod(idx, len(DAYS))
+    def copy(self) -> "_StaffState":
+        return _StaffState(
+            assignments=list(self.assignments),
+            worked_days=bytearray(self.worked_days),
+            week_days=list(self.week_days),
+            last_bleach_day=self.last_bleach_day,
+            last_saturday_week=self.last_saturday_week,
+        )
 
 
-def _build_slots(requirements: Dict[str, DailyRequirement], cfg: ScheduleConfig) -> List[ScheduleSlot]:
-    slots: List[ScheduleSlot] = []
-    day_index = 0
-    for week in range(cfg.weeks):
-        for day_pos, day_name in enumerate(DAYS):
-            req = requirements[day_name]
-            # No admin coverage on Saturdays
-            if day_name == "Sat" and req.admin_count:
-                req = DailyRequirement(
-                    day_name=req.day_name,
-                    patient_count=req.patient_count,
-                    tech_openers=req.tech_openers,
-                    tech_mids=req.tech_mids,
-                    tech_closers=req.tech_closers,
-                    rn_count=req.rn_count,
-                    admin_count=0,
-                )
-                requirements[day_name] = req
-            # ensure tech counts meet patient ratios
-            tech_total = req.tech_openers + req.tech_mids + req.tech_closers
-            need_tech = math.ceil(req.patient_count / cfg.patients_per_tech) if cfg.patients_per_tech else 0
-            if need_tech > tech_total:
-                additional = need_tech - tech_total
-                req = DailyRequirement(
-                    day_name=req.day_name,
-                    patient_count=req.patient_count,
-                    tech_openers=req.tech_openers,
-                    tech_mids=req.tech_mids + additional,
-                    tech_closers=req.tech_closers,
-                    rn_count=req.rn_count,
-                    admin_count=req.admin_count,
-                )
-                requirements[day_name] = req
-                tech_total += additional
-
-            rn_min_from_tech = math.ceil(tech_total / cfg.techs_per_rn) if cfg.techs_per_rn else 0
-            rn_min_from_patients = math.ceil(req.patient_count / cfg.patients_per_rn) if cfg.patients_per_rn else 0
-            rn_needed = max(req.rn_count, rn_min_from_patients, rn_min_from_tech)
-            if rn_needed != req.rn_count:
-                req = DailyRequirement(
-                    day_name=req.day_name,
-                    patient_count=req.patient_count,
-                    tech_openers=req.tech_openers,
-                    tech_mids=req.tech_mids,
-                    tech_closers=req.tech_closers,
-                    rn_count=rn_needed,
-                    admin_count=req.admin_count,
-                )
-                requirements[day_name] = req
-
-            schedule_date = cfg.start_date + timedelta(days=week * 7 + day_pos)
-
-            def add_slot(role: str, duty: str, count: int, *, bleach: bool = False):
-                for idx in range(count):
-                    slots.append(
-                        ScheduleSlot(
-                            day_index=day_index,
-                            date=schedule_date,
-                            day_name=day_name,
-                            role=role,
-                            duty=duty,
-                            slot_index=idx + 1,
-                            is_bleach=bleach and idx == 0,
-                        )
-                    )
-
-            add_slot("Tech", "open", req.tech_openers)
-            bleach = False
-            if req.tech_closers > 0:
-                freq = (cfg.bleach_frequency or "weekly").lower()
-                if freq == "weekly":
-                    bleach = day_name == cfg.bleach_day
-                elif freq == "quarterly":
-                    # second week (index 1) of Feb/May/Aug/Nov using the schedule date month
-                    if week == 1 and schedule_date.month in (2, 5, 8, 11) and day_name == cfg.bleach_day:
-                        bleach = True
-                else:
-                    bleach = day_name == cfg.bleach_day
-            add_slot("Tech", "close", req.tech_closers, bleach=bleach)
-            add_slot("Tech", "mid", req.tech_mids)
-            add_slot("RN", "coverage", req.rn_count)
-            add_slot("Admin", "coverage", req.admin_count)
+@dataclass
+class SolverState:
+    """
+    Everything a solve carries from one slot to the next: per-member state and
+    the bleach cursor. Lets a solve resume part-way through a horizon, e.g. for
+    the next window of a rolling-horizon run.
+    """
 
-            day_index += 1
-    return slots
+    members: Dict[str, _StaffState]
+    bleach_cursor: int
 
+    @classmethod
+    def initial(cls, instance: ProblemInstance) -> "SolverState":
+        cfg = instance.cfg
+        return cls(
+            members={member.id: _StaffState.empty(cfg.weeks) for member in instance.staff},
+            bleach_cursor=cfg.bleach_cursor % len(cfg.bleach_rotation) if cfg.bleach_rotation else 0,
+        )
 
-def _pto_lookup(pto_entries: Iterable[PTOEntry]) -> Dict[str, set]:
-    out: Dict[str, set] = defaultdict(set)
-    for entry in pto_entries:
-        out[entry.staff_id].add(entry.date)
-    return out
+    def copy(self) -> "SolverState":
+        return SolverState({staff_id: state.copy() for staff_id, state in self.members.items()}, self.bleach_cursor)
 
+    def advanced(self, result: ScheduleResult) -> "SolverState":
+        """State after `result`, a solve that started from this state, has been applied."""
+        state = self.copy()
+        for assignment in result.assignments:
+            member_state = state.members.get(assignment.staff_id or "")
+            if member_state is not None:
+                member_state.commit(assignment)
+        state.bleach_cursor = result.bleach_cursor
+        return state
 
-def _is_available(
-    member: StaffMember,
-    slot: ScheduleSlot,
-    pto_dates: Dict[str, set],
-) -> bool:
-    if slot.day_name not in member.availability or not member.availability.get(slot.day_name, True):
-        return False
-    if slot.date in pto_dates.get(member.id, ()):
-        return False
-    if member.role != slot.role:
-        return False
-    if slot.role == "Tech":
-        if slot.duty == "open" and not member.can_open:
-            return False
-        if slot.duty == "close" and not member.can_close:
-            return False
-        if slot.is_bleach and not member.can_bleach:
-            return False
-    return True
+
+def _week_and_day_index(idx: int) -> Tuple[int, int]:
+    return divmod(idx, len(DAYS))
 
 
 def _clamp_weight(value: object) -> float:
@@ -198,10 +164,9 @@ def _constraint_penalty(
             return
         penalty += w
 
-    recent = sorted(member_state.worked_day_indices)
     apply(
         weights.enforce_three_day_cap,
-        len(recent) >= 2 and slot.day_index - 1 in recent and slot.day_index - 2 in recent,
+        member_state.worked(slot.day_index - 1) and member_state.worked(slot.day_index - 2),
     )
 
     apply(
@@ -214,15 +179,9 @@ def _constraint_penalty(
         slot.day_name == "Sat" and member_state.last_saturday_week == week_idx - 1,
     )
 
-    worked = member_state.week_assignments.get(week_idx, set())
-    apply(
-        weights.limit_tech_four_days,
-        slot.role == "Tech" and slot.day_index not in worked and len(worked) >= 4,
-    )
-    apply(
-        weights.limit_rn_four_days,
-        slot.role == "RN" and slot.day_index not in worked and len(worked) >= 4,
-    )
+    over_four = not member_state.worked(slot.day_index) and member_state.week_days[week_idx] >= 4
+    apply(weights.limit_tech_four_days, slot.role == "Tech" and over_four)
+    apply(weights.limit_rn_four_days, slot.role == "RN" and over_four)
 
     return penalty, hard_violation
 
@@ -243,6 +202,50 @@ def _score_candidate(
     return base_penalty + workload_penalty
 
 
+def remaining_penalty_floor(instance: ProblemInstance) -> List[float]:
+    """
+    floor[s] is a lower bound on the penalty slots s.. can still add.
+
+    A slot may stay open (adds nothing) or be filled by an eligible member,
+    adding at least their preference plus one fairness step; constraint and
+    rotation penalties are never negative. With the default non-negative
+    preferences every floor is 0 and pruning relies on the partial sum alone.
+    """
+    slot_floor: Dict[tuple, float] = {}
+    floor = [0.0] * (len(instance.slots) + 1)
+    for slot_pos in range(len(instance.slots) - 1, -1, -1):
+        slot = instance.slots[slot_pos]
+        row = instance.eligibility[slot_pos]
+        key = (id(row), slot.role, slot.duty, slot.day_name)
+        value = slot_floor.get(key)
+        if value is None:
+            prefs = [_preference_penalty(member, slot) for member, ok in zip(instance.staff, row) if ok]
+            value = min(0.0, min(prefs) + FAIRNESS_WEIGHT) if prefs else 0.0
+            slot_floor[key] = value
+        floor[slot_pos] = floor[slot_pos + 1] + value
+    return floor
+
+
+def stability_anchor(instance: ProblemInstance, previous: ScheduleResult) -> Tuple[Optional[str], ...]:
+    """
+    Previous assignee of each slot of `instance`, matched by `slot_key`, or
+    None where the slot is new, was open, or its member is no longer on staff.
+    """
+    by_key = {slot_key(a.slot): a.staff_id for a in previous.assignments}
+    anchor: List[Optional[str]] = []
+    for slot in instance.slots:
+        staff_id = by_key.get(slot_key(slot))
+        anchor.append(staff_id if staff_id in instance.staff_index else None)
+    return tuple(anchor)
+
+
+def _check_bound(bound: Optional[float], floor: Sequence[float], partial: float, slot_pos: int) -> None:
+    # Strictly worse only: a trial tying the incumbent must still run so the
+    # earliest-trial tie-break matches an unpruned tournament.
+    if bound is not None and partial + floor[slot_pos + 1] > bound + PRUNE_TOLERANCE:
+        raise TrialPruned(partial, slot_pos)
+
+
 def _select_bleach_candidate(
     rotation: List[str],
     cursor: int,
@@ -260,6 +263,95 @@ def _select_bleach_candidate(
     return None, None
 
 
+def _tech_day_positions(slots: Sequence[ScheduleSlot], first_pos: int) -> List[int]:
+    """Positions of the Tech slots of `slots[first_pos]`'s day, which are contiguous from `first_pos`."""
+    day = slots[first_pos].day_index
+    end = first_pos
+    while end < len(slots) and slots[end].day_index == day and slots[end].role == "Tech":
+        end += 1
+    return list(range(first_pos, end))
+
+
+def _rotation_offset(rotation: Sequence[str], cursor: int, staff_id: str) -> Optional[int]:
+    """Steps from `cursor` to `staff_id`'s next turn in the bleach rotation, or None if not on it."""
+    for offset in range(len(rotation)):
+        if rotation[(cursor + offset) % len(rotation)] == staff_id:
+            return offset
+    return None
+
+
+def _plan_tech_day(
+    instance: ProblemInstance,
+    first_pos: int,
+    states: Mapping[str, _StaffState],
+    bleach_cursor: int,
+    rng: random.Random,
+    anchor: Optional[Sequence[Optional[str]]],
+    stability_weight: float,
+) -> Dict[int, Tuple[Optional[str], Optional[int], Optional[float]]]:
+    """
+    Fill the Tech slots of one day, starting at `first_pos`, as a min-cost
+    assignment: as many slots as possible, then the lowest summed score. A
+    pair costs what the greedy pass would score it (preference, constraint,
+    stability and rotation penalties plus fairness) plus jitter, drawn for
+    every slot x role member pair in role order so all engines consume the
+    same random stream.
+
+    Returns slot position -> (staff id or None, rotation index used, base penalty).
+    """
+    cfg = instance.cfg
+    rotation = cfg.bleach_rotation
+    members = instance.staff_by_role.get("Tech", ())
+    positions = _tech_day_positions(instance.slots, first_pos)
+    costs: List[List[Optional[float]]] = []
+    bases: List[List[Optional[float]]] = []
+    for slot_pos in positions:
+        slot = instance.slots[slot_pos]
+        eligible = instance.eligibility[slot_pos]
+        anchored = anchor[slot_pos] if anchor is not None else None
+        cost_row: List[Optional[float]] = []
+        base_row: List[Optional[float]] = []
+        for member in members:
+            jitter = rng.random() * JITTER_SCALE
+            base: Optional[float] = None
+            state = states[member.id]
+            if eligible[instance.staff_index[member.id]] and not state.worked(slot.day_index):
+                constraint_penalty, hard_violation = _constraint_penalty(state, slot, cfg)
+                if not hard_violation:
+                    if anchored is not None and member.id != anchored:
+                        constraint_penalty += stability_weight
+                    if not slot.is_bleach:
+                        base = _preference_penalty(member, slot) + constraint_penalty
+                    else:
+                        # Like the greedy pass, bleach slots are only filled from the rotation.
+                        offset = _rotation_offset(rotation, bleach_cursor, member.id)
+                        if offset is not None:
+                            base = (
+                                _preference_penalty(member, slot)
+                                + constraint_penalty
+                                + offset * BLEACH_ROTATION_OFFSET_PENALTY
+                            )
+            base_row.append(base)
+            if base is None:
+                cost_row.append(None)
+            else:
+                cost_row.append(_score_candidate(state, base_penalty=base, fairness_weight=FAIRNESS_WEIGHT) + jitter)
+        costs.append(cost_row)
+        bases.append(base_row)
+
+    plan: Dict[int, Tuple[Optional[str], Optional[int], Optional[float]]] = {}
+    for row, (slot_pos, col) in enumerate(zip(positions, min_cost_assignment(costs))):
+        if col is None:
+            plan[slot_pos] = (None, None, None)
+            continue
+        member = members[col]
+        rotation_index = None
+        if instance.slots[slot_pos].is_bleach:
+            rotation_index = (bleach_cursor + _rotation_offset(rotation, bleach_cursor, member.id)) % len(rotation)
+        plan[slot_pos] = (member.id, rotation_index, bases[row][col])
+    return plan
+
+
 def generate_schedule(
     staff: Sequence[StaffMember],
     requirements: Sequence[DailyRequirement],
@@ -268,54 +360,140 @@ def generate_schedule(
     *,
     rng_seed: Optional[int] = None,
     rng: Optional[random.Random] = None,
+    bound: Optional[float] = None,
+    partitioned: bool = False,
+    warm_start: Optional[ScheduleResult] = None,
+    day_matching: bool = False,
 ) -> ScheduleResult:
     """
     Generate a schedule and return assignments + updated bleach cursor.
+
+    With `bound`, raises `TrialPruned` as soon as the schedule is certain to
+    end with a penalty above it.
+
+    `partitioned` solves each role on its own (see `partition_by_role`) and
+    merges the results; the schedule is reproducible for a seed but differs
+    from the interleaved solve, which shares one random stream across roles.
+    A partitioned solve is only checked against `bound` once it is complete.
+
+    `warm_start` is a previous schedule for the same dates; the solve prefers
+    its assignments (see `STABILITY_WEIGHT`) and the returned penalty
+    includes the cost of every deviation. `day_matching` assigns each day's
+    Tech slots jointly; see `solve_instance`.
     """
-    requirements_map = _ensure_requirements(requirements)
-    slots = _build_slots(requirements_map, cfg)
-    pto_lookup = _pto_lookup(pto_entries)
+    instance = compile_instance(staff, requirements, cfg, pto_entries)
+    if not partitioned:
+        anchor = stability_anchor(instance, warm_start) if warm_start is not None else None
+        return solve_instance(
+            instance, rng_seed=rng_seed, rng=rng, bound=bound, anchor=anchor, day_matching=day_matching
+        )
+    partitions = partition_by_role(instance)
+    results = []
+    for partition in partitions:
+        part_rng = random.Random(rng.random()) if rng is not None else None
+        anchor = stability_anchor(partition.instance, warm_start) if warm_start is not None else None
+        results.append(
+            solve_instance(
+                partition.instance, rng_seed=rng_seed, rng=part_rng, anchor=anchor, day_matching=day_matching
+            )
+        )
+    result = merge_partition_results(instance, partitions, results)
+    result.seed = rng_seed
+    if bound is not None and result.total_penalty > bound + PRUNE_TOLERANCE:
+        raise TrialPruned(result.total_penalty, len(instance.slots) - 1)
+    return result
+
+
+def merge_partition_results(
+    instance: ProblemInstance,
+    partitions: Sequence[InstancePartition],
+    results: Sequence[ScheduleResult],
+) -> ScheduleResult:
+    """
+    Combine per-role results (one per partition, same order) into a schedule
+    for the whole instance.
+
+    Assignments return to the parent's slot order and penalties are summed in
+    partition order, so the merge does not depend on which partition finished
+    first. Only the partition holding bleach slots moves the bleach cursor.
+    """
+    cfg = instance.cfg
+    assignments: List[Optional[Assignment]] = [None] * len(instance.slots)
+    stats = {member.id: 0.0 for member in instance.staff}
+    bleach_cursor = cfg.bleach_cursor % len(cfg.bleach_rotation) if cfg.bleach_rotation else 0
+    total_penalty = 0.0
+    for partition, result in zip(partitions, results):
+        for slot_pos, assignment in zip(partition.slot_positions, result.assignments):
+            assignments[slot_pos] = assignment
+        stats.update(result.stats)
+        total_penalty += result.total_penalty
+        if any(slot.is_bleach for slot in partition.instance.slots):
+            bleach_cursor = result.bleach_cursor
+    return ScheduleResult(
+        assignments=assignments,
+        bleach_cursor=bleach_cursor,
+        total_penalty=total_penalty,
+        stats=stats,
+    )
+
+
+def solve_instance(
+    instance: ProblemInstance,
+    *,
+    rng_seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
+    bound: Optional[float] = None,
+    floor: Optional[Sequence[float]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    start: Optional[SolverState] = None,
+    anchor: Optional[Sequence[Optional[str]]] = None,
+    stability_weight: float = STABILITY_WEIGHT,
+    day_matching: bool = False,
+) -> ScheduleResult:
+    """
+    Run one greedy trial against a precompiled instance.
+
+    `bound` enables pruning against an incumbent penalty; `floor` is the
+    `remaining_penalty_floor` of the instance and is computed when omitted.
+    `cancel` is polled every `CANCEL_CHECK_SLOTS` slots; see `RunCancelled`.
+
+    `start` resumes from the state left by earlier slots (it is not modified):
+    constraints, fairness and the bleach cursor see that history, the result
+    holds only this instance's assignments and penalty, and `stats` count all
+    assignments including the earlier ones.
+
+    `anchor` warm-starts the solve from a previous schedule (see
+    `stability_anchor`): giving an anchored slot to anyone else costs
+    `stability_weight` on top of the usual penalty.
+
+    `day_matching` fills each day's Tech slots jointly (see `_plan_tech_day`)
+    instead of one by one, so an early slot cannot use up the only member
+    able to take a later one; the other roles and all cross-day state stay
+    greedy.
+    """
+    cfg = instance.cfg
+    slots = instance.slots
+    staff_by_role = instance.staff_by_role
+    staff_map = instance.staff_map
+    staff_index = instance.staff_index
+    eligibility = instance.eligibility
 
     if rng is None:
         rng = random.Random(rng_seed)
 
-    staff_by_role: Dict[str, List[StaffMember]] = defaultdict(list)
-    for member in staff:
-        staff_by_role[member.role].append(member)
-
-    states: Dict[str, _StaffState] = {
-        member.id: _StaffState(assignments=[], worked_day_indices=[]) for member in staff
-    }
-    staff_map: Dict[str, StaffMember] = {member.id: member for member in staff}
+    solver_state = start.copy() if start is not None else SolverState.initial(instance)
+    states = solver_state.members
 
     assignments: List[Assignment] = []
-    bleach_cursor = cfg.bleach_cursor % len(cfg.bleach_rotation) if cfg.bleach_rotation else 0
+    bleach_cursor = solver_state.bleach_cursor
 
     total_penalty = 0.0
+    if bound is not None and floor is None:
+        floor = remaining_penalty_floor(instance)
+    day_plan: Dict[int, Tuple[Optional[str], Optional[int], Optional[float]]] = {}
 
-    for slot in slots:
-        role_candidates = staff_by_role.get(slot.role, [])
-        if role_candidates:
-            role_candidates = role_candidates.copy()
-            rng.shuffle(role_candidates)
-
-        def gather_candidates() -> List[Tuple[StaffMember, _StaffState, float]]:
-            found: List[Tuple[StaffMember, _StaffState, float]] = []
-            for member in role_candidates:
-                state = states[member.id]
-                if slot.day_index in state.worked_day_indices:
-                    continue
-                if not _is_available(member, slot, pto_lookup):
-                    continue
-                penalty, hard_violation = _constraint_penalty(state, slot, cfg)
-                if hard_violation:
-                    continue
-                found.append((member, state, penalty))
-            return found
-
-        # Hard constraints are enforced as filters; soft constraints add penalty weight.
-        candidates: List[Tuple[StaffMember, _StaffState, float]] = gather_candidates()
-
+    for slot_pos, slot in enumerate(slots):
+        check_cancelled(cancel, slot_pos)
         chosen: Optional[StaffMember] = None
         chosen_state: Optional[_StaffState] = None
         note: Optional[str] = None
@@ -323,51 +501,87 @@ def generate_schedule(
 
         base_penalty = None
 
-        if slot.is_bleach and cfg.bleach_rotation:
-            best_score: Optional[Tuple[float, int, StaffMember, _StaffState, float]] = None
-            for offset in range(len(cfg.bleach_rotation)):
-                idx = (bleach_cursor + offset) % len(cfg.bleach_rotation)
-                rid = cfg.bleach_rotation[idx]
-                member = staff_map.get(rid)
-                if member is None:
-                    continue
-                state = states.get(rid)
-                if state is None:
-                    continue
-                if slot.day_index in state.worked_day_indices:
-                    continue
-                if not _is_available(member, slot, pto_lookup):
-                    continue
-                constraint_penalty, hard_violation = _constraint_penalty(state, slot, cfg)
-                if hard_violation:
-                    continue
-                base = _preference_penalty(member, slot) + constraint_penalty + offset * BLEACH_ROTATION_OFFSET_PENALTY
-                score = _score_candidate(state, base_penalty=base, fairness_weight=FAIRNESS_WEIGHT)
-                if best_score is None or score < best_score[0]:
-                    best_score = (score, idx, member, state, base)
-            if best_score is not None:
-                _, rotation_index_used, chosen, chosen_state, base_penalty = best_score
-            else:
+        if day_matching and slot.role == "Tech":
+            if slot_pos not in day_plan:
+                day_plan = _plan_tech_day(instance, slot_pos, states, bleach_cursor, rng, anchor, stability_weight)
+            chosen_id, rotation_index_used, base_penalty = day_plan[slot_pos]
+            if chosen_id is not None:
+                chosen, chosen_state = staff_map[chosen_id], states[chosen_id]
+            elif slot.is_bleach and cfg.bleach_rotation:
                 note = "Bleach rotation unavailable"
-
-        if chosen is None and candidates and not slot.is_bleach:
-            scored: List[Tuple[float, float, StaffMember, _StaffState]] = []
-            for member, state, constraint_penalty in candidates:
-                base = _preference_penalty(member, slot) + constraint_penalty
-                if slot.is_bleach and cfg.bleach_rotation:
-                    # apply extra penalty if we are off rotation
-                    try:
-                        pos = cfg.bleach_rotation.index(member.id)
-                    except ValueError:
-                        pos = None
-                    if pos is None:
-                        base += BLEACH_PENALTY
-                score = _score_candidate(state, base_penalty=base, fairness_weight=FAIRNESS_WEIGHT)
-                jitter = rng.random() * JITTER_SCALE
-                scored.append((score + jitter, score, member, state))
-            scored.sort(key=lambda tup: (tup[0], tup[2].id))
-            _, score_value, chosen, chosen_state = scored[0]
-            base_penalty = score_value - FAIRNESS_WEIGHT * chosen_state.total_assignments()
+        else:
+            eligible = eligibility[slot_pos]
+            role_candidates = list(staff_by_role.get(slot.role, ()))
+            if role_candidates:
+                rng.shuffle(role_candidates)
+            anchored = anchor[slot_pos] if anchor is not None else None
+
+            def gather_candidates() -> List[Tuple[StaffMember, _StaffState, float]]:
+                found: List[Tuple[StaffMember, _StaffState, float]] = []
+                for member in role_candidates:
+                    if not eligible[staff_index[member.id]]:
+                        continue
+                    state = states[member.id]
+                    if state.worked(slot.day_index):
+                        continue
+                    penalty, hard_violation = _constraint_penalty(state, slot, cfg)
+                    if hard_violation:
+                        continue
+                    if anchored is not None and member.id != anchored:
+                        penalty += stability_weight
+                    found.append((member, state, penalty))
+                return found
+
+            # Hard constraints are enforced as filters; soft constraints add penalty weight.
+            candidates: List[Tuple[StaffMember, _StaffState, float]] = gather_candidates()
+
+            if slot.is_bleach and cfg.bleach_rotation:
+                best_score: Optional[Tuple[float, int, StaffMember, _StaffState, float]] = None
+                for offset in range(len(cfg.bleach_rotation)):
+                    idx = (bleach_cursor + offset) % len(cfg.bleach_rotation)
+                    rid = cfg.bleach_rotation[idx]
+                    member = staff_map.get(rid)
+                    if member is None:
+                        continue
+                    state = states.get(rid)
+                    if state is None:
+                        continue
+                    if not eligible[staff_index[rid]]:
+                        continue
+                    if state.worked(slot.day_index):
+                        continue
+                    constraint_penalty, hard_violation = _constraint_penalty(state, slot, cfg)
+                    if hard_violation:
+                        continue
+                    if anchored is not None and rid != anchored:
+                        constraint_penalty += stability_weight
+                    base = _preference_penalty(member, slot) + constraint_penalty + offset * BLEACH_ROTATION_OFFSET_PENALTY
+                    score = _score_candidate(state, base_penalty=base, fairness_weight=FAIRNESS_WEIGHT)
+                    if best_score is None or score < best_score[0]:
+                        best_score = (score, idx, member, state, base)
+                if best_score is not None:
+                    _, rotation_index_used, chosen, chosen_state, base_penalty = best_score
+                else:
+                    note = "Bleach rotation unavailable"
+
+            if chosen is None and candidates and not slot.is_bleach:
+                scored: List[Tuple[float, float, StaffMember, _StaffState]] = []
+                for member, state, constraint_penalty in candidates:
+                    base = _preference_penalty(member, slot) + constraint_penalty
+                    if slot.is_bleach and cfg.bleach_rotation:
+                        # apply extra penalty if we are off rotation
+                        try:
+                            pos = cfg.bleach_rotation.index(member.id)
+                        except ValueError:
+                            pos = None
+                        if pos is None:
+                            base += BLEACH_PENALTY
+                    score = _score_candidate(state, base_penalty=base, fairness_weight=FAIRNESS_WEIGHT)
+                    jitter = rng.random() * JITTER_SCALE
+                    scored.append((score + jitter, score, member, state))
+                scored.sort(key=lambda tup: (tup[0], tup[2].id))
+                _, score_value, chosen, chosen_state = scored[0]
+                base_penalty = score_value - FAIRNESS_WEIGHT * chosen_state.total_assignments()
 
         if chosen is None:
             notes = [note] if note else []
@@ -376,24 +590,19 @@ def generate_schedule(
                 assignments.append(Assignment(slot=slot, staff_id=None, notes=notes))
             else:
                 assignments.append(Assignment(slot=slot, staff_id=OPEN_LABEL, notes=notes))
+            _check_bound(bound, floor, total_penalty, slot_pos)
             continue
 
         # Update state
         assigned = Assignment(slot=slot, staff_id=chosen.id, notes=[note] if note else [])
         assignments.append(assigned)
-        chosen_state.assignments.append(assigned)
-        chosen_state.worked_day_indices.append(slot.day_index)
-        week_idx, _ = _week_and_day_index(slot.day_index)
-        chosen_state.week_assignments.setdefault(week_idx, set()).add(slot.day_index)
-        if slot.is_bleach and slot.role == "Tech":
-            chosen_state.last_bleach_day = slot.day_index
-            if rotation_index_used is not None:
-                bleach_cursor = (rotation_index_used + 1) % len(cfg.bleach_rotation)
-        if slot.day_name == "Sat":
-            chosen_state.last_saturday_week = week_idx
+        chosen_state.commit(assigned)
+        if slot.is_bleach and slot.role == "Tech" and rotation_index_used is not None:
+            bleach_cursor = (rotation_index_used + 1) % len(cfg.bleach_rotation)
         if base_penalty is None:
             base_penalty = _preference_penalty(chosen, slot)
         total_penalty += _score_candidate(chosen_state, base_penalty=base_penalty, fairness_weight=FAIRNESS_WEIGHT)
+        _check_bound(bound, floor, total_penalty, slot_pos)
 
     # compute summary stats
     totals = {staff_id: state.total_assignments() for staff_id, state in states.items()}
@@ -1,97 +1,52 @@
+"""
+Excel export.
+
+Every table is collected in a single pass over the assignments and streamed
+row by row into an xlsxwriter workbook opened in `constant_memory` mode, so
+finished rows are flushed to disk instead of being held as worksheet objects.
+Sheet layout, header formatting and cell values match what the earlier
+pandas `to_excel` based export produced.
+"""
+
 from __future__ import annotations
 
 from collections import defaultdict
 from datetime import date
 from io import BytesIO
-from typing import Dict, Iterable, List, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-import pandas as pd
+import xlsxwriter
 
 from .model import Assignment, ScheduleResult, StaffMember
 from .engine import OPEN_LABEL
 
-
-def _roster_rows(result: ScheduleResult, staff_lookup: Dict[str, StaffMember], allowed_roles: Set[str]):
-    for assignment in result.assignments:
-        slot = assignment.slot
-        if allowed_roles and slot.role not in allowed_roles:
-            continue
-        staff = staff_lookup.get(assignment.staff_id or "", None)
-        yield {
-            "Date": slot.date.strftime("%Y-%m-%d"),
-            "Day": slot.day_name,
-            "Role": slot.role,
-            "Duty": ("bleach" if slot.is_bleach else slot.duty) or "",
-            "Slot": slot.slot_index,
-            "StaffID": assignment.staff_id or "",
-            "StaffName": staff.name if staff else assignment.staff_id or "",
-            "Notes": "; ".join(assignment.notes) if assignment.notes else "",
-        }
+ROSTER_COLUMNS = ["Date", "Day", "Role", "Duty", "Slot", "StaffID", "StaffName", "Notes"]
+# Columns of the Roster sheet hidden from readers (kept for re-import).
+ROSTER_HIDDEN_COLUMNS = ("Slot", "StaffID")
+# Header style pandas applies to `to_excel` headers.
+HEADER_FORMAT = {"bold": True, "align": "center", "valign": "top", "top": 1, "right": 1, "bottom": 1, "left": 1}
+ROLE_SHEETS = [("RN", "RN"), ("Tech", "Tech"), ("Admin", "Admin")]
+_DUTY_PRIORITY = {"Open": 1, "Mid": 2, "Mid2": 2.5, "Mid3": 2.75, "Mid4": 2.8, "Bleach": 3.5, "Close": 4}
 
 
-def _coverage_rows(result: ScheduleResult):
-    day_role_counts: Dict[tuple, int] = {}
-    for assignment in result.assignments:
-        slot = assignment.slot
-        key = (slot.date.strftime("%Y-%m-%d"), slot.day_name, slot.role, slot.duty)
-        filled = assignment.staff_id not in (None, "", OPEN_LABEL)
-        day_role_counts[key] = day_role_counts.get(key, 0) + (1 if filled else 0)
-    for (date_str, day_name, role, duty), count in sorted(day_role_counts.items()):
-        yield {
-            "Date": date_str,
-            "Day": day_name,
-            "Role": role,
-            "Duty": duty,
-            "Filled": count,
-        }
-
-
-def _summary_rows(result: ScheduleResult, staff_lookup: Dict[str, StaffMember]):
-    for staff_id, total in sorted(result.stats.items(), key=lambda x: x[0]):
-        staff = staff_lookup.get(staff_id)
-        yield {
-            "StaffID": staff_id,
-            "StaffName": staff.name if staff else "",
-            "TotalShifts": total,
-        }
+def _is_open(staff_id: Optional[str]) -> bool:
+    return staff_id in (None, "", OPEN_LABEL)
 
 
-def _note_rows(result: ScheduleResult, staff_lookup: Dict[str, StaffMember]) -> List[Dict[str, str]]:
-    notes_by_date: Dict[str, Set[str]] = defaultdict(set)
-    for assignment in result.assignments:
-        slot = assignment.slot
-        date_str = slot.date.strftime("%Y-%m-%d")
-        if assignment.notes:
-            for n in assignment.notes:
-                notes_by_date[date_str].add(n)
-        if assignment.staff_id in (None, "", OPEN_LABEL):
-            notes_by_date[date_str].add(
-                f"Open slot: {slot.role} {slot.duty or ''}#{slot.slot_index}".strip()
-            )
-    rows: List[Dict[str, str]] = []
-    for date_str in sorted(notes_by_date.keys()):
-        rows.append(
-            {
-                "Date": date_str,
-                "Notes": "; ".join(sorted(notes_by_date[date_str])),
-            }
-        )
-    return rows
+def _open_slot_note(assignment: Assignment) -> str:
+    slot = assignment.slot
+    return f"Open slot: {slot.role} {slot.duty or ''}#{slot.slot_index}".strip()
 
 
-def _notes_map(result: ScheduleResult) -> Dict[str, str]:
-    out: Dict[str, Set[str]] = defaultdict(set)
-    for assignment in result.assignments:
-        slot = assignment.slot
-        date_str = slot.date.strftime("%Y-%m-%d")
-        if assignment.notes:
-            for n in assignment.notes:
-                out[date_str].add(n)
-        if assignment.staff_id in (None, "", OPEN_LABEL):
-            out[date_str].add(
-                f"Open slot: {slot.role} {slot.duty or ''}#{slot.slot_index}".strip()
-            )
-    return {d: "; ".join(sorted(vals)) for d, vals in out.items()}
+def _col_key(col: str):
+    # col format: Role-Duty-idx
+    try:
+        role, duty, idx = col.split("-")
+        idx_val = float(idx)
+    except ValueError:
+        role, duty, idx_val = col, "", 0
+    base = _DUTY_PRIORITY.get(duty, 5)
+    return (role, base, idx_val)
 
 
 def _pto_notes_map(
@@ -112,107 +67,140 @@ def _pto_notes_map(
     return out
 
 
-def _role_matrix(
-    assignments: List[Assignment],
-    staff_lookup: Dict[str, StaffMember],
-    *,
-    role: str,
-    dates: List[date],
-) -> pd.DataFrame:
-    if not dates:
-        return pd.DataFrame()
-
-    date_labels = [f"{dt.strftime('%a')} {dt.strftime('%m/%d')}" for dt in dates]
-    entries: Dict[str, Dict[date, List[str]]] = defaultdict(lambda: defaultdict(list))
+class _ExportTables:
+    """Aggregates for every sheet, filled by one pass over the assignments."""
+
+    def __init__(self, staff_lookup: Dict[str, StaffMember], role_sheets: Sequence[str]) -> None:
+        self.staff_lookup = staff_lookup
+        self.role_sheets = set(role_sheets)
+        self.count = 0
+        self.roster: List[Tuple[Any, ...]] = []
+        self.coverage: Dict[tuple, int] = {}
+        self.stats: Dict[str, int] = defaultdict(int)
+        self.notes: Dict[str, Set[str]] = defaultdict(set)
+        self.dates: Set[date] = set()
+        # Roster Matrix: one column per role/duty/slot index, one row per date.
+        self.matrix_cols: Set[str] = set()
+        self.matrix: Dict[str, Dict[str, str]] = defaultdict(dict)
+        self.date_day: Dict[str, str] = {}
+        # Role sheets: role -> staff id (or OPEN) -> date -> cell lines.
+        self.role_entries: Dict[str, Dict[str, Dict[date, List[str]]]] = {
+            role: defaultdict(lambda: defaultdict(list)) for role in self.role_sheets
+        }
 
-    for assignment in assignments:
+    def add(self, assignment: Assignment) -> None:
         slot = assignment.slot
-        if slot.role != role:
-            continue
-        staff_id = assignment.staff_id or OPEN_LABEL
-        duty_label = "Bleach" if slot.is_bleach else (slot.duty.capitalize() if slot.duty else "Shift")
-        if slot.slot_index:
-            duty_label = f"{duty_label} #{slot.slot_index}"
-        text = duty_label
-        if assignment.notes:
-            text += f" ({'; '.join(assignment.notes)})"
-        entries[staff_id][slot.date].append(text)
-
-    role_staff = [s for s in staff_lookup.values() if s.role == role]
-    role_staff.sort(key=lambda s: (s.name or s.id).lower())
-    rows = []
-
-    for staff_member in role_staff:
-        row = {"Name": staff_member.name or staff_member.id, "Role": staff_member.role}
-        for dt, label in zip(dates, date_labels):
-            cell = "\n".join(entries.get(staff_member.id, {}).get(dt, []))
-            row[label] = cell
-        rows.append(row)
-
-    if entries.get(OPEN_LABEL):
-        row = {"Name": OPEN_LABEL, "Role": role}
-        for dt, label in zip(dates, date_labels):
-            cell = "\n".join(entries[OPEN_LABEL].get(dt, []))
-            row[label] = cell
-        rows.append(row)
+        staff_id = assignment.staff_id
+        date_str = slot.date.strftime("%Y-%m-%d")
+        is_open = _is_open(staff_id)
+        staff = self.staff_lookup.get(staff_id or "", None)
+        self.count += 1
+        self.dates.add(slot.date)
+
+        self.roster.append(
+            (
+                date_str,
+                slot.day_name,
+                slot.role,
+                ("bleach" if slot.is_bleach else slot.duty) or "",
+                slot.slot_index,
+                staff_id or "",
+                staff.name if staff else staff_id or "",
+                "; ".join(assignment.notes) if assignment.notes else "",
+            )
+        )
 
-    return pd.DataFrame(rows)
+        key = (date_str, slot.day_name, slot.role, slot.duty)
+        self.coverage[key] = self.coverage.get(key, 0) + (0 if is_open else 1)
+        if staff_id and staff_id != OPEN_LABEL:
+            self.stats[staff_id] += 1
 
+        if assignment.notes:
+            self.notes[date_str].update(assignment.notes)
+        if is_open:
+            self.notes[date_str].add(_open_slot_note(assignment))
 
-def _roster_matrix(
-    assignments: List[Assignment],
-    staff_lookup: Dict[str, StaffMember],
-    notes_map: Dict[str, str],
-    pto_notes: Dict[str, Set[str]],
-) -> pd.DataFrame:
-    if not assignments:
-        return pd.DataFrame()
-    cols: Set[str] = set()
-    data: Dict[str, Dict[str, str]] = defaultdict(dict)
-    date_day: Dict[str, str] = {}
-    for assignment in assignments:
-        slot = assignment.slot
-        date_str = slot.date.strftime("%Y-%m-%d")
-        date_day[date_str] = slot.day_name
+        self.date_day[date_str] = slot.day_name
         duty_label = "Bleach" if slot.is_bleach else (slot.duty.capitalize() if slot.duty else "Duty")
         col = f"{slot.role}-{duty_label}-{slot.slot_index}"
-        cols.add(col)
-        name = (
-            OPEN_LABEL
-            if assignment.staff_id in (None, "", OPEN_LABEL)
-            else staff_lookup.get(
-                assignment.staff_id,
-                StaffMember(id=assignment.staff_id, name=assignment.staff_id, role=slot.role),
-            ).name
-        )
-        data[date_str][col] = name
-
-    duty_priority = {"Open": 1, "Mid": 2, "Mid2": 2.5, "Mid3": 2.75, "Mid4": 2.8, "Bleach": 3.5, "Close": 4}
-
-    def _col_key(col: str):
-        # col format: Role-Duty-idx
-        try:
-            role, duty, idx = col.split("-")
-            idx_val = float(idx)
-        except ValueError:
-            role, duty, idx_val = col, "", 0
-        base = duty_priority.get(duty, 5)
-        return (role, base, idx_val)
-
-    ordered_cols = sorted(cols, key=_col_key)
-    rows = []
-    for date_str in sorted(data.keys()):
-        row = {"Date": date_str, "Day": date_day.get(date_str, "")}
-        for c in ordered_cols:
-            row[c] = data[date_str].get(c, "")
-        notes = set()
-        if notes_map.get(date_str):
-            notes.update([notes_map[date_str]])
-        if pto_notes.get(date_str):
-            notes.update(pto_notes[date_str])
-        row["Notes"] = "; ".join(sorted(notes))
-        rows.append(row)
-    return pd.DataFrame(rows)
+        self.matrix_cols.add(col)
+        if is_open:
+            name = OPEN_LABEL
+        else:
+            name = self.staff_lookup.get(staff_id, StaffMember(id=staff_id, name=staff_id, role=slot.role)).name
+        self.matrix[date_str][col] = name
+
+        if slot.role in self.role_sheets:
+            label = "Bleach" if slot.is_bleach else (slot.duty.capitalize() if slot.duty else "Shift")
+            if slot.slot_index:
+                label = f"{label} #{slot.slot_index}"
+            if assignment.notes:
+                label += f" ({'; '.join(assignment.notes)})"
+            self.role_entries[slot.role][staff_id or OPEN_LABEL][slot.date].append(label)
+
+    def notes_text(self) -> Dict[str, str]:
+        return {d: "; ".join(sorted(vals)) for d, vals in self.notes.items()}
+
+    def roster_matrix(self, pto_notes: Dict[str, Set[str]]) -> Tuple[List[str], List[List[Any]]]:
+        if not self.count:
+            return [], []
+        ordered_cols = sorted(self.matrix_cols, key=_col_key)
+        notes_map = self.notes_text()
+        rows = []
+        for date_str in sorted(self.matrix):
+            cells = self.matrix[date_str]
+            notes = set()
+            if notes_map.get(date_str):
+                notes.add(notes_map[date_str])
+            if pto_notes.get(date_str):
+                notes.update(pto_notes[date_str])
+            rows.append(
+                [date_str, self.date_day.get(date_str, "")]
+                + [cells.get(c, "") for c in ordered_cols]
+                + ["; ".join(sorted(notes))]
+            )
+        return ["Date", "Day", *ordered_cols, "Notes"], rows
+
+    def role_matrix(self, role: str, dates: List[date]) -> Tuple[List[str], List[List[Any]]]:
+        if not dates:
+            return [], []
+        entries = self.role_entries.get(role, {})
+        labels = [f"{dt.strftime('%a')} {dt.strftime('%m/%d')}" for dt in dates]
+        # Labels repeat after a year; like a dict-built row, the later date wins the shared column.
+        label_date = dict(zip(labels, dates))
+        header = ["Name", "Role", *label_date]
+
+        role_staff = [s for s in self.staff_lookup.values() if s.role == role]
+        role_staff.sort(key=lambda s: (s.name or s.id).lower())
+        rows = []
+        for member_id, name, member_role in [(s.id, s.name or s.id, s.role) for s in role_staff] + (
+            [(OPEN_LABEL, OPEN_LABEL, role)] if entries.get(OPEN_LABEL) else []
+        ):
+            by_date = entries.get(member_id, {})
+            rows.append([name, member_role] + ["\n".join(by_date.get(dt, [])) for dt in label_date.values()])
+        if not rows:
+            return [], []
+        return header, rows
+
+
+class _SheetWriter:
+    """Writes header + rows tables the way `DataFrame.to_excel(index=False)` lays them out."""
+
+    def __init__(self, book: xlsxwriter.Workbook) -> None:
+        self.header_format = book.add_format(HEADER_FORMAT)
+
+    def table(self, sheet, columns: Sequence[str], rows: Iterable[Sequence[Any]], *, start_row: int = 0) -> int:
+        """Write a table and return the number of body rows."""
+        if not columns:
+            return 0
+        for col, name in enumerate(columns):
+            sheet.write(start_row, col, name, self.header_format)
+        count = 0
+        for count, row in enumerate(rows, start=1):
+            for col, value in enumerate(row):
+                # Body cells carry no format, so empty strings leave the cell unwritten.
+                sheet.write(start_row + count, col, value)
+        return count
 
 
 def export_schedule_to_excel(
@@ -228,93 +216,72 @@ def export_schedule_to_excel(
     Returns the bytes buffer; optionally writes to `file_path`.
     """
     allowed_roles = ({r for r in export_roles} if export_roles else {"RN", "Tech", "Admin"})
-    # filter assignments by allowed roles
-    filtered_assignments = [a for a in result.assignments if a.slot.role in allowed_roles]
-    # recompute stats for filtered roles (filled slots only)
-    filtered_stats: Dict[str, int] = defaultdict(int)
-    for a in filtered_assignments:
-        if a.staff_id and a.staff_id not in ("", OPEN_LABEL):
-            filtered_stats[a.staff_id] += 1
-
-    class _FilteredResult:
-        def __init__(self, assignments, stats):
-            self.assignments = assignments
-            self.stats = stats
-
-    filtered_result = _FilteredResult(filtered_assignments, filtered_stats)
+    role_sheets = [(role, label) for role, label in ROLE_SHEETS if role in allowed_roles]
+    tables = _ExportTables(staff, [role for role, _ in role_sheets])
+    for assignment in result.assignments:
+        if assignment.slot.role in allowed_roles:
+            tables.add(assignment)
 
     buf = BytesIO()
-    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
-        all_dates = sorted({assignment.slot.date for assignment in filtered_assignments})
-
-        # Roster Matrix first
-        roster_matrix = _roster_matrix(
-            filtered_assignments,
-            staff,
-            _notes_map(filtered_result),
-            _pto_notes_map(pto_entries, staff),
-        )
-        if not roster_matrix.empty:
-            roster_matrix.to_excel(writer, sheet_name="Roster Matrix", index=False)
-
-        roster_df = pd.DataFrame(list(_roster_rows(filtered_result, staff, allowed_roles)))
-        if not roster_df.empty:
-            roster_df.sort_values(["Date", "Role", "Duty", "Slot"], inplace=True)
-        roster_df.to_excel(writer, sheet_name="Roster", index=False)
-
-        coverage_df = pd.DataFrame(list(_coverage_rows(filtered_result)))
-        coverage_df.to_excel(writer, sheet_name="Coverage", index=False)
-
-        summary_df = pd.DataFrame(list(_summary_rows(filtered_result, staff)))
-        summary_df.to_excel(writer, sheet_name="Summary", index=False)
-
-        note_df = pd.DataFrame(_note_rows(filtered_result, staff))
-        if not note_df.empty:
-            note_df.to_excel(writer, sheet_name="Notes", index=False)
-
-        role_tables = []
-        for role_name, label in [("RN", "RN"), ("Tech", "Tech"), ("Admin", "Admin")]:
-            if role_name not in allowed_roles:
-                continue
-            table = _role_matrix(result.assignments, staff, role=role_name, dates=all_dates)
-            if not table.empty:
-                role_tables.append((label, table))
-                table.to_excel(writer, sheet_name=f"{label} Schedule", index=False)
-
-        if role_tables:
-            matrix_sheet = writer.book.add_worksheet("Matrix")
-            writer.sheets["Matrix"] = matrix_sheet
-            current_row = 0
-            for label, table in role_tables:
-                matrix_sheet.write(current_row, 0, f"{label} Schedule")
-                table.to_excel(
-                    writer,
-                    sheet_name="Matrix",
-                    startrow=current_row + 1,
-                    startcol=0,
-                    index=False,
-                )
-                current_row += len(table.index) + 3
-
-        info_df = pd.DataFrame(
-            [
-                {"Metric": "Bleach Cursor", "Value": result.bleach_cursor},
-                {"Metric": "Total Penalty", "Value": result.total_penalty},
-                {"Metric": "Seed", "Value": result.seed if result.seed is not None else ""},
-            ]
-        )
-        info_df.to_excel(writer, sheet_name="Meta", index=False)
-
-        # Hide Slot and StaffID columns in the Roster sheet
-        if "Roster" in writer.sheets and not roster_df.empty:
-            roster_sheet = writer.sheets["Roster"]
-            try:
-                slot_idx = roster_df.columns.get_loc("Slot")
-                staff_idx = roster_df.columns.get_loc("StaffID")
-                roster_sheet.set_column(slot_idx, slot_idx, None, None, {"hidden": True})
-                roster_sheet.set_column(staff_idx, staff_idx, None, None, {"hidden": True})
-            except Exception:
-                pass
+    book = xlsxwriter.Workbook(buf, {"constant_memory": True})
+    writer = _SheetWriter(book)
+
+    # Roster Matrix first
+    columns, rows = tables.roster_matrix(_pto_notes_map(pto_entries, staff))
+    if rows:
+        writer.table(book.add_worksheet("Roster Matrix"), columns, rows)
+
+    roster_sheet = book.add_worksheet("Roster")
+    if tables.roster:
+        tables.roster.sort(key=lambda row: (row[0], row[2], row[3], row[4]))
+        writer.table(roster_sheet, ROSTER_COLUMNS, tables.roster)
+        for name in ROSTER_HIDDEN_COLUMNS:
+            idx = ROSTER_COLUMNS.index(name)
+            roster_sheet.set_column(idx, idx, None, None, {"hidden": True})
+
+    coverage = [[*key, count] for key, count in sorted(tables.coverage.items())]
+    writer.table(
+        book.add_worksheet("Coverage"),
+        ["Date", "Day", "Role", "Duty", "Filled"] if coverage else [],
+        coverage,
+    )
+
+    summary = [
+        [staff_id, staff[staff_id].name if staff_id in staff else "", total]
+        for staff_id, total in sorted(tables.stats.items(), key=lambda x: x[0])
+    ]
+    writer.table(book.add_worksheet("Summary"), ["StaffID", "StaffName", "TotalShifts"] if summary else [], summary)
+
+    notes = sorted(tables.notes_text().items())
+    if notes:
+        writer.table(book.add_worksheet("Notes"), ["Date", "Notes"], notes)
+
+    all_dates = sorted(tables.dates)
+    role_tables = []
+    for role_name, label in role_sheets:
+        columns, rows = tables.role_matrix(role_name, all_dates)
+        if rows:
+            role_tables.append((label, columns, rows))
+            writer.table(book.add_worksheet(f"{label} Schedule"), columns, rows)
+
+    if role_tables:
+        matrix_sheet = book.add_worksheet("Matrix")
+        current_row = 0
+        for label, columns, rows in role_tables:
+            matrix_sheet.write(current_row, 0, f"{label} Schedule")
+            writer.table(matrix_sheet, columns, rows, start_row=current_row + 1)
+            current_row += len(rows) + 3
+
+    writer.table(
+        book.add_worksheet("Meta"),
+        ["Metric", "Value"],
+        [
+            ["Bleach Cursor", result.bleach_cursor],
+            ["Total Penalty", result.total_penalty],
+            ["Seed", result.seed if result.seed is not None else ""],
+        ],
+    )
+    book.close()
 
     data = buf.getvalue()
     if file_path:
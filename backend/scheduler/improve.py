@@ -0,0 +1,355 @@
+"""
+Local-search improvement applied after greedy construction.
+
+The greedy engine scores each assignment against the member's earlier days, so
+the schedule penalty decomposes per member:
+
+    sum(preference + soft constraint penalty [+ bleach rotation offset] [+ stability])
+    + FAIRNESS_WEIGHT * n * (n + 1) / 2   for a member with n assignments
+
+Constraints only look back a few days (two days, the previous Saturday, the
+current week), so changing one member's day `d` only changes that member's
+terms on days `d .. d + 6`. Moves are scored on that window alone instead of
+re-scoring the whole schedule.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import random
+import time
+
+from .engine import (
+    BLEACH_ROTATION_OFFSET_PENALTY,
+    CONSTRAINT_HARD_THRESHOLD,
+    FAIRNESS_WEIGHT,
+    STABILITY_WEIGHT,
+    _clamp_weight,
+    _preference_penalty,
+    check_cancelled,
+)
+from .instance import ProblemInstance
+from .model import DAYS, Assignment, ScheduleResult
+
+# Days after a change that can see it (previous-Saturday lookback is the longest).
+_WINDOW = len(DAYS)
+_EPSILON = 1e-9
+
+
+def _fairness(count: int) -> float:
+    return FAIRNESS_WEIGHT * count * (count + 1) / 2
+
+
+class _LocalState:
+    """
+    Mutable view of one schedule for the hill climber. With `anchor` (see
+    `engine.stability_anchor`) a slot held by anyone but its anchored member
+    costs `stability_weight`, as in the engines.
+    """
+
+    def __init__(
+        self,
+        instance: ProblemInstance,
+        result: ScheduleResult,
+        anchor: Optional[Sequence[Optional[str]]] = None,
+        stability_weight: float = STABILITY_WEIGHT,
+    ) -> None:
+        self.instance = instance
+        self.anchor = anchor
+        self.stability_weight = stability_weight
+        self.cfg = instance.cfg
+        self.slots = instance.slots
+        toggles = self.cfg.toggles
+        self.weights = {
+            "three_day": _clamp_weight(toggles.enforce_three_day_cap),
+            "bleach_rest": _clamp_weight(toggles.enforce_post_bleach_rest),
+            "alt_saturday": _clamp_weight(toggles.enforce_alt_saturdays),
+            "tech_four": _clamp_weight(toggles.limit_tech_four_days),
+            "rn_four": _clamp_weight(toggles.limit_rn_four_days),
+        }
+        n_staff = len(instance.staff)
+        self.owner: List[Optional[int]] = []
+        self.notes: List[List[str]] = []
+        self.day_slot: List[Dict[int, int]] = [dict() for _ in range(n_staff)]
+        self.bleach_days: List[set] = [set() for _ in range(n_staff)]
+        self.counts = [0] * n_staff
+        self.offsets: Dict[int, float] = {}
+        for pos, assignment in enumerate(result.assignments):
+            member_idx = instance.staff_index.get(assignment.staff_id or "")
+            self.owner.append(member_idx)
+            self.notes.append(list(assignment.notes))
+            if member_idx is None:
+                continue
+            self.day_slot[member_idx][assignment.slot.day_index] = pos
+            self.counts[member_idx] += 1
+            if assignment.slot.is_bleach and assignment.slot.role == "Tech":
+                self.bleach_days[member_idx].add(assignment.slot.day_index)
+        self._replay_bleach_offsets()
+
+    def _replay_bleach_offsets(self, until: Optional[int] = None) -> int:
+        """
+        Recompute rotation offsets of bleach slots before position `until` (all
+        by default) and return the rotation cursor at that point. Hill climbing
+        never moves bleach slots, so it replays once; repairs replay after
+        refilling one.
+        """
+        rotation = self.cfg.bleach_rotation
+        if not rotation:
+            return 0
+        if until is None:
+            self.offsets = {}
+        cursor = self.cfg.bleach_cursor % len(rotation)
+        for pos, slot in enumerate(self.slots[:until]):
+            member_idx = self.owner[pos]
+            if not slot.is_bleach or member_idx is None:
+                continue
+            offset = self.rotation_offset(member_idx, cursor)
+            if offset is None:
+                continue
+            if until is None:
+                self.offsets[pos] = offset * BLEACH_ROTATION_OFFSET_PENALTY
+            cursor = (cursor + offset + 1) % len(rotation)
+        return cursor
+
+    def rotation_offset(self, member_idx: int, cursor: int) -> Optional[int]:
+        """Steps from `cursor` to the member's next place in the bleach rotation, or None if absent."""
+        rotation = self.cfg.bleach_rotation
+        staff_id = self.instance.staff[member_idx].id
+        offsets = [(i - cursor) % len(rotation) for i, rid in enumerate(rotation) if rid == staff_id]
+        return min(offsets) if offsets else None
+
+    def _term(self, member_idx: int, day: int) -> Tuple[float, bool]:
+        """Penalty of the member's assignment on `day` given their earlier days."""
+        pos = self.day_slot[member_idx][day]
+        slot = self.slots[pos]
+        days = self.day_slot[member_idx]
+        week_start = day - day % len(DAYS)
+        prior_in_week = sum(1 for d in range(week_start, day) if d in days)
+        violations = (
+            ("three_day", (day - 1) in days and (day - 2) in days),
+            ("bleach_rest", (day - 1) in self.bleach_days[member_idx]),
+            ("alt_saturday", slot.day_name == "Sat" and (day - len(DAYS)) in days),
+            ("tech_four", slot.role == "Tech" and prior_in_week >= 4),
+            ("rn_four", slot.role == "RN" and prior_in_week >= 4),
+        )
+        member = self.instance.staff[member_idx]
+        penalty = _preference_penalty(member, slot) + self.offsets.get(pos, 0.0)
+        if self.anchor is not None and self.anchor[pos] is not None and self.anchor[pos] != member.id:
+            penalty += self.stability_weight
+        hard = False
+        for name, violated in violations:
+            w = self.weights[name]
+            if not violated or w <= 0:
+                continue
+            if w >= CONSTRAINT_HARD_THRESHOLD:
+                hard = True
+            else:
+                penalty += w
+        return penalty, hard
+
+    def total_penalty(self) -> float:
+        total = 0.0
+        for member_idx, days in enumerate(self.day_slot):
+            for day in sorted(days):
+                total += self._term(member_idx, day)[0]
+            total += _fairness(self.counts[member_idx])
+        return total
+
+    def movable(self, pos: int) -> bool:
+        return not self.slots[pos].is_bleach
+
+    def can_take(self, member_idx: int, pos: int) -> bool:
+        slot = self.slots[pos]
+        return bool(self.instance.eligibility[pos][member_idx]) and slot.day_index not in self.day_slot[member_idx]
+
+    def assign(self, pos: int, member_idx: Optional[int]) -> None:
+        slot = self.slots[pos]
+        day = slot.day_index
+        bleach = slot.is_bleach and slot.role == "Tech"
+        previous = self.owner[pos]
+        if previous is not None:
+            del self.day_slot[previous][day]
+            self.counts[previous] -= 1
+            if bleach:
+                self.bleach_days[previous].discard(day)
+        if member_idx is not None:
+            self.day_slot[member_idx][day] = pos
+            self.counts[member_idx] += 1
+            if bleach:
+                self.bleach_days[member_idx].add(day)
+        self.owner[pos] = member_idx
+
+    def _set_owners(self, owners: Dict[int, Optional[int]]) -> None:
+        # Clear every slot first so same-day swaps never look like double bookings.
+        for pos in owners:
+            self.assign(pos, None)
+        for pos, member_idx in owners.items():
+            if member_idx is not None:
+                self.assign(pos, member_idx)
+
+    def apply(self, changes: Dict[int, Optional[int]]) -> Optional[float]:
+        """
+        Apply {slot: new owner} changes and return the penalty delta, or undo
+        them and return None if they create a hard violation.
+        """
+        touched: Dict[int, set] = {}
+        for pos, member_idx in changes.items():
+            slot = self.slots[pos]
+            for idx in (self.owner[pos], member_idx):
+                if idx is None:
+                    continue
+                days = touched.setdefault(idx, set())
+                days.add(slot.day_index)
+                if slot.is_bleach and slot.role == "Tech":
+                    # The post-bleach rest rule is checked on the following day.
+                    days.add(slot.day_index + 1)
+        undo = {pos: self.owner[pos] for pos in changes}
+        before = self._cost(touched)
+        self._set_owners(changes)
+        after, hard = self._cost(touched, check_hard=True)
+        if hard:
+            self._set_owners(undo)
+            return None
+        return after - before
+
+    def restore(self, undo: Dict[int, Optional[int]]) -> None:
+        self._set_owners(undo)
+
+    def _cost(self, touched: Dict[int, set], check_hard: bool = False):
+        total = 0.0
+        hard = False
+        for member_idx, days in touched.items():
+            # Merge overlapping windows so each day is counted once per member.
+            covered: set = set()
+            for day in days:
+                covered.update(range(day, day + _WINDOW + 1))
+            member_days = self.day_slot[member_idx]
+            for day in sorted(covered):
+                if day in member_days:
+                    penalty, violated = self._term(member_idx, day)
+                    total += penalty
+                    hard = hard or violated
+            total += _fairness(self.counts[member_idx])
+        return (total, hard) if check_hard else total
+
+
+def _candidate_moves(state: _LocalState, rng: random.Random, peers: Dict[tuple, List[int]], pos: int):
+    """Propose one move touching slot `pos`: a reassignment or a same-role swap."""
+    slot = state.slots[pos]
+    members = state.instance.staff_by_role.get(slot.role, ())
+    if not members:
+        return None
+    current = state.owner[pos]
+    if current is None or rng.random() < 0.4:
+        member = members[rng.randrange(len(members))]
+        member_idx = state.instance.staff_index[member.id]
+        if member_idx == current or not state.can_take(member_idx, pos):
+            return None
+        return {pos: member_idx}
+    # Same-day swaps only trade duties; cross-day swaps also shift worked days.
+    key = (slot.role, slot.day_index) if rng.random() < 0.5 else (slot.role, None)
+    candidates = peers[key]
+    other = candidates[rng.randrange(len(candidates))]
+    other_owner = state.owner[other]
+    if other == pos or other_owner is None or other_owner == current:
+        return None
+    eligibility = state.instance.eligibility
+    if not eligibility[other][current] or not eligibility[pos][other_owner]:
+        return None
+    if state.slots[other].day_index != slot.day_index and (
+        state.slots[other].day_index in state.day_slot[current]
+        or slot.day_index in state.day_slot[other_owner]
+    ):
+        return None
+    return {pos: other_owner, other: current}
+
+
+def improve_schedule(
+    instance: ProblemInstance,
+    result: ScheduleResult,
+    *,
+    iterations: int = 1000,
+    time_budget: Optional[float] = None,
+    rng: Optional[random.Random] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    anchor: Optional[Sequence[Optional[str]]] = None,
+    stability_weight: float = STABILITY_WEIGHT,
+) -> ScheduleResult:
+    """
+    Hill-climb `result` with same-role moves and swaps, returning a new result.
+
+    Fewer open slots always wins; otherwise a move is kept only if it lowers
+    the penalty. Bleach slots stay fixed so the rotation and cursor are
+    untouched, and no move may create a hard constraint violation. Stops after
+    `iterations` proposals or `time_budget` seconds, whichever comes first.
+    `cancel` is polled alongside the time budget; see `engine.RunCancelled`.
+    Pass the `anchor` a warm-started `result` was built with so moves pay the
+    same stability cost its penalty already includes.
+    """
+    if rng is None:
+        rng = random.Random(result.seed)
+    state = _LocalState(instance, result, anchor, stability_weight)
+    peers: Dict[tuple, List[int]] = {}
+    movable: List[int] = []
+    for pos, slot in enumerate(state.slots):
+        if state.movable(pos):
+            movable.append(pos)
+            peers.setdefault((slot.role, None), []).append(pos)
+            peers.setdefault((slot.role, slot.day_index), []).append(pos)
+    if not movable:
+        return result
+
+    deadline = time.monotonic() + time_budget if time_budget else None
+    changed = False
+    for step in range(max(0, iterations)):
+        if deadline is not None and step % 64 == 0 and time.monotonic() >= deadline:
+            break
+        check_cancelled(cancel, step)
+        pos = movable[rng.randrange(len(movable))]
+        changes = _candidate_moves(state, rng, peers, pos)
+        if not changes:
+            continue
+        filled = state.owner[pos] is None
+        undo = {p: state.owner[p] for p in changes}
+        delta = state.apply(changes)
+        if delta is None:
+            continue
+        if filled or delta < -_EPSILON:
+            changed = True
+            if filled:
+                state.notes[pos] = []
+            continue
+        state.restore(undo)
+
+    if not changed:
+        return result
+
+    assignments: List[Assignment] = []
+    for pos, original in enumerate(result.assignments):
+        member_idx = state.owner[pos]
+        if member_idx is None:
+            assignments.append(original)
+            continue
+        staff_id = instance.staff[member_idx].id
+        if staff_id == original.staff_id:
+            assignments.append(original)
+        else:
+            assignments.append(Assignment(slot=original.slot, staff_id=staff_id, notes=state.notes[pos]))
+    stats = {staff_id: float(state.counts[idx]) for staff_id, idx in instance.staff_index.items()}
+    return ScheduleResult(
+        assignments=assignments,
+        bleach_cursor=result.bleach_cursor,
+        total_penalty=state.total_penalty(),
+        stats=stats,
+        seed=result.seed,
+    )
+
+
+def schedule_penalty(
+    instance: ProblemInstance,
+    result: ScheduleResult,
+    anchor: Optional[Sequence[Optional[str]]] = None,
+    stability_weight: float = STABILITY_WEIGHT,
+) -> float:
+    """Penalty of a complete schedule under the same model the greedy engine uses."""
+    return _LocalState(instance, result, anchor, stability_weight).total_penalty()
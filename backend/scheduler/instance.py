@@ -0,0 +1,320 @@
+"""
+Precompiled problem instance shared by every trial of a scheduling request.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .model import (
+    DailyRequirement,
+    DAYS,
+    PTOEntry,
+    ScheduleConfig,
+    ScheduleSlot,
+    StaffMember,
+)
+
+
+@dataclass(frozen=True)
+class ProblemInstance:
+    """
+    Everything a trial needs that does not depend on its seed.
+
+    Built once per request by `compile_instance`; engines must treat it as
+    read-only so it can be shared across trials and worker processes.
+    """
+
+    staff: Tuple[StaffMember, ...]
+    cfg: ScheduleConfig
+    requirements: Mapping[str, DailyRequirement]
+    slots: Tuple[ScheduleSlot, ...]
+    pto: Mapping[str, FrozenSet[date]]
+    staff_map: Mapping[str, StaffMember]
+    staff_by_role: Mapping[str, Tuple[StaffMember, ...]]
+    # Position of each staff id in `staff`; columns of the eligibility rows.
+    staff_index: Mapping[str, int]
+    # One row per slot (same order as `slots`): eligibility[s][i] is 1 when
+    # staff[i] may work slots[s] (availability, PTO, role, duty capabilities).
+    eligibility: Tuple[bytes, ...]
+
+    def __reduce__(self):
+        # MappingProxyType does not pickle; rebuild from plain dicts in worker processes.
+        return (
+            _rebuild_instance,
+            (
+                self.staff,
+                self.cfg,
+                dict(self.requirements),
+                self.slots,
+                dict(self.pto),
+                self.eligibility,
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class InstancePartition:
+    """
+    One role's slice of an instance: that role's staff and slots only.
+
+    `slot_positions[i]` is the position of `instance.slots[i]` in the parent
+    instance, so per-partition results can be merged back in slot order.
+    """
+
+    role: str
+    instance: ProblemInstance
+    slot_positions: Tuple[int, ...]
+
+
+def slot_key(slot: ScheduleSlot) -> tuple:
+    """
+    Identity of a slot that survives recompiling: date, role, duty and index.
+    Saved schedules label bleach slots with duty "bleach"; compiled slots keep "close".
+    """
+    return (slot.date, slot.role, "close" if slot.is_bleach else slot.duty, slot.slot_index)
+
+
+def _ensure_requirements(requirements: Sequence[DailyRequirement]) -> Dict[str, DailyRequirement]:
+    req_map: Dict[str, DailyRequirement] = {}
+    for req in requirements:
+        req_map[req.day_name] = req
+    missing = [d for d in DAYS if d not in req_map]
+    if missing:
+        raise ValueError(f"Missing requirements for day(s): {', '.join(missing)}")
+    return req_map
+
+
+def _effective_requirement(req: DailyRequirement, cfg: ScheduleConfig) -> DailyRequirement:
+    # No admin coverage on Saturdays
+    if req.day_name == "Sat" and req.admin_count:
+        req = replace(req, admin_count=0)
+    # ensure tech counts meet patient ratios
+    tech_total = req.tech_openers + req.tech_mids + req.tech_closers
+    need_tech = math.ceil(req.patient_count / cfg.patients_per_tech) if cfg.patients_per_tech else 0
+    if need_tech > tech_total:
+        additional = need_tech - tech_total
+        req = replace(req, tech_mids=req.tech_mids + additional)
+        tech_total += additional
+
+    rn_min_from_tech = math.ceil(tech_total / cfg.techs_per_rn) if cfg.techs_per_rn else 0
+    rn_min_from_patients = math.ceil(req.patient_count / cfg.patients_per_rn) if cfg.patients_per_rn else 0
+    rn_needed = max(req.rn_count, rn_min_from_patients, rn_min_from_tech)
+    if rn_needed != req.rn_count:
+        req = replace(req, rn_count=rn_needed)
+    return req
+
+
+def _is_bleach_day(cfg: ScheduleConfig, week: int, day_name: str, schedule_date: date) -> bool:
+    freq = (cfg.bleach_frequency or "weekly").lower()
+    if freq == "quarterly":
+        # second week (index 1) of Feb/May/Aug/Nov using the schedule date month
+        return week == 1 and schedule_date.month in (2, 5, 8, 11) and day_name == cfg.bleach_day
+    return day_name == cfg.bleach_day
+
+
+def _build_slots(requirements: Mapping[str, DailyRequirement], cfg: ScheduleConfig) -> List[ScheduleSlot]:
+    """Expand effective daily requirements into the ordered slot list for the horizon."""
+    slots: List[ScheduleSlot] = []
+    day_index = 0
+    for week in range(cfg.weeks):
+        for day_pos, day_name in enumerate(DAYS):
+            req = requirements[day_name]
+            schedule_date = cfg.start_date + timedelta(days=week * 7 + day_pos)
+
+            def add_slot(role: str, duty: str, count: int, *, bleach: bool = False):
+                for idx in range(count):
+                    slots.append(
+                        ScheduleSlot(
+                            day_index=day_index,
+                            date=schedule_date,
+                            day_name=day_name,
+                            role=role,
+                            duty=duty,
+                            slot_index=idx + 1,
+                            is_bleach=bleach and idx == 0,
+                        )
+                    )
+
+            add_slot("Tech", "open", req.tech_openers)
+            bleach = req.tech_closers > 0 and _is_bleach_day(cfg, week, day_name, schedule_date)
+            add_slot("Tech", "close", req.tech_closers, bleach=bleach)
+            add_slot("Tech", "mid", req.tech_mids)
+            add_slot("RN", "coverage", req.rn_count)
+            add_slot("Admin", "coverage", req.admin_count)
+
+            day_index += 1
+    return slots
+
+
+def _pto_lookup(pto_entries: Iterable[PTOEntry]) -> Dict[str, set]:
+    out: Dict[str, set] = defaultdict(set)
+    for entry in pto_entries:
+        out[entry.staff_id].add(entry.date)
+    return out
+
+
+def _is_available(
+    member: StaffMember,
+    slot: ScheduleSlot,
+    pto_dates: Mapping[str, Iterable],
+) -> bool:
+    if slot.day_name not in member.availability or not member.availability.get(slot.day_name, True):
+        return False
+    if slot.date in pto_dates.get(member.id, ()):
+        return False
+    if member.role != slot.role:
+        return False
+    if slot.role == "Tech":
+        if slot.duty == "open" and not member.can_open:
+            return False
+        if slot.duty == "close" and not member.can_close:
+            return False
+        if slot.is_bleach and not member.can_bleach:
+            return False
+    return True
+
+
+def _eligibility_rows(
+    staff: Sequence[StaffMember],
+    slots: Sequence[ScheduleSlot],
+    pto: Mapping[str, FrozenSet[date]],
+) -> Tuple[bytes, ...]:
+    # Slots sharing date/role/duty/bleach have identical rows, so each distinct
+    # key is evaluated once and the row object is shared.
+    rows: Dict[tuple, bytes] = {}
+    out: List[bytes] = []
+    for slot in slots:
+        key = (slot.date, slot.day_name, slot.role, slot.duty, slot.is_bleach)
+        row = rows.get(key)
+        if row is None:
+            row = bytes(1 if _is_available(member, slot, pto) else 0 for member in staff)
+            rows[key] = row
+        out.append(row)
+    return tuple(out)
+
+
+def _assemble(
+    staff: Tuple[StaffMember, ...],
+    cfg: ScheduleConfig,
+    requirements: Dict[str, DailyRequirement],
+    slots: Tuple[ScheduleSlot, ...],
+    pto: Dict[str, FrozenSet[date]],
+    eligibility: Optional[Tuple[bytes, ...]] = None,
+) -> ProblemInstance:
+    if eligibility is None:
+        eligibility = _eligibility_rows(staff, slots, pto)
+    by_role: Dict[str, List[StaffMember]] = defaultdict(list)
+    for member in staff:
+        by_role[member.role].append(member)
+    return ProblemInstance(
+        staff=staff,
+        cfg=cfg,
+        requirements=MappingProxyType(requirements),
+        slots=slots,
+        pto=MappingProxyType(pto),
+        staff_map=MappingProxyType({member.id: member for member in staff}),
+        staff_by_role=MappingProxyType({role: tuple(members) for role, members in by_role.items()}),
+        staff_index=MappingProxyType({member.id: idx for idx, member in enumerate(staff)}),
+        eligibility=eligibility,
+    )
+
+
+def _rebuild_instance(staff, cfg, requirements, slots, pto, eligibility) -> ProblemInstance:
+    return _assemble(staff, cfg, requirements, slots, pto, eligibility)
+
+
+def compile_instance(
+    staff: Sequence[StaffMember],
+    requirements: Sequence[DailyRequirement],
+    cfg: ScheduleConfig,
+    pto_entries: Iterable[PTOEntry] = (),
+) -> ProblemInstance:
+    """
+    Validate inputs and precompute the seed-independent parts of the problem:
+    ratio-adjusted requirements, the slot list, PTO lookup, staff by role, and
+    the slot x staff eligibility rows.
+    """
+    req_map = _ensure_requirements(requirements)
+    effective = {day: _effective_requirement(req_map[day], cfg) for day in DAYS}
+    pto = {staff_id: frozenset(dates) for staff_id, dates in _pto_lookup(pto_entries).items()}
+    return _assemble(
+        tuple(staff),
+        cfg,
+        effective,
+        tuple(_build_slots(effective, cfg)),
+        pto,
+    )
+
+
+def partition_by_role(instance: ProblemInstance) -> List[InstancePartition]:
+    """
+    Split an instance into independent per-role sub-problems.
+
+    Members have exactly one role, may only work slots of that role, and every
+    constraint is tracked per member, so no choice in one partition affects
+    another. Partitions come in order of each role's first slot; eligibility
+    rows keep only the role's columns and stay shared between equal rows.
+    """
+    positions: Dict[str, List[int]] = defaultdict(list)
+    for slot_pos, slot in enumerate(instance.slots):
+        positions[slot.role].append(slot_pos)
+    partitions: List[InstancePartition] = []
+    for role, slot_positions in positions.items():
+        members = instance.staff_by_role.get(role, ())
+        member_ids = {member.id for member in members}
+        columns = [instance.staff_index[member.id] for member in members]
+        rows: Dict[int, bytes] = {}
+        eligibility: List[bytes] = []
+        for slot_pos in slot_positions:
+            row = instance.eligibility[slot_pos]
+            sub_row = rows.get(id(row))
+            if sub_row is None:
+                sub_row = bytes(row[col] for col in columns)
+                rows[id(row)] = sub_row
+            eligibility.append(sub_row)
+        sub_instance = _assemble(
+            tuple(members),
+            instance.cfg,
+            dict(instance.requirements),
+            tuple(instance.slots[slot_pos] for slot_pos in slot_positions),
+            {staff_id: dates for staff_id, dates in instance.pto.items() if staff_id in member_ids},
+            tuple(eligibility),
+        )
+        partitions.append(InstancePartition(role=role, instance=sub_instance, slot_positions=tuple(slot_positions)))
+    return partitions
+
+
+def horizon_windows(instance: ProblemInstance, window_weeks: int) -> List[ProblemInstance]:
+    """
+    Split an instance into consecutive windows of `window_weeks` weeks each.
+
+    Windows keep the full staff, config and global day indexes, so a solve of
+    window k can resume from the state left by windows before it. Slots are
+    built day by day, so each window is a contiguous run of `instance.slots`.
+    """
+    days_per_window = max(1, window_weeks) * len(DAYS)
+    bounds: List[int] = []
+    current: Optional[int] = None
+    for slot_pos, slot in enumerate(instance.slots):
+        window = slot.day_index // days_per_window
+        if window != current:
+            bounds.append(slot_pos)
+            current = window
+    bounds.append(len(instance.slots))
+    return [
+        _assemble(
+            instance.staff,
+            instance.cfg,
+            dict(instance.requirements),
+            instance.slots[lo:hi],
+            dict(instance.pto),
+            instance.eligibility[lo:hi],
+        )
+        for lo, hi in zip(bounds, bounds[1:])
+    ]
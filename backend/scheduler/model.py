@@ -101,6 +101,15 @@ class PTOEntry:
         return {"staff_id": self.staff_id, "date": d}
 
 
+@dataclass
+class ScheduleChanges:
+    """Edits to the inputs of an existing schedule; see `repair_schedule`."""
+
+    pto_added: List[PTOEntry] = field(default_factory=list)
+    staff_removed: List[str] = field(default_factory=list)
+    requirements: List[DailyRequirement] = field(default_factory=list)  # replaces the listed days' demand
+
+
 @dataclass
 class ScheduleSlot:
     day_index: int
@@ -119,6 +128,29 @@ class Assignment:
     notes: List[str] = field(default_factory=list)
 
 
+@dataclass
+class TrialReport:
+    index: int
+    seed: int
+    total_penalty: float
+    elapsed: float  # seconds spent generating this trial
+    pruned: bool = False  # aborted early; total_penalty is the partial sum at that point
+    open_slots: Optional[int] = None  # unfilled slots in the finished schedule; None when pruned
+    partition: Optional[str] = None  # role solved by this trial in a partitioned run
+    window: Optional[int] = None  # horizon window solved by this trial in a rolling-horizon run
+
+
+@dataclass
+class TournamentReport:
+    workers: int
+    elapsed: float  # wall-clock seconds for the whole tournament
+    trials: List[TrialReport] = field(default_factory=list)
+    requested: int = 0  # trials asked for; len(trials) is how many actually ran
+    stop_reason: str = "completed"  # completed | time_budget | stagnation | stopped
+    partition_seeds: Dict[str, int] = field(default_factory=dict)  # winning seed per role when partitioned
+    window_seeds: List[int] = field(default_factory=list)  # winning seed per window in a rolling-horizon run
+
+
 @dataclass
 class ScheduleResult:
     assignments: List[Assignment]
@@ -126,3 +158,4 @@ class ScheduleResult:
     total_penalty: float
     stats: Dict[str, float]
     seed: Optional[int] = None
+    tournament: Optional[TournamentReport] = None
@@ -0,0 +1,232 @@
+"""
+Incremental repair of an existing schedule after its inputs change.
+
+A published roster should not be reshuffled because one member took a day
+off. Repair keeps every previous assignment that is still valid under the
+changed inputs and re-solves only the slots that lost their assignee or are
+new. Slots that were already open are tried last, so a change that frees
+someone (new staff, cancelled PTO) can cover an old gap without moving any
+kept assignment. Candidates are scored with the local-search model from
+`improve`, which checks a member's days on both sides of a change, so filling
+a slot in the middle of the horizon never breaks a rest or day-cap rule with
+the days after it.
+
+Only when a slot still cannot be filled are the same-role slots around it
+(`neighborhood_days` either side) released and re-solved too: critical slots
+first, then released slots go back to their previous member wherever that is
+still feasible. The wider repair is kept only if every released slot is
+filled again and fewer slots are left open.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .engine import BLEACH_ROTATION_OFFSET_PENALTY, OPEN_LABEL, check_cancelled
+from .improve import _LocalState
+from .instance import ProblemInstance, compile_instance, slot_key
+from .model import (
+    Assignment,
+    DailyRequirement,
+    PTOEntry,
+    ScheduleChanges,
+    ScheduleConfig,
+    ScheduleResult,
+    StaffMember,
+)
+
+# Days either side of an unfillable slot whose same-role slots may be released
+# (the three-day cap reaches two days back).
+REPAIR_NEIGHBORHOOD_DAYS = 2
+
+
+def apply_changes(
+    staff: Sequence[StaffMember],
+    requirements: Sequence[DailyRequirement],
+    pto_entries: Iterable[PTOEntry],
+    changes: ScheduleChanges,
+) -> Tuple[List[StaffMember], List[DailyRequirement], List[PTOEntry]]:
+    """Return the staff, requirements and PTO with `changes` applied."""
+    removed = set(changes.staff_removed)
+    demand = {req.day_name: req for req in requirements}
+    demand.update({req.day_name: req for req in changes.requirements})
+    return (
+        [member for member in staff if member.id not in removed],
+        list(demand.values()),
+        [entry for entry in [*pto_entries, *changes.pto_added] if entry.staff_id not in removed],
+    )
+
+
+def _assignee(assignment: Assignment) -> Optional[str]:
+    return None if assignment.staff_id in (None, "", OPEN_LABEL) else assignment.staff_id
+
+
+def changed_slots(previous: ScheduleResult, result: ScheduleResult) -> int:
+    """Slots of `result` whose assignee differs from `previous` (new slots count once filled)."""
+    before = {slot_key(a.slot): _assignee(a) for a in previous.assignments}
+    return sum(1 for a in result.assignments if _assignee(a) != before.get(slot_key(a.slot)))
+
+
+def repair_schedule(
+    staff: Sequence[StaffMember],
+    requirements: Sequence[DailyRequirement],
+    cfg: ScheduleConfig,
+    pto_entries: Iterable[PTOEntry],
+    previous: ScheduleResult,
+    changes: Optional[ScheduleChanges] = None,
+    *,
+    neighborhood_days: int = REPAIR_NEIGHBORHOOD_DAYS,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> ScheduleResult:
+    """
+    Repair `previous`, built from these inputs, after `changes` are applied.
+
+    `cfg` must be the configuration `previous` was generated with (same start
+    date and bleach cursor). Passing inputs that already include the changes
+    and no `changes` works too: affected slots are found by comparing the
+    previous assignments against the new instance, not from the change list.
+    """
+    if changes is not None:
+        staff, requirements, pto_entries = apply_changes(staff, requirements, pto_entries, changes)
+    instance = compile_instance(staff, requirements, cfg, pto_entries)
+    return repair_instance(instance, previous, neighborhood_days=neighborhood_days, cancel=cancel)
+
+
+def repair_instance(
+    instance: ProblemInstance,
+    previous: ScheduleResult,
+    *,
+    neighborhood_days: int = REPAIR_NEIGHBORHOOD_DAYS,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> ScheduleResult:
+    """Repair `previous` against an instance compiled from the changed inputs."""
+    previous_by_key = {slot_key(a.slot): a for a in previous.assignments}
+    kept: List[Assignment] = []
+    affected: List[int] = []
+    previously_open: List[int] = []
+    booked: Set[Tuple[int, int]] = set()
+    for pos, slot in enumerate(instance.slots):
+        old = previous_by_key.get(slot_key(slot))
+        if old is not None and _assignee(old) is None:
+            # Open before the change: nothing was taken away here, so it is only filled after the affected slots.
+            kept.append(Assignment(slot=slot, staff_id=None, notes=list(old.notes)))
+            previously_open.append(pos)
+            continue
+        member_idx = instance.staff_index.get(old.staff_id or "") if old is not None else None
+        if (
+            member_idx is not None
+            and instance.eligibility[pos][member_idx]
+            and (member_idx, slot.day_index) not in booked
+        ):
+            booked.add((member_idx, slot.day_index))
+            kept.append(Assignment(slot=slot, staff_id=old.staff_id, notes=list(old.notes)))
+        else:
+            kept.append(Assignment(slot=slot, staff_id=None))
+            affected.append(pos)
+
+    state = _LocalState(instance, ScheduleResult(assignments=kept, bleach_cursor=0, total_penalty=0.0, stats={}))
+    still_open = _fill(state, affected, cancel)
+    if still_open and neighborhood_days > 0:
+        still_open = _fill_neighborhood(state, still_open, neighborhood_days, cancel)
+    _fill(state, previously_open, cancel)
+
+    cfg = instance.cfg
+    assignments: List[Assignment] = []
+    for pos, slot in enumerate(instance.slots):
+        member_idx = state.owner[pos]
+        if member_idx is not None:
+            assignments.append(Assignment(slot=slot, staff_id=instance.staff[member_idx].id, notes=state.notes[pos]))
+            continue
+        notes = ["Bleach rotation unavailable"] if slot.is_bleach and cfg.bleach_rotation else []
+        notes.append("Needs coverage")
+        staff_id = None if slot.role == "Tech" and slot.duty in ("open", "close") else OPEN_LABEL
+        assignments.append(Assignment(slot=slot, staff_id=staff_id, notes=notes))
+    bleach_cursor = state._replay_bleach_offsets()
+    return ScheduleResult(
+        assignments=assignments,
+        bleach_cursor=bleach_cursor,
+        total_penalty=state.total_penalty(),
+        stats={staff_id: float(state.counts[idx]) for staff_id, idx in instance.staff_index.items()},
+        seed=previous.seed,
+    )
+
+
+def _fill(
+    state: _LocalState,
+    positions: Sequence[int],
+    cancel: Optional[Callable[[], bool]],
+    previous_owner: Optional[Dict[int, int]] = None,
+) -> List[int]:
+    """
+    Greedily give each open slot its cheapest feasible member, or its previous
+    member when `previous_owner` names one that still fits; return the slots
+    left open.
+    """
+    previous_owner = previous_owner or {}
+    instance = state.instance
+    rotation = set(state.cfg.bleach_rotation)
+    still_open: List[int] = []
+    for step, pos in enumerate(positions):
+        check_cancelled(cancel, step)
+        slot = state.slots[pos]
+        # Like the engine, bleach slots are only ever filled from the rotation.
+        member_idx = previous_owner.get(pos)
+        if member_idx is not None and state.can_take(member_idx, pos) and state.apply({pos: member_idx}) is not None:
+            continue
+        cursor = state._replay_bleach_offsets(until=pos) if slot.is_bleach else 0
+        best: Optional[Tuple[float, str, int]] = None
+        for member in instance.staff_by_role.get(slot.role, ()):
+            if slot.is_bleach and member.id not in rotation:
+                continue
+            member_idx = instance.staff_index[member.id]
+            if not state.can_take(member_idx, pos):
+                continue
+            delta = state.apply({pos: member_idx})
+            if delta is None:
+                continue
+            state.restore({pos: None})
+            if slot.is_bleach:
+                delta += state.rotation_offset(member_idx, cursor) * BLEACH_ROTATION_OFFSET_PENALTY
+            if best is None or (delta, member.id) < best[:2]:
+                best = (delta, member.id, member_idx)
+        if best is None:
+            still_open.append(pos)
+            continue
+        state.assign(pos, best[2])
+        state.notes[pos] = []
+    return still_open
+
+
+def _fill_neighborhood(
+    state: _LocalState,
+    still_open: List[int],
+    neighborhood_days: int,
+    cancel: Optional[Callable[[], bool]],
+) -> List[int]:
+    days_by_role: Dict[str, Set[int]] = {}
+    for pos in still_open:
+        slot = state.slots[pos]
+        days_by_role.setdefault(slot.role, set()).update(
+            range(slot.day_index - neighborhood_days, slot.day_index + neighborhood_days + 1)
+        )
+    released = [
+        pos
+        for pos, slot in enumerate(state.slots)
+        if state.owner[pos] is not None and state.movable(pos) and slot.day_index in days_by_role.get(slot.role, ())
+    ]
+    if not released:
+        return still_open
+    undo = {pos: state.owner[pos] for pos in released}
+    notes = {pos: state.notes[pos] for pos in released}
+    state.restore({pos: None for pos in released})
+    remaining = _fill(state, still_open + released, cancel, previous_owner=undo)
+    # Keep the wider repair only if it covers every released slot again and opens fewer slots.
+    if len(remaining) < len(still_open) and all(state.owner[pos] is not None for pos in released):
+        for pos in released:
+            if state.owner[pos] == undo[pos]:
+                state.notes[pos] = notes[pos]
+        return remaining
+    state.restore({**{pos: None for pos in still_open}, **undo})
+    for pos, saved in notes.items():
+        state.notes[pos] = saved
+    return still_open
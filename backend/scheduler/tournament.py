@@ -1,10 +1,164 @@
 from __future__ import annotations
 
-from typing import Iterable, Sequence, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+from multiprocessing.context import BaseContext
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Optional
+import os
 import random
+import threading
+import time
 
-from .model import StaffMember, DailyRequirement, ScheduleConfig, PTOEntry, ScheduleResult
-from .engine import generate_schedule
+from .model import (
+    StaffMember,
+    DailyRequirement,
+    ScheduleConfig,
+    PTOEntry,
+    ScheduleResult,
+    TournamentReport,
+    TrialReport,
+)
+from .engine import (
+    OPEN_LABEL,
+    STABILITY_WEIGHT,
+    RunCancelled,
+    SolverState,
+    TrialPruned,
+    merge_partition_results,
+    remaining_penalty_floor,
+    solve_instance,
+    stability_anchor,
+)
+from .improve import improve_schedule
+from .instance import ProblemInstance, compile_instance, horizon_windows, partition_by_role
+from .vectorized import solve_instance_vectorized
+
+# Trial solvers selectable by name; all produce the same schedule for a given seed.
+ENGINES: Dict[str, Callable[..., ScheduleResult]] = {
+    "reference": solve_instance,
+    "numpy": solve_instance_vectorized,
+}
+
+
+@dataclass(frozen=True)
+class TrialOptions:
+    engine: str = "reference"
+    improve_iterations: int = 0  # local-search proposals per trial; 0 disables
+    improve_seconds: Optional[float] = None  # optional wall-clock cap per trial
+    prune: bool = False  # abort trials that cannot beat the incumbent (greedy-only runs)
+    start: Optional[SolverState] = None  # state carried in from earlier slots (reference engine only)
+    anchor: Optional[Tuple[Optional[str], ...]] = None  # previous assignee per slot, for warm starts
+    stability_weight: float = STABILITY_WEIGHT
+    day_matching: bool = False  # fill each day's Tech slots by min-cost assignment
+
+
+# Instance and options shared with pool workers; set once per worker process by _init_worker.
+_worker_instance: Optional[ProblemInstance] = None
+_worker_options: TrialOptions = TrialOptions()
+_worker_floor: Optional[List[float]] = None
+# Best complete penalty so far, published by the parent process to every worker.
+_worker_bound = None
+# Set to 1 by the parent when the caller cancels; workers poll it like a cancel callback.
+_worker_cancel = None
+
+# How often the parent polls a caller's cancel callback while pool trials run.
+CANCEL_POLL_SECONDS = 0.01
+# Warm-started runs default to stopping after this many trials without improvement.
+WARM_START_STAGNATION_LIMIT = 3
+# When partitions stop for different reasons, the merged run reports the least reproducible one.
+_STOP_REASON_RANK = {"completed": 0, "stagnation": 1, "time_budget": 2, "stopped": 3}
+
+
+def _trial_seeds(trials: int, base_seed: Optional[int]) -> List[int]:
+    # Seeds are fixed up front so serial and parallel runs explore the same trials.
+    seed_source = random.Random(base_seed)
+    return [
+        (base_seed + i) if base_seed is not None else seed_source.randrange(1 << 30)
+        for i in range(trials)
+    ]
+
+
+def _resolve_workers(workers: Optional[int], trials: int) -> int:
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, trials))
+
+
+def _resolve_engine(engine: str) -> Callable[..., ScheduleResult]:
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown scheduling engine: {engine}") from None
+
+
+def _run_trial(
+    instance: ProblemInstance,
+    seed: int,
+    options: TrialOptions,
+    bound: Optional[float] = None,
+    floor: Optional[List[float]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> Tuple[Optional[ScheduleResult], float, float]:
+    """Returns (result or None if pruned, penalty or partial penalty, seconds)."""
+    solver = _resolve_engine(options.engine)
+    started = time.perf_counter()
+    if not options.prune or bound == float("inf"):
+        bound = None
+    try:
+        extra = {"start": options.start} if options.start is not None else {}
+        if options.anchor is not None:
+            extra.update(anchor=options.anchor, stability_weight=options.stability_weight)
+        if options.day_matching:
+            extra["day_matching"] = True
+        result = solver(instance, rng_seed=seed, bound=bound, floor=floor, cancel=cancel, **extra)
+    except TrialPruned as pruned:
+        return None, pruned.partial_penalty, time.perf_counter() - started
+    result.seed = seed
+    if options.improve_iterations > 0:
+        result = improve_schedule(
+            instance,
+            result,
+            iterations=options.improve_iterations,
+            time_budget=options.improve_seconds,
+            rng=random.Random(seed),
+            cancel=cancel,
+            anchor=options.anchor,
+            stability_weight=options.stability_weight,
+        )
+    return result, result.total_penalty, time.perf_counter() - started
+
+
+def _open_slots(result: ScheduleResult) -> int:
+    return sum(1 for a in result.assignments if a.staff_id in (None, "", OPEN_LABEL))
+
+
+def _init_worker(instance: ProblemInstance, options: TrialOptions, bound, cancel_flag) -> None:
+    global _worker_instance, _worker_options, _worker_floor, _worker_bound, _worker_cancel
+    _worker_instance = instance
+    _worker_options = options
+    _worker_bound = bound
+    _worker_cancel = cancel_flag
+    _worker_floor = remaining_penalty_floor(instance) if options.prune else None
+
+
+def _worker_cancelled() -> bool:
+    return bool(_worker_cancel.value)
+
+
+def _pool_trial(seed: int) -> Tuple[Optional[ScheduleResult], float, float]:
+    assert _worker_instance is not None
+    bound = _worker_bound.value if _worker_bound is not None else None
+    cancel = _worker_cancelled if _worker_cancel is not None else None
+    return _run_trial(_worker_instance, seed, _worker_options, bound, _worker_floor, cancel)
+
+
+def _watch_cancel(cancel: Callable[[], bool], flag, done: threading.Event) -> None:
+    # Bridges a caller's in-process callback to the flag pool workers can see.
+    while not done.wait(CANCEL_POLL_SECONDS):
+        if cancel():
+            flag.value = 1
+            return
 
 
 def run_tournament(
@@ -15,26 +169,524 @@ def run_tournament(
     *,
     trials: int = 10,
     base_seed: Optional[int] = None,
+    workers: Optional[int] = 1,
+    engine: str = "reference",
+    improve_iterations: int = 0,
+    improve_seconds: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    stagnation_limit: Optional[int] = None,
+    prune: bool = True,
+    on_trial: Optional[Callable[[TrialReport], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    partitioned: bool = False,
+    window_weeks: Optional[int] = None,
+    warm_start: Optional[ScheduleResult] = None,
+    stability_weight: float = STABILITY_WEIGHT,
+    day_matching: bool = False,
 ) -> Tuple[ScheduleResult, int]:
+    """
+    Run `trials` seeded schedules and keep the lowest-penalty one.
+
+    `workers` > 1 spreads trials over a process pool (0/None uses every core).
+    Seeds and the tie-break (earliest trial wins) match the serial run, so the
+    winning seed does not depend on the worker count. Per-trial timings are
+    reported on `result.tournament`. `engine` picks a solver from `ENGINES`;
+    `improve_iterations` runs local search on every trial before comparing.
+
+    The tournament is anytime: it stops early once `time_budget` seconds have
+    passed or `stagnation_limit` consecutive trials failed to improve, and
+    returns the best result so far. `result.tournament.stop_reason` says why.
+
+    With `prune`, greedy-only trials abort once their partial penalty plus a
+    lower bound on the remaining slots exceeds the best finished trial; they
+    are reported with `pruned=True` and cannot change the winner. Trials that
+    run local search are never pruned, since it can lower their penalty.
+
+    `on_trial` is called in the calling thread with each trial's report as
+    soon as it is known, e.g. to publish progress. `should_stop` is polled
+    after every trial; once it returns True the tournament ends with the best
+    result so far and stop_reason "stopped".
+
+    `cancel` abandons the run instead: it is polled between trials and every
+    few slots inside them (pool workers see it within `CANCEL_POLL_SECONDS`),
+    and `RunCancelled` is raised without a result.
+
+    `partitioned` runs one tournament per role instead; see
+    `run_partitioned_tournament`. `window_weeks` runs one tournament per
+    window of that many weeks, each with `trials` trials; see
+    `run_rolling_tournament`. The two modes cannot be combined.
+
+    `warm_start` is the previous schedule for the same dates, e.g. the last
+    saved run before a rerun: trials prefer its assignments, paying
+    `stability_weight` for every slot given to someone else, so unchanged
+    inputs reproduce it and small changes move only a few slots. Since
+    trials then agree closely, the run stops after
+    `WARM_START_STAGNATION_LIMIT` trials without improvement unless
+    `stagnation_limit` says otherwise. Local search scores moves with the
+    same stability term.
+
+    `day_matching` makes every trial fill each day's Tech slots as one
+    min-cost assignment instead of slot by slot (see `solve_instance`), which
+    leaves fewer slots open when qualified members are scarce.
+    """
+    if partitioned and window_weeks:
+        raise ValueError("Partitioned and rolling-horizon runs cannot be combined")
+    if warm_start is not None and stagnation_limit is None:
+        stagnation_limit = WARM_START_STAGNATION_LIMIT
+    instance = compile_instance(staff, requirements, cfg, pto_entries)
+    if window_weeks:
+        return run_rolling_tournament(
+            instance,
+            window_weeks=window_weeks,
+            trials=trials,
+            base_seed=base_seed,
+            workers=workers,
+            engine=engine,
+            improve_iterations=improve_iterations,
+            improve_seconds=improve_seconds,
+            time_budget=time_budget,
+            stagnation_limit=stagnation_limit,
+            prune=prune,
+            on_trial=on_trial,
+            should_stop=should_stop,
+            cancel=cancel,
+            warm_start=warm_start,
+            stability_weight=stability_weight,
+            day_matching=day_matching,
+        )
+    runner = run_partitioned_tournament if partitioned else run_instance_tournament
+    return runner(
+        instance,
+        trials=trials,
+        base_seed=base_seed,
+        workers=workers,
+        engine=engine,
+        improve_iterations=improve_iterations,
+        improve_seconds=improve_seconds,
+        time_budget=time_budget,
+        stagnation_limit=stagnation_limit,
+        prune=prune,
+        on_trial=on_trial,
+        should_stop=should_stop,
+        cancel=cancel,
+        warm_start=warm_start,
+        stability_weight=stability_weight,
+        day_matching=day_matching,
+    )
+
+
+def run_instance_tournament(
+    instance: ProblemInstance,
+    *,
+    trials: int = 10,
+    base_seed: Optional[int] = None,
+    workers: Optional[int] = 1,
+    engine: str = "reference",
+    improve_iterations: int = 0,
+    improve_seconds: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    stagnation_limit: Optional[int] = None,
+    prune: bool = True,
+    on_trial: Optional[Callable[[TrialReport], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    start: Optional[SolverState] = None,
+    warm_start: Optional[ScheduleResult] = None,
+    stability_weight: float = STABILITY_WEIGHT,
+    day_matching: bool = False,
+    mp_context: Optional[BaseContext] = None,
+) -> Tuple[ScheduleResult, int]:
+    """
+    Tournament over a precompiled instance; setup cost is paid once by the caller.
+
+    The budget is checked between trials, so a run overshoots it by at most one
+    trial (per worker); the first trial always runs so there is a result.
+
+    `start` makes every trial resume from that state (see `solve_instance`);
+    only the reference engine can resume, and local search is not supported.
+    `warm_start` anchors trials to a previous schedule (see `run_tournament`).
+    `mp_context` runs trials in a process pool of that context even with a
+    single worker, e.g. so several tournaments driven from threads each get
+    their own process.
+    """
+    _resolve_engine(engine)
+    if start is not None and (engine != "reference" or improve_iterations > 0):
+        raise ValueError("Resuming from a carried state needs the reference engine without local search")
+    options = TrialOptions(
+        engine=engine,
+        improve_iterations=max(0, improve_iterations),
+        improve_seconds=improve_seconds,
+        prune=prune and improve_iterations <= 0,
+        start=start,
+        anchor=stability_anchor(instance, warm_start) if warm_start is not None else None,
+        stability_weight=stability_weight,
+        day_matching=day_matching,
+    )
     trials = max(1, trials)
-    seed_source = random.Random(base_seed)
-    best_result: Optional[ScheduleResult] = None
-    best_seed: Optional[int] = None
+    seeds = _trial_seeds(trials, base_seed)
+    workers = _resolve_workers(workers, trials)
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget else None
 
-    for i in range(trials):
-        seed = (base_seed + i) if base_seed is not None else seed_source.randrange(1 << 30)
-        result = generate_schedule(
-            staff,
-            requirements,
-            cfg,
-            pto_entries=pto_entries,
-            rng_seed=seed,
+    best_result: Optional[ScheduleResult] = None
+    bound = None
+    watcher_done = threading.Event()
+    if workers == 1 and mp_context is None:
+        floor = remaining_penalty_floor(instance) if options.prune else None
+        # Lazily evaluated, so each trial sees the incumbent from the trials before it.
+        outcomes = (
+            _run_trial(instance, seed, options, best_result.total_penalty if best_result else None, floor, cancel)
+            for seed in seeds
+        )
+        executor = None
+    else:
+        context = mp_context or multiprocessing.get_context()
+        if options.prune:
+            bound = context.Value("d", float("inf"), lock=False)
+        # Also raised on an early stop so trials still running abandon their work.
+        cancel_flag = context.Value("b", 0, lock=False)
+        if cancel is not None:
+            threading.Thread(
+                target=_watch_cancel, args=(cancel, cancel_flag, watcher_done), daemon=True
+            ).start()
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(instance, options, bound, cancel_flag),
         )
-        result.seed = seed
-        if best_result is None or result.total_penalty < best_result.total_penalty:
-            best_result = result
-            best_seed = seed
+        # Small chunks keep early stops responsive when a budget is set.
+        early_stop = deadline is not None or stagnation_limit
+        chunksize = 1 if early_stop else max(1, trials // (workers * 4))
+        outcomes = executor.map(_pool_trial, seeds, chunksize=chunksize)
+
+    best_seed: Optional[int] = None
+    reports: List[TrialReport] = []
+    stop_reason = "completed"
+    since_improvement = 0
+    finished = False
+    try:
+        for index, (seed, (result, penalty, elapsed)) in enumerate(zip(seeds, outcomes)):
+            report = TrialReport(
+                index=index,
+                seed=seed,
+                total_penalty=penalty,
+                elapsed=elapsed,
+                pruned=result is None,
+                open_slots=_open_slots(result) if result is not None else None,
+            )
+            reports.append(report)
+            if on_trial is not None:
+                on_trial(report)
+            if result is not None and (best_result is None or result.total_penalty < best_result.total_penalty):
+                best_result = result
+                best_seed = seed
+                since_improvement = 0
+                if bound is not None:
+                    bound.value = result.total_penalty
+            else:
+                since_improvement += 1
+            if index + 1 == trials:
+                break
+            if cancel is not None and cancel():
+                raise RunCancelled()
+            if should_stop is not None and should_stop():
+                stop_reason = "stopped"
+                break
+            if stagnation_limit and since_improvement >= stagnation_limit:
+                stop_reason = "stagnation"
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = "time_budget"
+                break
+        finished = True
+    finally:
+        watcher_done.set()
+        if executor is not None:
+            # Don't wait on trials still running in the pool after an early stop or a cancel.
+            completed = finished and stop_reason == "completed"
+            if not completed:
+                cancel_flag.value = 1
+            executor.shutdown(wait=completed, cancel_futures=True)
 
     assert best_result is not None and best_seed is not None
     best_result.seed = best_seed
+    best_result.tournament = TournamentReport(
+        workers=workers,
+        elapsed=time.perf_counter() - started,
+        trials=reports,
+        requested=trials,
+        stop_reason=stop_reason,
+    )
     return best_result, best_seed
+
+
+def _split_shares(total: int, weights: Sequence[int]) -> List[int]:
+    """Split `total` in proportion to `weights` (largest remainder), at least 1 each."""
+    count = len(weights)
+    spare = max(total, count) - count
+    weight_sum = sum(weights)
+    exact = [spare * weight / weight_sum if weight_sum else spare / count for weight in weights]
+    shares = [int(value) for value in exact]
+    by_remainder = sorted(range(count), key=lambda i: (shares[i] - exact[i], i))
+    for i in by_remainder[: spare - sum(shares)]:
+        shares[i] += 1
+    return [1 + share for share in shares]
+
+
+def planned_trials(
+    instance: ProblemInstance,
+    trials: int,
+    *,
+    partitioned: bool = False,
+    window_weeks: Optional[int] = None,
+) -> int:
+    """
+    Trials `run_tournament` asks for with these settings, i.e. the report's
+    `requested`: every partition gets at least one trial, so a partitioned
+    run can ask for more than `trials`, and a rolling run asks for `trials`
+    per window.
+    """
+    trials = max(1, trials)
+    if window_weeks:
+        windows = horizon_windows(instance, window_weeks)
+        return trials * len(windows) if windows else 1
+    if partitioned:
+        partitions = partition_by_role(instance)
+        if partitions:
+            return sum(_split_shares(trials, [len(partition.slot_positions) for partition in partitions]))
+    return trials
+
+
+def run_partitioned_tournament(
+    instance: ProblemInstance,
+    *,
+    trials: int = 10,
+    base_seed: Optional[int] = None,
+    workers: Optional[int] = 1,
+    engine: str = "reference",
+    improve_iterations: int = 0,
+    improve_seconds: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    stagnation_limit: Optional[int] = None,
+    prune: bool = True,
+    on_trial: Optional[Callable[[TrialReport], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    warm_start: Optional[ScheduleResult] = None,
+    stability_weight: float = STABILITY_WEIGHT,
+    day_matching: bool = False,
+) -> Tuple[ScheduleResult, int]:
+    """
+    One tournament per role partition (see `partition_by_role`), merged into a
+    single schedule.
+
+    Trials and workers are split between partitions in proportion to their
+    slot counts, so the large Tech partition gets most of both. With at least
+    one worker per partition the partitions run concurrently, each in its own
+    spawned process pool (threads only relay results, and spawning is safe
+    from several threads at once). With fewer workers than partitions they
+    run one after another, each using every worker, so no more than
+    `workers` processes run at once. Every partition draws its trial seeds
+    from the same base seed and its winner does not depend on timing, so the
+    merged schedule is reproducible from the base seed alone: that seed is
+    returned (and stored on the result) in place of a single winning trial
+    seed, and per-role winners are in `tournament.partition_seeds`.
+
+    Trial reports carry their role in `partition`; `on_trial` calls are
+    serialized. The time budget, stop and cancel callbacks apply to every
+    partition.
+    """
+    _resolve_engine(engine)
+    if base_seed is None:
+        base_seed = random.randrange(1 << 30)
+    partitions = partition_by_role(instance)
+    options = dict(
+        engine=engine,
+        improve_iterations=improve_iterations,
+        improve_seconds=improve_seconds,
+        time_budget=time_budget,
+        stagnation_limit=stagnation_limit,
+        prune=prune,
+        should_stop=should_stop,
+        cancel=cancel,
+        warm_start=warm_start,
+        stability_weight=stability_weight,
+        day_matching=day_matching,
+    )
+    if not partitions:
+        return run_instance_tournament(
+            instance, trials=trials, base_seed=base_seed, workers=1, on_trial=on_trial, **options
+        )
+    sizes = [len(partition.slot_positions) for partition in partitions]
+    trial_shares = _split_shares(max(1, trials), sizes)
+    total_workers = _resolve_workers(workers, sum(trial_shares))
+    concurrent = total_workers >= len(partitions) > 1
+    # Every share is at least 1, so shares only add up to total_workers when there are enough workers.
+    worker_shares = _split_shares(total_workers, trial_shares) if concurrent else [total_workers] * len(partitions)
+    mp_context = multiprocessing.get_context("spawn") if concurrent else None
+    started = time.perf_counter()
+    publish_lock = threading.Lock()
+
+    def solve(index: int) -> Tuple[ScheduleResult, int]:
+        role = partitions[index].role
+
+        def publish(report: TrialReport) -> None:
+            report.partition = role
+            if on_trial is not None:
+                with publish_lock:
+                    on_trial(report)
+
+        return run_instance_tournament(
+            partitions[index].instance,
+            trials=trial_shares[index],
+            base_seed=base_seed,
+            workers=worker_shares[index],
+            on_trial=publish,
+            mp_context=mp_context,
+            **options,
+        )
+
+    if not concurrent:
+        outcomes = [solve(index) for index in range(len(partitions))]
+    else:
+        with ThreadPoolExecutor(max_workers=len(partitions), thread_name_prefix="partition") as pool:
+            futures = [pool.submit(solve, index) for index in range(len(partitions))]
+            outcomes = [future.result() for future in futures]
+
+    results = [result for result, _ in outcomes]
+    merged = merge_partition_results(instance, partitions, results)
+    merged.seed = base_seed
+    merged.tournament = TournamentReport(
+        workers=total_workers,
+        elapsed=time.perf_counter() - started,
+        trials=[trial for result in results for trial in result.tournament.trials],
+        requested=sum(trial_shares),
+        stop_reason=max((result.tournament.stop_reason for result in results), key=_STOP_REASON_RANK.__getitem__),
+        partition_seeds={partition.role: seed for partition, (_, seed) in zip(partitions, outcomes)},
+    )
+    return merged, base_seed
+
+
+def run_rolling_tournament(
+    instance: ProblemInstance,
+    *,
+    window_weeks: int = 1,
+    trials: int = 10,
+    base_seed: Optional[int] = None,
+    workers: Optional[int] = 1,
+    engine: str = "reference",
+    improve_iterations: int = 0,
+    improve_seconds: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    stagnation_limit: Optional[int] = None,
+    prune: bool = True,
+    on_trial: Optional[Callable[[TrialReport], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    warm_start: Optional[ScheduleResult] = None,
+    stability_weight: float = STABILITY_WEIGHT,
+    day_matching: bool = False,
+) -> Tuple[ScheduleResult, int]:
+    """
+    Rolling-horizon tournament: optimize `window_weeks`-week windows in order,
+    each with its own `trials`, and carry the winner's state (worked days,
+    bleach and Saturday history, fairness counts, bleach cursor) into the next
+    window. A poor draw in one window no longer costs the whole horizon, and
+    run time grows linearly with the number of weeks.
+
+    Windows are solved by the reference engine, the one that can resume from
+    carried state; every engine builds the same schedules, so `engine` is only
+    validated. Local search runs once over the stitched horizon.
+    `time_budget` is shared out between the windows still to run. After a
+    stop request each remaining window runs a single trial so the schedule
+    stays complete.
+
+    Window w draws seeds from `base_seed + w * trials`, so the run is
+    reproducible from the base seed, which is returned as the winning seed;
+    per-window winners are in `tournament.window_seeds`, and trial reports
+    carry their window index in `window`.
+    """
+    _resolve_engine(engine)
+    if base_seed is None:
+        base_seed = random.randrange(1 << 30)
+    trials = max(1, trials)
+    windows = horizon_windows(instance, window_weeks)
+    if not windows:
+        return run_instance_tournament(
+            instance,
+            trials=1,
+            base_seed=base_seed,
+            workers=1,
+            on_trial=on_trial,
+            should_stop=should_stop,
+            cancel=cancel,
+            warm_start=warm_start,
+            stability_weight=stability_weight,
+            day_matching=day_matching,
+        )
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget else None
+    state = SolverState.initial(instance)
+    results: List[ScheduleResult] = []
+    window_seeds: List[int] = []
+
+    for index, window in enumerate(windows):
+        def publish(report: TrialReport, index: int = index) -> None:
+            report.window = index
+            if on_trial is not None:
+                on_trial(report)
+
+        window_budget = None
+        if deadline is not None:
+            # Never zero (which means no budget): a late window still runs its first trial.
+            window_budget = max(1e-6, (deadline - time.perf_counter()) / (len(windows) - index))
+        result, seed = run_instance_tournament(
+            window,
+            trials=trials,
+            base_seed=base_seed + index * trials,
+            workers=workers,
+            time_budget=window_budget,
+            stagnation_limit=stagnation_limit,
+            prune=prune,
+            on_trial=publish,
+            should_stop=should_stop,
+            cancel=cancel,
+            start=state,
+            warm_start=warm_start,
+            stability_weight=stability_weight,
+            day_matching=day_matching,
+        )
+        state = state.advanced(result)
+        results.append(result)
+        window_seeds.append(seed)
+
+    merged = ScheduleResult(
+        assignments=[assignment for result in results for assignment in result.assignments],
+        bleach_cursor=state.bleach_cursor,
+        total_penalty=sum(result.total_penalty for result in results),
+        stats=results[-1].stats,
+        seed=base_seed,
+    )
+    if improve_iterations > 0:
+        merged = improve_schedule(
+            instance,
+            merged,
+            iterations=improve_iterations,
+            time_budget=improve_seconds,
+            rng=random.Random(base_seed),
+            cancel=cancel,
+            anchor=stability_anchor(instance, warm_start) if warm_start is not None else None,
+            stability_weight=stability_weight,
+        )
+        merged.seed = base_seed
+    merged.tournament = TournamentReport(
+        workers=max(result.tournament.workers for result in results),
+        elapsed=time.perf_counter() - started,
+        trials=[trial for result in results for trial in result.tournament.trials],
+        requested=trials * len(windows),
+        stop_reason=max((result.tournament.stop_reason for result in results), key=_STOP_REASON_RANK.__getitem__),
+        window_seeds=window_seeds,
+    )
+    return merged, base_seed
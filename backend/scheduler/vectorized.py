@@ -0,0 +1,284 @@
+"""
+NumPy engine: same greedy construction as `engine.solve_instance`, with staff
+state held in arrays and every candidate of a slot scored in one expression.
+
+Random draws happen in the same order as the reference engine (one shuffle per
+slot, one jitter per surviving candidate in shuffled order) and scores use the
+same float operations, so a given seed produces the same schedule.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import random
+
+import numpy as np
+
+from .engine import (
+    BLEACH_ROTATION_OFFSET_PENALTY,
+    CONSTRAINT_HARD_THRESHOLD,
+    FAIRNESS_WEIGHT,
+    JITTER_SCALE,
+    OPEN_LABEL,
+    STABILITY_WEIGHT,
+    _check_bound,
+    _clamp_weight,
+    _preference_penalty,
+    _rotation_offset,
+    _tech_day_positions,
+    check_cancelled,
+    remaining_penalty_floor,
+)
+from .assignment import min_cost_assignment
+from .instance import ProblemInstance
+from .model import DAYS, Assignment, ScheduleResult, ScheduleSlot
+
+# Sentinel for "never happened" in day/week trackers; far enough from 0 that
+# `x == day - 1` style checks can never match it.
+_NEVER = -(1 << 30)
+
+
+class _ConstraintWeights:
+    """Clamped toggle weights split into hard filters and soft penalties."""
+
+    def __init__(self, toggles) -> None:
+        self.values = {
+            name: _clamp_weight(getattr(toggles, name))
+            for name in (
+                "enforce_three_day_cap",
+                "enforce_post_bleach_rest",
+                "enforce_alt_saturdays",
+                "limit_tech_four_days",
+                "limit_rn_four_days",
+            )
+        }
+
+    def apply(self, name: str, violated: np.ndarray, penalty: np.ndarray, allowed: np.ndarray):
+        w = self.values[name]
+        if w <= 0:
+            return penalty, allowed
+        if w >= CONSTRAINT_HARD_THRESHOLD:
+            return penalty, allowed & ~violated
+        return penalty + w * violated, allowed
+
+
+def solve_instance_vectorized(
+    instance: ProblemInstance,
+    *,
+    rng_seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
+    bound: Optional[float] = None,
+    floor: Optional[Sequence[float]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    anchor: Optional[Sequence[Optional[str]]] = None,
+    stability_weight: float = STABILITY_WEIGHT,
+    day_matching: bool = False,
+) -> ScheduleResult:
+    """
+    Run one greedy trial against a precompiled instance using array state.
+    `bound`, `floor`, `cancel`, `anchor` and `day_matching` behave exactly as
+    in `engine.solve_instance`.
+    """
+    cfg = instance.cfg
+    staff = instance.staff
+    staff_index = instance.staff_index
+    n_staff = len(staff)
+    n_days = cfg.weeks * len(DAYS)
+
+    if rng is None:
+        rng = random.Random(rng_seed)
+
+    weights = _ConstraintWeights(cfg.toggles)
+    counts = np.zeros(n_staff, dtype=np.int64)
+    worked = np.zeros((n_days, n_staff), dtype=bool)
+    week_days = np.zeros((max(cfg.weeks, 1), n_staff), dtype=np.int64)
+    last_bleach = np.full(n_staff, _NEVER, dtype=np.int64)
+    last_saturday = np.full(n_staff, _NEVER, dtype=np.int64)
+    # Rank of each staff id so ties break by id exactly like the reference sort.
+    id_rank = np.empty(n_staff, dtype=np.int64)
+    id_rank[sorted(range(n_staff), key=lambda i: staff[i].id)] = np.arange(n_staff)
+
+    role_index: Dict[str, List[int]] = {
+        role: [staff_index[m.id] for m in members] for role, members in instance.staff_by_role.items()
+    }
+    eligible_rows: Dict[int, np.ndarray] = {}
+    pref_rows: Dict[tuple, np.ndarray] = {}
+
+    assignments: List[Assignment] = []
+    rotation = cfg.bleach_rotation
+    bleach_cursor = cfg.bleach_cursor % len(rotation) if rotation else 0
+    total_penalty = 0.0
+    if bound is not None and floor is None:
+        floor = remaining_penalty_floor(instance)
+
+    def slot_prefs(slot: ScheduleSlot) -> np.ndarray:
+        pref_key = (slot.role, slot.duty, slot.day_name)
+        prefs = pref_rows.get(pref_key)
+        if prefs is None:
+            prefs = np.array([_preference_penalty(member, slot) for member in staff], dtype=np.float64)
+            pref_rows[pref_key] = prefs
+        return prefs
+
+    def slot_terms(slot_pos: int, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Constraint penalties and hard filters for members `idx` at once."""
+        slot = instance.slots[slot_pos]
+        day = slot.day_index
+        week_idx = day // len(DAYS)
+        row = instance.eligibility[slot_pos]
+        eligible = eligible_rows.get(id(row))
+        if eligible is None:
+            eligible = np.frombuffer(row, dtype=np.uint8).astype(bool)
+            eligible_rows[id(row)] = eligible
+
+        worked_today = worked[day, idx]
+        allowed = eligible[idx] & ~worked_today
+        penalty = np.zeros(len(idx), dtype=np.float64)
+        if day >= 2:
+            three_day = worked[day - 1, idx] & worked[day - 2, idx]
+        else:
+            three_day = np.zeros(len(idx), dtype=bool)
+        penalty, allowed = weights.apply("enforce_three_day_cap", three_day, penalty, allowed)
+        penalty, allowed = weights.apply("enforce_post_bleach_rest", last_bleach[idx] == day - 1, penalty, allowed)
+        alt_saturday = (last_saturday[idx] == week_idx - 1) & (slot.day_name == "Sat")
+        penalty, allowed = weights.apply("enforce_alt_saturdays", alt_saturday, penalty, allowed)
+        over_four = ~worked_today & (week_days[week_idx, idx] >= 4)
+        penalty, allowed = weights.apply("limit_tech_four_days", over_four & (slot.role == "Tech"), penalty, allowed)
+        penalty, allowed = weights.apply("limit_rn_four_days", over_four & (slot.role == "RN"), penalty, allowed)
+        if anchor is not None and anchor[slot_pos] is not None:
+            penalty = penalty + stability_weight * (idx != staff_index.get(anchor[slot_pos], -1))
+        return penalty, allowed
+
+    def plan_tech_day(first_pos: int) -> Dict[int, Tuple[Optional[int], Optional[int], Optional[float]]]:
+        # Mirrors engine._plan_tech_day: same costs, same jitter draws, same matching.
+        members = np.asarray(role_index.get("Tech", ()), dtype=np.int64)
+        positions = _tech_day_positions(instance.slots, first_pos)
+        costs: List[List[Optional[float]]] = []
+        bases: List[List[Optional[float]]] = []
+        for slot_pos in positions:
+            slot = instance.slots[slot_pos]
+            prefs = slot_prefs(slot)
+            penalty, allowed = slot_terms(slot_pos, members)
+            cost_row: List[Optional[float]] = []
+            base_row: List[Optional[float]] = []
+            for col, member_idx in enumerate(members.tolist()):
+                jitter = rng.random() * JITTER_SCALE
+                base: Optional[float] = None
+                if allowed[col]:
+                    if not slot.is_bleach:
+                        base = float(prefs[member_idx]) + float(penalty[col])
+                    else:
+                        offset = _rotation_offset(rotation, bleach_cursor, staff[member_idx].id)
+                        if offset is not None:
+                            base = (
+                                float(prefs[member_idx])
+                                + float(penalty[col])
+                                + offset * BLEACH_ROTATION_OFFSET_PENALTY
+                            )
+                base_row.append(base)
+                cost_row.append(
+                    None if base is None else base + FAIRNESS_WEIGHT * int(counts[member_idx]) + jitter
+                )
+            costs.append(cost_row)
+            bases.append(base_row)
+
+        plan: Dict[int, Tuple[Optional[int], Optional[int], Optional[float]]] = {}
+        for row, (slot_pos, col) in enumerate(zip(positions, min_cost_assignment(costs))):
+            if col is None:
+                plan[slot_pos] = (None, None, None)
+                continue
+            member_idx = int(members[col])
+            ridx = None
+            if instance.slots[slot_pos].is_bleach:
+                ridx = (bleach_cursor + _rotation_offset(rotation, bleach_cursor, staff[member_idx].id)) % len(rotation)
+            plan[slot_pos] = (member_idx, ridx, bases[row][col])
+        return plan
+
+    day_plan: Dict[int, Tuple[Optional[int], Optional[int], Optional[float]]] = {}
+
+    for slot_pos, slot in enumerate(instance.slots):
+        check_cancelled(cancel, slot_pos)
+        day = slot.day_index
+        week_idx = day // len(DAYS)
+
+        chosen: Optional[int] = None
+        note: Optional[str] = None
+        rotation_index_used: Optional[int] = None
+        base_penalty: Optional[float] = None
+
+        if day_matching and slot.role == "Tech":
+            if slot_pos not in day_plan:
+                day_plan = plan_tech_day(slot_pos)
+            chosen, rotation_index_used, base_penalty = day_plan[slot_pos]
+            if chosen is None and slot.is_bleach and rotation:
+                note = "Bleach rotation unavailable"
+        else:
+            prefs = slot_prefs(slot)
+            order = list(role_index.get(slot.role, ()))
+            if order:
+                rng.shuffle(order)
+            idx = np.asarray(order, dtype=np.int64)
+            penalty, allowed = slot_terms(slot_pos, idx)
+
+            if slot.is_bleach and rotation:
+                allowed_at = {int(i): pos for pos, i in enumerate(idx) if allowed[pos]}
+                best_score: Optional[float] = None
+                for offset in range(len(rotation)):
+                    ridx = (bleach_cursor + offset) % len(rotation)
+                    member_idx = staff_index.get(rotation[ridx])
+                    if member_idx is None or member_idx not in allowed_at:
+                        continue
+                    pos = allowed_at[member_idx]
+                    base = float(prefs[member_idx]) + float(penalty[pos]) + offset * BLEACH_ROTATION_OFFSET_PENALTY
+                    score = base + FAIRNESS_WEIGHT * int(counts[member_idx])
+                    if best_score is None or score < best_score:
+                        best_score = score
+                        chosen, rotation_index_used, base_penalty = member_idx, ridx, base
+                if chosen is None:
+                    note = "Bleach rotation unavailable"
+
+            if chosen is None and not slot.is_bleach and allowed.any():
+                cand = idx[allowed]
+                scores = (prefs[cand] + penalty[allowed]) + FAIRNESS_WEIGHT * counts[cand]
+                jitter = np.array([rng.random() for _ in range(len(cand))], dtype=np.float64) * JITTER_SCALE
+                totals = scores + jitter
+                ties = np.flatnonzero(totals == totals.min())
+                pick = ties[np.argmin(id_rank[cand[ties]])] if len(ties) > 1 else ties[0]
+                chosen = int(cand[pick])
+                base_penalty = float(scores[pick]) - FAIRNESS_WEIGHT * int(counts[chosen])
+
+        if chosen is None:
+            notes = [note] if note else []
+            notes.append("Needs coverage")
+            if slot.role == "Tech" and slot.duty in ("open", "close"):
+                assignments.append(Assignment(slot=slot, staff_id=None, notes=notes))
+            else:
+                assignments.append(Assignment(slot=slot, staff_id=OPEN_LABEL, notes=notes))
+            _check_bound(bound, floor, total_penalty, slot_pos)
+            continue
+
+        member = staff[chosen]
+        assignments.append(Assignment(slot=slot, staff_id=member.id, notes=[note] if note else []))
+        counts[chosen] += 1
+        if not worked[day, chosen]:
+            worked[day, chosen] = True
+            week_days[week_idx, chosen] += 1
+        if slot.is_bleach and slot.role == "Tech":
+            last_bleach[chosen] = day
+            if rotation_index_used is not None:
+                bleach_cursor = (rotation_index_used + 1) % len(rotation)
+        if slot.day_name == "Sat":
+            last_saturday[chosen] = week_idx
+        if base_penalty is None:
+            base_penalty = _preference_penalty(member, slot)
+        total_penalty += base_penalty + FAIRNESS_WEIGHT * int(counts[chosen])
+        _check_bound(bound, floor, total_penalty, slot_pos)
+
+    stats = {staff_id: float(counts[i]) for staff_id, i in staff_index.items()}
+
+    return ScheduleResult(
+        assignments=assignments,
+        bleach_cursor=bleach_cursor,
+        total_penalty=total_penalty,
+        stats=stats,
+        seed=rng_seed,
+    )
@@ -0,0 +1,33 @@
+"""Request bodies shared by the API tests."""
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+
+
+def schedule_body(**overrides):
+    """A two-week /api/schedule/run body for a ten-tech clinic; `overrides` replace top-level keys."""
+    staff = [
+        {"id": f"t{i}", "name": f"T{i}", "role": "Tech", "can_open": i % 2 == 0, "can_close": i % 3 != 0, "can_bleach": i % 2 == 1}
+        for i in range(10)
+    ]
+    staff += [{"id": f"r{i}", "name": f"R{i}", "role": "RN"} for i in range(4)]
+    staff.append({"id": "a0", "name": "A0", "role": "Admin"})
+    body = {
+        "staff": staff,
+        "requirements": [
+            {"day_name": day, "patient_count": 16, "tech_openers": 1, "tech_mids": 1, "tech_closers": 1, "rn_count": 1, "admin_count": 1}
+            for day in DAYS
+        ],
+        "config": {
+            "clinic_name": "Clinic",
+            "timezone": "UTC",
+            "start_date": "2025-01-06",
+            "weeks": 2,
+            "bleach_rotation": ["t1", "t3", "t5"],
+            "bleach_cursor": 0,
+        },
+        "pto": [{"staff_id": "t1", "date": "2025-01-09"}],
+        "tournament_trials": 4,
+        "base_seed": 3,
+    }
+    body.update(overrides)
+    return body
@@ -0,0 +1,23 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# The API reads its storage paths at import time, so point them at a scratch directory first.
+_STORE = Path(tempfile.mkdtemp(prefix="scheduler-tests-"))
+os.environ.setdefault("AUTH_STORE_PATH", str(_STORE / "auth.json"))
+os.environ.setdefault("AUTH_DB_PATH", str(_STORE / "auth.db"))
+os.environ.setdefault("SCHEDULE_POOL_WORKERS", "0")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from backend.api.main import app
+
+    client = TestClient(app)
+    token = client.post("/api/auth/login", json={"username": "admin", "password": "admin"}).json()["token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
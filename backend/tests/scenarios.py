@@ -0,0 +1,108 @@
+"""Seeded clinics and public-result checks shared by the scheduler tests."""
+
+from collections import defaultdict
+from datetime import date, timedelta
+import random
+
+from backend.scheduler import ProblemInstance, ScheduleResult
+from backend.scheduler.engine import OPEN_LABEL
+from backend.scheduler.model import (
+    DAYS,
+    ConstraintToggles,
+    DailyRequirement,
+    PTOEntry,
+    ScheduleConfig,
+    StaffMember,
+    StaffPreferences,
+)
+
+# Techs, RNs and admins per scenario kind.
+SIZES = {0: (4, 2, 1), 1: (14, 4, 2), 2: (30, 8, 3)}
+
+
+def build_scenario(kind: int, weeks: int = 3):
+    """Seeded clinic with every constraint hard; returns (staff, requirements, cfg, pto)."""
+    rnd = random.Random(kind)
+    n_tech, n_rn, n_admin = SIZES[kind]
+    staff = []
+    for i in range(n_tech):
+        availability = {day: rnd.random() > 0.15 for day in DAYS}
+        prefs = StaffPreferences(*[round(rnd.uniform(0.3, 2.5), 2) for _ in range(6)])
+        staff.append(
+            StaffMember(
+                id=f"t{i}",
+                name=f"T{i}",
+                role="Tech",
+                can_open=rnd.random() > 0.4,
+                can_close=rnd.random() > 0.4,
+                can_bleach=rnd.random() > 0.5,
+                availability=availability,
+                preferences=prefs,
+            )
+        )
+    for i in range(n_rn):
+        staff.append(StaffMember(id=f"r{i}", name=f"R{i}", role="RN", availability={d: rnd.random() > 0.1 for d in DAYS}))
+    for i in range(n_admin):
+        staff.append(StaffMember(id=f"a{i}", name=f"A{i}", role="Admin"))
+    requirements = [
+        DailyRequirement(day, rnd.randint(10, 40), 2, rnd.randint(1, 4), 2, rnd.randint(1, 3), 1) for day in DAYS
+    ]
+    cfg = ScheduleConfig(
+        clinic_name="Test",
+        timezone="UTC",
+        start_date=date(2025, 1, 6),
+        weeks=weeks,
+        bleach_day="Thu",
+        bleach_rotation=[s.id for s in staff if s.role == "Tech" and s.can_bleach][:4],
+        bleach_cursor=1,
+        toggles=ConstraintToggles(),
+    )
+    pto = [
+        PTOEntry(s.id, date(2025, 1, 6) + timedelta(days=rnd.randint(0, 7 * weeks - 1)))
+        for s in staff
+        if rnd.random() < 0.3
+    ]
+    return staff, requirements, cfg, pto
+
+
+def assignee(assignment):
+    return None if assignment.staff_id in (None, "", OPEN_LABEL) else assignment.staff_id
+
+
+def hard_violations(instance: ProblemInstance, result: ScheduleResult) -> list:
+    """
+    (staff id, day index, rule) for every broken rule, checked from the
+    assignments alone; assumes the default all-hard toggles.
+    """
+    found = []
+    days = defaultdict(set)
+    bleach_days = defaultdict(set)
+    for pos, assignment in enumerate(result.assignments):
+        staff_id = assignee(assignment)
+        if staff_id is None:
+            continue
+        slot = assignment.slot
+        if not instance.eligibility[pos][instance.staff_index[staff_id]]:
+            found.append((staff_id, slot.day_index, "ineligible"))
+        if slot.day_index in days[staff_id]:
+            found.append((staff_id, slot.day_index, "double booked"))
+        days[staff_id].add(slot.day_index)
+        if slot.is_bleach:
+            bleach_days[staff_id].add(slot.day_index)
+    for staff_id, worked in days.items():
+        for day in worked:
+            if day - 1 in worked and day - 2 in worked:
+                found.append((staff_id, day, "three-day cap"))
+            if day - 1 in bleach_days[staff_id]:
+                found.append((staff_id, day, "post-bleach rest"))
+            if day % len(DAYS) == DAYS.index("Sat") and day - len(DAYS) in worked:
+                found.append((staff_id, day, "alternate Saturdays"))
+            week_start = day - day % len(DAYS)
+            prior_in_week = sum(1 for d in range(week_start, day) if d in worked)
+            if instance.staff_map[staff_id].role in ("Tech", "RN") and prior_in_week >= 4:
+                found.append((staff_id, day, "four days a week"))
+    return found
+
+
+def open_slots(result: ScheduleResult) -> set:
+    return {(a.slot.date, a.slot.role, a.slot.duty, a.slot.slot_index) for a in result.assignments if assignee(a) is None}
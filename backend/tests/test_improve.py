@@ -0,0 +1,54 @@
+"""Hill-climbing improvement after greedy construction."""
+
+import random
+
+import pytest
+
+from backend.scheduler import compile_instance, improve_schedule, run_tournament, solve_instance
+from backend.scheduler.improve import schedule_penalty
+from backend.tests.scenarios import assignee, build_scenario, hard_violations, open_slots
+
+
+def _greedy(kind: int, seed: int):
+    instance = compile_instance(*build_scenario(kind))
+    return instance, solve_instance(instance, rng_seed=seed)
+
+
+@pytest.mark.parametrize("kind,seed", [(0, 1), (1, 2), (1, 5), (2, 3)])
+def test_improvement_never_worsens_and_stays_feasible(kind, seed):
+    instance, greedy = _greedy(kind, seed)
+    improved = improve_schedule(instance, greedy, iterations=800, rng=random.Random(seed))
+
+    assert len(open_slots(improved)) <= len(open_slots(greedy))
+    if len(open_slots(improved)) == len(open_slots(greedy)):
+        assert improved.total_penalty <= greedy.total_penalty + 1e-9
+    assert hard_violations(instance, improved) == []
+    # Delta evaluation must agree with a full re-score.
+    assert improved.total_penalty == pytest.approx(schedule_penalty(instance, improved))
+
+
+@pytest.mark.parametrize("kind,seed", [(1, 2), (2, 3)])
+def test_bleach_slots_and_cursor_stay_fixed(kind, seed):
+    instance, greedy = _greedy(kind, seed)
+    improved = improve_schedule(instance, greedy, iterations=800, rng=random.Random(seed))
+    assert improved.bleach_cursor == greedy.bleach_cursor
+    for before, after in zip(greedy.assignments, improved.assignments):
+        if before.slot.is_bleach:
+            assert assignee(after) == assignee(before)
+
+
+def test_improvement_is_reproducible_and_budgeted():
+    instance, greedy = _greedy(1, 4)
+    first = improve_schedule(instance, greedy, iterations=500, rng=random.Random(9))
+    second = improve_schedule(instance, greedy, iterations=500, rng=random.Random(9))
+    assert [a.staff_id for a in first.assignments] == [a.staff_id for a in second.assignments]
+    assert improve_schedule(instance, greedy, iterations=0) is greedy
+
+
+@pytest.mark.parametrize("kind", [1, 2])
+def test_few_improved_trials_beat_many_greedy_ones(kind):
+    staff, requirements, cfg, pto = build_scenario(kind)
+    greedy, _ = run_tournament(staff, requirements, cfg, pto, trials=60, base_seed=0)
+    improved, _ = run_tournament(staff, requirements, cfg, pto, trials=5, base_seed=0, improve_iterations=2000)
+    # Covering a slot outranks any penalty saving, as in the tournament itself.
+    assert (len(open_slots(improved)), improved.total_penalty) < (len(open_slots(greedy)), greedy.total_penalty)
@@ -0,0 +1,36 @@
+"""Progress reporting of background schedule jobs."""
+
+import time
+
+import pytest
+
+from backend.tests.api_body import schedule_body
+
+
+def _wait(client, job_id, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        status = client.get(f"/api/schedule/jobs/{job_id}").json()
+        if status["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return status
+        time.sleep(0.05)
+
+
+@pytest.mark.parametrize(
+    "seed,options",
+    [
+        (101, {}),
+        # Three roles but two trials: every partition still runs one.
+        (102, {"partitioned": True, "tournament_trials": 2}),
+        (103, {"partitioned": True, "tournament_trials": 7}),
+        (104, {"window_weeks": 1, "tournament_trials": 3}),
+    ],
+)
+def test_job_total_matches_trials_run(client, seed, options):
+    # A fresh seed per case keeps the result cache from answering without running trials.
+    body = schedule_body(base_seed=seed, **options)
+    submitted = client.post("/api/schedule/jobs", json=body)
+    assert submitted.status_code == 202, submitted.text
+    status = _wait(client, submitted.json()["job_id"])
+    assert status["status"] == "succeeded", status
+    assert status["trials_total"] == status["trials_done"]
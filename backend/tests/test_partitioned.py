@@ -0,0 +1,85 @@
+"""Partitioned tournaments: reproducibility and the worker budget."""
+
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from backend.scheduler import RunCancelled, compile_instance, partition_by_role, run_tournament
+from backend.scheduler.model import DailyRequirement
+from backend.tests.scenarios import build_scenario, hard_violations
+
+
+def _run(workers, **kwargs):
+    staff, requirements, cfg, pto = build_scenario(1, weeks=3)
+    return run_tournament(
+        staff, requirements, cfg, pto, trials=9, base_seed=4, workers=workers, partitioned=True, **kwargs
+    )
+
+
+def _peak_processes(fn):
+    peak = 0
+    done = threading.Event()
+
+    def watch():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, len(multiprocessing.active_children()))
+            time.sleep(0.002)
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        result = fn()
+    finally:
+        done.set()
+        watcher.join()
+    return result, peak
+
+
+def test_winner_does_not_depend_on_worker_count():
+    staff, requirements, cfg, pto = build_scenario(1, weeks=3)
+    instance = compile_instance(staff, requirements, cfg, pto)
+    serial, seed = _run(1)
+    assert seed == 4
+    assert not hard_violations(instance, serial)
+    for workers in (2, len(partition_by_role(instance))):
+        result, _ = _run(workers)
+        assert [a.staff_id for a in result.assignments] == [a.staff_id for a in serial.assignments]
+        assert result.tournament.partition_seeds == serial.tournament.partition_seeds
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_never_runs_more_processes_than_workers(workers):
+    _, peak = _peak_processes(lambda: _run(workers))
+    assert peak <= workers
+
+
+def test_warm_start_reaches_every_partition():
+    previous, _ = _run(1)
+    rerun, _ = _run(3, warm_start=previous)
+    assert [a.staff_id for a in rerun.assignments] == [a.staff_id for a in previous.assignments]
+
+
+def test_day_matching_is_reproducible_across_workers():
+    staff, requirements, cfg, pto = build_scenario(1, weeks=3)
+    instance = compile_instance(staff, requirements, cfg, pto)
+    serial, _ = _run(1, day_matching=True)
+    parallel, _ = _run(3, day_matching=True)
+    assert not hard_violations(instance, serial)
+    assert [a.staff_id for a in parallel.assignments] == [a.staff_id for a in serial.assignments]
+
+
+def test_empty_instance_keeps_callbacks():
+    staff, requirements, cfg, pto = build_scenario(1, weeks=1)
+    no_demand = [DailyRequirement(req.day_name, 0, 0, 0, 0, 0, 0) for req in requirements]
+    reports = []
+    result, _ = run_tournament(
+        staff, no_demand, cfg, pto, trials=3, base_seed=1, partitioned=True, on_trial=reports.append,
+        stagnation_limit=1,
+    )
+    assert result.assignments == []
+    assert len(reports) == 2 and result.tournament.stop_reason == "stagnation"
+    with pytest.raises(RunCancelled):
+        run_tournament(staff, no_demand, cfg, pto, trials=3, base_seed=1, partitioned=True, cancel=lambda: True)
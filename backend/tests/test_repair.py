@@ -0,0 +1,74 @@
+"""Regression tests for incremental schedule repair."""
+
+from dataclasses import replace
+
+import pytest
+
+from backend.scheduler import compile_instance, run_tournament
+from backend.scheduler.instance import slot_key
+from backend.scheduler.model import ScheduleChanges, StaffMember
+from backend.scheduler.repair import apply_changes, repair_schedule
+from backend.tests.scenarios import assignee, build_scenario, hard_violations, open_slots
+
+
+def _repair(kind: int, seed: int, changes: ScheduleChanges):
+    staff, requirements, cfg, pto = build_scenario(kind)
+    previous, _ = run_tournament(staff, requirements, cfg, pto, trials=3, base_seed=seed)
+    repaired = repair_schedule(staff, requirements, cfg, pto, previous, changes)
+    staff, requirements, pto = apply_changes(staff, requirements, pto, changes)
+    return compile_instance(staff, requirements, cfg, pto), previous, repaired
+
+
+def _assert_valid(instance, previous, repaired, removed):
+    assert hard_violations(instance, repaired) == []
+    before = {slot_key(a.slot): assignee(a) for a in previous.assignments}
+    for assignment in repaired.assignments:
+        owner = before.get(slot_key(assignment.slot))
+        if owner is not None and owner not in removed:
+            assert assignee(assignment) is not None, slot_key(assignment.slot)
+
+
+@pytest.mark.parametrize("seed", [6, 10, 11])
+def test_bleach_refill_respects_next_day_rest(seed):
+    # t3 holds Thursday bleach slots; whoever takes them over must rest on Friday.
+    staff, requirements, _, _ = build_scenario(2)
+    wednesday = next(req for req in requirements if req.day_name == "Wed")
+    changes = ScheduleChanges(staff_removed=["t3"], requirements=[replace(wednesday, tech_mids=wednesday.tech_mids + 1)])
+    instance, previous, repaired = _repair(2, seed, changes)
+    assert any(a.slot.is_bleach and assignee(a) is not None for a in repaired.assignments)
+    _assert_valid(instance, previous, repaired, {"t3"})
+
+
+@pytest.mark.parametrize("seed", [0, 6, 7])
+def test_neighborhood_release_keeps_filled_slots(seed):
+    # Extra Wednesday demand with t1 gone cannot all be covered, which triggers the neighborhood release.
+    staff, requirements, _, _ = build_scenario(1)
+    wednesday = next(req for req in requirements if req.day_name == "Wed")
+    changes = ScheduleChanges(
+        staff_removed=["t1"],
+        requirements=[replace(wednesday, tech_mids=wednesday.tech_mids + 1, tech_closers=wednesday.tech_closers + 1)],
+    )
+    instance, previous, repaired = _repair(1, seed, changes)
+    _assert_valid(instance, previous, repaired, {"t1"})
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_new_staff_cover_previously_open_slots(seed):
+    staff, requirements, cfg, pto = build_scenario(1)
+    previous, _ = run_tournament(staff, requirements, cfg, pto, trials=3, base_seed=seed)
+    assert open_slots(previous)
+    # Passing inputs that already include the change works without a change set.
+    staff = staff + [
+        StaffMember(id="new", name="New", role="Tech", can_open=True, can_close=True),
+        StaffMember(id="rnew", name="RNew", role="RN"),
+    ]
+    repaired = repair_schedule(staff, requirements, cfg, pto, previous)
+    instance = compile_instance(staff, requirements, cfg, pto)
+
+    assert open_slots(repaired) < open_slots(previous)
+    before = {slot_key(a.slot): assignee(a) for a in previous.assignments}
+    for assignment in repaired.assignments:
+        owner = before[slot_key(assignment.slot)]
+        if owner is not None:
+            assert assignee(assignment) == owner, slot_key(assignment.slot)
+    assert hard_violations(instance, repaired) == []
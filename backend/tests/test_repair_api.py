@@ -0,0 +1,51 @@
+"""End-to-end checks for the /api/schedule/repair endpoint."""
+
+import pytest
+
+from backend.tests.api_body import schedule_body
+
+
+def _owners(response):
+    return {
+        (a["date"], a["role"], a["duty"], a["slot_index"]): None if a["staff_id"] in (None, "OPEN") else a["staff_id"]
+        for a in response["assignments"]
+    }
+
+
+def test_repair_replays_rotation_from_saved_start_cursor(client):
+    run = client.post("/api/schedule/run", json=schedule_body())
+    assert run.status_code == 200, run.text
+    saved = run.json()
+    assert saved["bleach_cursor"] != 0
+
+    # Like the frontend, send the cursor the run ended on; the saved start cursor must win.
+    body = schedule_body(version_id=saved["version_id"])
+    body["config"]["bleach_cursor"] = saved["bleach_cursor"]
+    repair = client.post("/api/schedule/repair", json=body)
+    assert repair.status_code == 200, repair.text
+    repaired = repair.json()
+
+    assert repaired["changed_slots"] == 0
+    assert repaired["bleach_cursor"] == saved["bleach_cursor"]
+    # Rotation offsets are scored from the start cursor, so a wrong one shifts the penalty.
+    assert repaired["total_penalty"] == pytest.approx(saved["total_penalty"])
+    assert _owners(repaired) == _owners(saved)
+
+
+def test_repair_fills_removed_members_slots(client):
+    run = client.post("/api/schedule/run", json=schedule_body())
+    assert run.status_code == 200, run.text
+    saved = run.json()
+
+    body = schedule_body(version_id=saved["version_id"], changes={"staff_removed": ["t4"]})
+    repair = client.post("/api/schedule/repair", json=body)
+    assert repair.status_code == 200, repair.text
+    repaired = repair.json()
+
+    before = _owners(saved)
+    after = _owners(repaired)
+    assert "t4" not in after.values()
+    for key, owner in before.items():
+        if owner not in (None, "t4"):
+            assert after[key] == owner, key
+    assert repaired["changed_slots"] >= sum(1 for owner in before.values() if owner == "t4")
@@ -0,0 +1,60 @@
+"""Warm-started tournaments: stability against a previous schedule."""
+
+import pytest
+
+from backend.scheduler import compile_instance, run_tournament, solve_instance, solve_instance_vectorized
+from backend.scheduler.engine import stability_anchor
+from backend.scheduler.improve import schedule_penalty
+from backend.scheduler.model import PTOEntry
+from backend.scheduler.repair import changed_slots
+from backend.tests.scenarios import assignee, build_scenario, hard_violations
+
+
+def _with_extra_pto(kind: int):
+    staff, requirements, cfg, pto = build_scenario(kind, weeks=4)
+    previous, _ = run_tournament(staff, requirements, cfg, pto, trials=10, base_seed=3)
+    taken = next(
+        a for a in previous.assignments if assignee(a) and a.slot.role == "Tech" and a.slot.day_index > 5
+    )
+    return staff, requirements, cfg, [*pto, PTOEntry(taken.staff_id, taken.slot.date)], previous
+
+
+@pytest.mark.parametrize("kind", [1, 2])
+def test_unchanged_rerun_reproduces_previous(kind):
+    staff, requirements, cfg, pto = build_scenario(kind, weeks=4)
+    previous, _ = run_tournament(staff, requirements, cfg, pto, trials=10, base_seed=3)
+    rerun, _ = run_tournament(staff, requirements, cfg, pto, trials=20, base_seed=99, warm_start=previous)
+    assert changed_slots(previous, rerun) == 0
+
+
+def test_engines_agree_with_anchor():
+    staff, requirements, cfg, pto, previous = _with_extra_pto(2)
+    instance = compile_instance(staff, requirements, cfg, pto)
+    anchor = stability_anchor(instance, previous)
+    for seed in range(5):
+        reference = solve_instance(instance, rng_seed=seed, anchor=anchor)
+        vectorized = solve_instance_vectorized(instance, rng_seed=seed, anchor=anchor)
+        assert [a.staff_id for a in reference.assignments] == [a.staff_id for a in vectorized.assignments]
+        assert reference.total_penalty == vectorized.total_penalty
+
+
+@pytest.mark.parametrize("kind", [1, 2])
+def test_warm_start_with_local_search_keeps_one_objective(kind):
+    # Trials that local search changed and trials it left alone must be scored alike.
+    staff, requirements, cfg, pto, previous = _with_extra_pto(kind)
+    instance = compile_instance(staff, requirements, cfg, pto)
+    anchor = stability_anchor(instance, previous)
+    reported = []
+    for seed in range(100, 107):
+        result, _ = run_tournament(
+            staff, requirements, cfg, pto, trials=1, base_seed=seed, warm_start=previous, improve_iterations=60
+        )
+        trial = result.tournament.trials[0]
+        assert trial.total_penalty == pytest.approx(schedule_penalty(instance, result, anchor))
+        assert not hard_violations(instance, result)
+        reported.append(trial.total_penalty)
+    best, _ = run_tournament(
+        staff, requirements, cfg, pto, trials=7, base_seed=100, warm_start=previous, improve_iterations=60,
+        stagnation_limit=7,
+    )
+    assert best.total_penalty == min(reported)
@@ -179,9 +179,24 @@ export interface ScheduleRequest {
   pto: Array<Record<string, unknown>>;
   tournament_trials: number;
   base_seed?: number | null;
+  partitioned?: boolean;
+  window_weeks?: number | null;
+  warm_start?: boolean;
+  day_matching?: boolean;
   export_roles?: string[];
 }
 
+export interface ScheduleChanges {
+  pto_added?: Array<{ staff_id: string; date: string }>;
+  staff_removed?: string[];
+  requirements?: ScheduleRequest["requirements"];
+}
+
+export interface ScheduleRepairRequest extends ScheduleRequest {
+  changes: ScheduleChanges;
+  version_id?: number | null;
+}
+
 export interface ScheduleResponse {
   bleach_cursor: number;
   winning_seed: number | null;
@@ -197,7 +212,10 @@ export interface ScheduleResponse {
   }>;
   total_penalty: number;
   stats: Record<string, number>;
-  excel?: string;
+  excel?: string | null;
+  version_id?: number | null;
+  excel_url?: string | null;
+  changed_slots?: number | null;
 }
 
 export interface SavedRequirement {
@@ -235,6 +253,7 @@ export interface SavedSchedule {
   total_penalty?: number;
   winning_seed?: number | null;
   bleach_cursor?: number;
+  start_bleach_cursor?: number;
   export_roles?: string[];
   tournament_trials?: number;
   generated_at?: string;
@@ -270,6 +289,11 @@ export const runSchedule = async (req: ScheduleRequest): Promise<ScheduleRespons
   return data;
 };
 
+export const repairSchedule = async (req: ScheduleRepairRequest): Promise<ScheduleResponse> => {
+  const { data } = await api.post<ScheduleResponse>("schedule/repair", req);
+  return data;
+};
+
 export const fetchLatestSchedule = async (): Promise<SavedSchedule> => {
   const { data } = await api.get<SavedSchedule>(`schedule/latest?ts=${Date.now()}`);
   return data;
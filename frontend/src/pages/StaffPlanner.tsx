@@ -815,16 +815,7 @@ export default function StaffPlanner() {
           setBleachCursor(res.bleach_cursor);
         }
         setProgress(100);
-      if (res.excel) {
-        const blob = Uint8Array.from(window.atob(res.excel), (c) => c.charCodeAt(0));
-        const file = new Blob([blob], {
-          type: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        });
-        const url = URL.createObjectURL(file);
-        setExcelUrl(url);
-      } else {
-        setExcelUrl(null);
-      }
+      setExcelUrl(res.excel_url ?? null);
       setRunResult(
         `Winning seed: ${res.winning_seed ?? "n/a"} | Score: ${
           res.total_penalty?.toFixed ? res.total_penalty.toFixed(2) : res.total_penalty ?? "n/a"